@@ -1,19 +1,25 @@
 """
 Excel to PDF converter adapter with smart layout optimization.
 """
+import logging
 import os
 import win32com.client
 from typing import List
 from core.interfaces.converter import IConverter
 from core.models.conversion_job import ConversionJob, ConversionResult
-from utils.exceptions import ConversionError, OfficeApplicationError
+from core.models.export_profile import RECALC_FULL, RECALC_MANUAL, export_profile_for
+from utils.exceptions import ConversionError, OfficeApplicationError, ValidationError
 from utils.logging import get_logger
+from utils.timing import StageTimer
 
 logger = get_logger(__name__)
 
 # Excel constants
 xlLandscape = 2
 xlPortrait = 1
+xlCalculationManual = -4135
+xlQualityStandard = 0
+xlQualityMinimum = 1
 
 
 class ExcelAdapter(IConverter):
@@ -35,22 +41,28 @@ class ExcelAdapter(IConverter):
         Convert an Excel file to PDF with smart layout optimization.
         
         Args:
-            job: Conversion job with input/output paths
+            job: Conversion job with input/output paths (options["export_profile"]
+                 selects the export settings, see core.models.export_profile)
             
         Returns:
             ConversionResult indicating success or failure
         """
         excel = None
         workbook = None
+        timer = StageTimer()
         
         try:
-            logger.info(f"Starting Excel conversion: {job.input_path}")
+            profile = export_profile_for(job.options)
+            logger.info("Starting Excel conversion (%s): %s", profile.name, job.input_path)
             
             # Initialize Excel application (headless)
             try:
-                excel = win32com.client.Dispatch("Excel.Application")
-                excel.Visible = False
-                excel.DisplayAlerts = False
+                with timer.stage("dispatch"):
+                    excel = win32com.client.Dispatch("Excel.Application")
+                    excel.Visible = False
+                    excel.DisplayAlerts = False
+                    excel.ScreenUpdating = profile.screen_updating
+                    excel.EnableEvents = profile.events
             except Exception as e:
                 raise OfficeApplicationError(
                     f"Failed to initialize Excel. Ensure it is installed. Error: {e}"
@@ -61,57 +73,73 @@ class ExcelAdapter(IConverter):
             output_abs = os.path.abspath(job.output_path)
             
             try:
-                workbook = excel.Workbooks.Open(input_abs, ReadOnly=True)
+                with timer.stage("open"):
+                    workbook = excel.Workbooks.Open(input_abs, ReadOnly=True)
             except Exception as e:
                 raise ConversionError(f"Failed to open workbook: {e}")
             
-            # Process each visible worksheet
+            # Calculation mode can only be changed while a workbook is open
             try:
-                for sheet in workbook.Worksheets:
-                    if sheet.Visible:
-                        self._optimize_sheet_layout(sheet)
+                if profile.recalculation == RECALC_MANUAL:
+                    excel.Calculation = xlCalculationManual
+                elif profile.recalculation == RECALC_FULL:
+                    with timer.stage("recalc"):
+                        excel.CalculateFull()
             except Exception as e:
-                logger.warning(f"Layout optimization failed, using default settings: {e}")
+                logger.warning("Failed to set up recalculation (%s): %s", profile.recalculation, e)
+            
+            # Process each visible worksheet
+            if profile.optimize_layout:
+                try:
+                    with timer.stage("layout"):
+                        for sheet in workbook.Worksheets:
+                            if sheet.Visible:
+                                self._optimize_sheet_layout(sheet)
+                except Exception as e:
+                    logger.warning("Layout optimization failed, using default settings: %s", e)
             
             # Export as PDF
             try:
-                workbook.ExportAsFixedFormat(
-                    Type=0,  # xlTypePDF
-                    Filename=output_abs,
-                    Quality=0,  # xlQualityStandard
-                    IncludeDocProperties=True,
-                    IgnorePrintAreas=False,
-                    OpenAfterPublish=False
-                )
-                logger.info(f"Excel conversion successful: {output_abs}")
-                return ConversionResult.success_result(
+                with timer.stage("export"):
+                    workbook.ExportAsFixedFormat(
+                        Type=0,  # xlTypePDF
+                        Filename=output_abs,
+                        Quality=xlQualityStandard if profile.print_quality else xlQualityMinimum,
+                        IncludeDocProperties=profile.document_properties,
+                        IgnorePrintAreas=False,
+                        OpenAfterPublish=False
+                    )
+                logger.info("Excel conversion successful: %s", output_abs)
+                return timer.attach(ConversionResult.success_result(
                     output_path=output_abs,
                     message=f"Successfully converted {os.path.basename(job.input_path)}"
-                )
+                ))
             except Exception as e:
                 raise ConversionError(f"Failed to export as PDF: {e}")
                 
-        except (ConversionError, OfficeApplicationError) as e:
-            logger.error(f"Excel conversion failed: {e}")
-            return ConversionResult.failure_result(error=e, message=str(e))
+        except (ConversionError, OfficeApplicationError, ValidationError) as e:
+            logger.error("Excel conversion failed: %s", e)
+            return timer.attach(ConversionResult.failure_result(error=e, message=str(e)))
             
         except Exception as e:
-            logger.error(f"Unexpected error during Excel conversion: {e}", exc_info=True)
-            return ConversionResult.failure_result(
+            logger.error("Unexpected error during Excel conversion: %s", e, exc_info=True)
+            return timer.attach(ConversionResult.failure_result(
                 error=e,
                 message=f"Unexpected error: {e}"
-            )
+            ))
             
         finally:
             # Cleanup
             if workbook:
                 try:
-                    workbook.Close(SaveChanges=False)
+                    with timer.stage("close"):
+                        workbook.Close(SaveChanges=False)
                 except:
                     pass
             if excel:
                 try:
-                    excel.Quit()
+                    with timer.stage("quit"):
+                        excel.Quit()
                 except:
                     pass
     
@@ -133,16 +161,22 @@ class ExcelAdapter(IConverter):
             col_count = used_range.Columns.Count
             row_count = used_range.Rows.Count
             
-            logger.debug(f"Sheet '{sheet.Name}': {row_count} rows x {col_count} columns")
+            # sheet.Name is a COM round trip; only fetch it when it will be logged
+            debug = logger.isEnabledFor(logging.DEBUG)
+            sheet_name = sheet.Name if debug else ""
+            if debug:
+                logger.debug("Sheet '%s': %s rows x %s columns", sheet_name, row_count, col_count)
             
             # Decision 1: Orientation
             # If more than 8 columns, use landscape
             if col_count > 8:
                 sheet.PageSetup.Orientation = xlLandscape
-                logger.debug(f"Sheet '{sheet.Name}': Set to Landscape (wide content)")
+                if debug:
+                    logger.debug("Sheet '%s': Set to Landscape (wide content)", sheet_name)
             else:
                 sheet.PageSetup.Orientation = xlPortrait
-                logger.debug(f"Sheet '{sheet.Name}': Set to Portrait")
+                if debug:
+                    logger.debug("Sheet '%s': Set to Portrait", sheet_name)
             
             # Decision 2: Scaling
             # Fit to page width, allow vertical overflow
@@ -165,8 +199,9 @@ class ExcelAdapter(IConverter):
             sheet.PageSetup.CenterHorizontally = True
             sheet.PageSetup.CenterVertically = False
             
-            logger.debug(f"Sheet '{sheet.Name}': Layout optimization complete")
+            if debug:
+                logger.debug("Sheet '%s': Layout optimization complete", sheet_name)
             
         except Exception as e:
-            logger.warning(f"Failed to optimize sheet '{sheet.Name}': {e}")
+            logger.warning("Failed to optimize sheet '%s': %s", sheet.Name, e)
             # Don't raise - use default settings if optimization fails
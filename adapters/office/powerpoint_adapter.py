@@ -2,21 +2,60 @@
 PowerPoint to PDF converter adapter.
 """
 import os
+import time
 import win32com.client
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from core.interfaces.converter import IConverter
 from core.models.conversion_job import ConversionJob, ConversionResult
-from utils.exceptions import ConversionError, OfficeApplicationError
+from core.models.export_profile import ExportProfile, export_profile_for
+from core.services.pdf_merger import MergeError
+from core.services.slide_shards import (
+    SLIDE_COSTS, SLIDE_SHARDS_OPTION, TARGET_SHARD_SECONDS, SlideCostModel, merge_shards, plan_slide_shards,
+    shard_paths, shardable
+)
+from utils.exceptions import ConversionError, OfficeApplicationError, ValidationError
 from utils.logging import get_logger
+from utils.threading import com_apartment
+from utils.timing import StageTimer
 
 logger = get_logger(__name__)
 
+# PowerPoint constants
+ppFixedFormatTypePDF = 2
+ppFixedFormatIntentScreen = 1
+ppFixedFormatIntentPrint = 2
+ppPrintSlideRange = 4
+
 
 class PowerPointAdapter(IConverter):
     """
     Adapter for converting PowerPoint files to PDF using COM automation.
+    
+    PowerPoint runs one instance per user session that every conversion
+    attaches to, so the adapter closes only its presentation and never
+    quits the application: a Quit would end the presentations other
+    workers have open in the same instance.
+    
+    With the "slide_shards" job option set to N > 1, a deck whose measured
+    export cost is long enough is exported as slide ranges by up to N
+    PowerPoint sessions and the parts are merged in order. The merged PDF
+    has no outline or structure tags, so only untagged, non-PDF/A exports
+    (the draft profile) are sharded. The sessions share the one instance,
+    which serializes their exports: sharding does not make a deck faster
+    (the ppt_shards benchmark measures its small overhead), it bounds a
+    failed export to one slide range, which is retried on its own.
     """
     
+    def __init__(self, slide_costs: Optional[SlideCostModel] = None, shard_target_seconds: float = TARGET_SHARD_SECONDS):
+        """
+        Args:
+            slide_costs: Per-slide export cost estimate (default: shared by all instances)
+            shard_target_seconds: Export time each shard should take
+        """
+        self.slide_costs = slide_costs or SLIDE_COSTS
+        self.shard_target_seconds = shard_target_seconds
+    
     def supported_extensions(self) -> List[str]:
         """Returns supported PowerPoint extensions."""
         return ['.ppt', '.pptx']
@@ -26,20 +65,25 @@ class PowerPointAdapter(IConverter):
         Convert a PowerPoint file to PDF.
         
         Args:
-            job: Conversion job with input/output paths
+            job: Conversion job with input/output paths (options["export_profile"]
+                 selects the export settings, see core.models.export_profile;
+                 options["slide_shards"] allows a sharded export)
             
         Returns:
             ConversionResult indicating success or failure
         """
         powerpoint = None
         deck = None
+        timer = StageTimer()
         
         try:
-            logger.info(f"Starting PowerPoint conversion: {job.input_path}")
+            profile = export_profile_for(job.options)
+            logger.info("Starting PowerPoint conversion (%s): %s", profile.name, job.input_path)
             
             # Initialize PowerPoint application
             try:
-                powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+                with timer.stage("dispatch"):
+                    powerpoint = win32com.client.Dispatch("PowerPoint.Application")
             except Exception as e:
                 raise OfficeApplicationError(
                     f"Failed to initialize PowerPoint. Ensure it is installed. Error: {e}"
@@ -50,41 +94,151 @@ class PowerPointAdapter(IConverter):
             output_abs = os.path.abspath(job.output_path)
             
             try:
-                deck = powerpoint.Presentations.Open(input_abs, WithWindow=False)
+                with timer.stage("open"):
+                    deck = powerpoint.Presentations.Open(input_abs, WithWindow=False)
             except Exception as e:
                 raise ConversionError(f"Failed to open presentation: {e}")
             
-            # Save as PDF (format code 32 = ppSaveAsPDF)
+            # Export as PDF (unlike SaveAs, ExportAsFixedFormat takes quality and tagging options)
             try:
-                deck.SaveAs(output_abs, 32)
-                logger.info(f"PowerPoint conversion successful: {output_abs}")
-                return ConversionResult.success_result(
+                sessions = int(job.options.get(SLIDE_SHARDS_OPTION) or 0)
+                ranges = None
+                if sessions > 1 and shardable(profile):
+                    slide_count = deck.Slides.Count
+                    # Until a deck has been timed there is no measured cost to plan with
+                    ranges = plan_slide_shards(
+                        slide_count, self.slide_costs.seconds_per_slide,
+                        target_seconds=self.shard_target_seconds
+                    ) if self.slide_costs.measured else [(1, slide_count)]
+                if ranges and len(ranges) > 1:
+                    with timer.stage("export"):
+                        self._export_shards(deck, input_abs, output_abs, profile, ranges, sessions)
+                    with timer.stage("merge"):
+                        merge_shards(shard_paths(output_abs, len(ranges)), output_abs)
+                else:
+                    start = time.perf_counter()
+                    with timer.stage("export"):
+                        self._export(deck, output_abs, profile)
+                    if ranges:
+                        self.slide_costs.observe(ranges[0][1], time.perf_counter() - start)
+                logger.info("PowerPoint conversion successful: %s", output_abs)
+                return timer.attach(ConversionResult.success_result(
                     output_path=output_abs,
                     message=f"Successfully converted {os.path.basename(job.input_path)}"
-                )
+                ))
+            except ConversionError:
+                raise
+            except MergeError as e:
+                raise ConversionError(f"Failed to merge slide ranges: {e}")
             except Exception as e:
-                raise ConversionError(f"Failed to save as PDF: {e}")
+                raise ConversionError(f"Failed to export as PDF: {e}")
                 
-        except (ConversionError, OfficeApplicationError) as e:
-            logger.error(f"PowerPoint conversion failed: {e}")
-            return ConversionResult.failure_result(error=e, message=str(e))
+        except (ConversionError, OfficeApplicationError, ValidationError) as e:
+            logger.error("PowerPoint conversion failed: %s", e)
+            return timer.attach(ConversionResult.failure_result(error=e, message=str(e)))
             
         except Exception as e:
-            logger.error(f"Unexpected error during PowerPoint conversion: {e}", exc_info=True)
-            return ConversionResult.failure_result(
+            logger.error("Unexpected error during PowerPoint conversion: %s", e, exc_info=True)
+            return timer.attach(ConversionResult.failure_result(
                 error=e,
                 message=f"Unexpected error: {e}"
-            )
+            ))
             
         finally:
             # Cleanup
             if deck:
                 try:
-                    deck.Close()
+                    with timer.stage("close"):
+                        deck.Close()
                 except:
                     pass
-            if powerpoint:
+    
+    def _export(self, deck, output_path: str, profile: ExportProfile, slide_range: Tuple[int, int] = None):
+        """Export a presentation, or one slide range of it, as PDF."""
+        kwargs = {}
+        if slide_range is not None:
+            ranges = deck.PrintOptions.Ranges
+            ranges.ClearAll()
+            kwargs = {"RangeType": ppPrintSlideRange, "PrintRange": ranges.Add(*slide_range)}
+        deck.ExportAsFixedFormat(
+            Path=output_path,
+            FixedFormatType=ppFixedFormatTypePDF,
+            Intent=ppFixedFormatIntentPrint if profile.print_quality else ppFixedFormatIntentScreen,
+            IncludeDocProperties=profile.document_properties,
+            DocStructureTags=profile.structure_tags,
+            BitmapMissingFonts=True,
+            UseISO19005_1=profile.pdfa,
+            **kwargs
+        )
+    
+    def _export_shards(self, deck, input_abs: str, output_abs: str, profile: ExportProfile,
+                       ranges: List[Tuple[int, int]], sessions: int):
+        """
+        Export slide ranges to their part files: the first with the already
+        open deck, the others by helper sessions (each in its own thread).
+        
+        Raises:
+            ConversionError: If a slide range fails twice
+        """
+        paths = shard_paths(output_abs, len(ranges))
+        logger.info(
+            "Exporting %s as %d slide ranges (%s) with up to %d sessions",
+            os.path.basename(input_abs), len(ranges),
+            ", ".join(f"{first}-{last}" for first, last in ranges), sessions
+        )
+        helpers = max(1, min(sessions, len(ranges)) - 1)
+        try:
+            with ThreadPoolExecutor(max_workers=helpers, thread_name_prefix="SlideShard") as pool:
+                futures = [
+                    pool.submit(self._export_shard_session, input_abs, path, profile, slide_range)
+                    for path, slide_range in zip(paths[1:], ranges[1:])
+                ]
+                self._export_shard(lambda: deck, paths[0], profile, ranges[0])
+                for future in futures:
+                    future.result()
+        except Exception:
+            for path in paths:
                 try:
-                    powerpoint.Quit()
-                except:
+                    os.remove(path)
+                except OSError:
                     pass
+            raise
+    
+    def _export_shard_session(self, input_abs: str, path: str, profile: ExportProfile, slide_range: Tuple[int, int]):
+        """Open the deck in a helper session and export one slide range (helper thread)."""
+        with com_apartment():
+            powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+            deck = None
+            
+            def open_deck():
+                nonlocal deck
+                if deck is None:
+                    deck = powerpoint.Presentations.Open(input_abs, ReadOnly=True, WithWindow=False)
+                return deck
+            
+            try:
+                self._export_shard(open_deck, path, profile, slide_range)
+            finally:
+                # No Quit: the session is the instance the main export is using
+                if deck is not None:
+                    try:
+                        deck.Close()
+                    except Exception:
+                        pass
+    
+    def _export_shard(self, get_deck, path: str, profile: ExportProfile, slide_range: Tuple[int, int]):
+        """Export one slide range, retrying once."""
+        first, last = slide_range
+        for attempt in (1, 2):
+            try:
+                deck = get_deck()
+                # Only the export is timed: a helper session's Open is not per-slide cost
+                start = time.perf_counter()
+                self._export(deck, path, profile, slide_range)
+            except Exception as e:
+                if attempt == 2:
+                    raise ConversionError(f"Failed to export slides {first}-{last}: {e}")
+                logger.warning("Export of slides %d-%d failed, retrying: %s", first, last, e)
+                continue
+            self.slide_costs.observe(last - first + 1, time.perf_counter() - start)
+            return
@@ -6,8 +6,10 @@ import win32com.client
 from typing import List
 from core.interfaces.converter import IConverter
 from core.models.conversion_job import ConversionJob, ConversionResult
-from utils.exceptions import ConversionError, OfficeApplicationError
+from core.models.export_profile import export_profile_for
+from utils.exceptions import ConversionError, OfficeApplicationError, ValidationError
 from utils.logging import get_logger
+from utils.timing import StageTimer
 
 logger = get_logger(__name__)
 
@@ -26,21 +28,26 @@ class WordAdapter(IConverter):
         Convert a Word document to PDF.
         
         Args:
-            job: Conversion job with input/output paths
+            job: Conversion job with input/output paths (options["export_profile"]
+                 selects the export settings, see core.models.export_profile)
             
         Returns:
             ConversionResult indicating success or failure
         """
         word = None
         doc = None
+        timer = StageTimer()
         
         try:
-            logger.info(f"Starting Word conversion: {job.input_path}")
+            profile = export_profile_for(job.options)
+            logger.info("Starting Word conversion (%s): %s", profile.name, job.input_path)
             
             # Initialize Word application (headless)
             try:
-                word = win32com.client.Dispatch("Word.Application")
-                word.Visible = False
+                with timer.stage("dispatch"):
+                    word = win32com.client.Dispatch("Word.Application")
+                    word.Visible = False
+                    word.ScreenUpdating = profile.screen_updating
             except Exception as e:
                 raise OfficeApplicationError(
                     f"Failed to initialize Word. Ensure it is installed. Error: {e}"
@@ -51,48 +58,55 @@ class WordAdapter(IConverter):
             output_abs = os.path.abspath(job.output_path)
             
             try:
-                doc = word.Documents.Open(input_abs)
+                with timer.stage("open"):
+                    doc = word.Documents.Open(input_abs)
             except Exception as e:
                 raise ConversionError(f"Failed to open document: {e}")
             
             # Export as PDF (format code 17 = wdExportFormatPDF)
             try:
-                doc.ExportAsFixedFormat(
-                    OutputFileName=output_abs,
-                    ExportFormat=17,  # wdExportFormatPDF
-                    OpenAfterExport=False,
-                    OptimizeFor=0,  # Standard quality
-                    CreateBookmarks=1,  # Create bookmarks from headings
-                    DocStructureTags=True
-                )
-                logger.info(f"Word conversion successful: {output_abs}")
-                return ConversionResult.success_result(
+                with timer.stage("export"):
+                    doc.ExportAsFixedFormat(
+                        OutputFileName=output_abs,
+                        ExportFormat=17,  # wdExportFormatPDF
+                        OpenAfterExport=False,
+                        OptimizeFor=0 if profile.print_quality else 1,  # wdExportOptimizeForPrint / OnScreen
+                        CreateBookmarks=1 if profile.bookmarks else 0,  # wdExportCreateHeadingBookmarks / NoBookmarks
+                        DocStructureTags=profile.structure_tags,
+                        IncludeDocProps=profile.document_properties,
+                        BitmapMissingFonts=True,
+                        UseISO19005_1=profile.pdfa
+                    )
+                logger.info("Word conversion successful: %s", output_abs)
+                return timer.attach(ConversionResult.success_result(
                     output_path=output_abs,
                     message=f"Successfully converted {os.path.basename(job.input_path)}"
-                )
+                ))
             except Exception as e:
                 raise ConversionError(f"Failed to export as PDF: {e}")
                 
-        except (ConversionError, OfficeApplicationError) as e:
-            logger.error(f"Word conversion failed: {e}")
-            return ConversionResult.failure_result(error=e, message=str(e))
+        except (ConversionError, OfficeApplicationError, ValidationError) as e:
+            logger.error("Word conversion failed: %s", e)
+            return timer.attach(ConversionResult.failure_result(error=e, message=str(e)))
             
         except Exception as e:
-            logger.error(f"Unexpected error during Word conversion: {e}", exc_info=True)
-            return ConversionResult.failure_result(
+            logger.error("Unexpected error during Word conversion: %s", e, exc_info=True)
+            return timer.attach(ConversionResult.failure_result(
                 error=e,
                 message=f"Unexpected error: {e}"
-            )
+            ))
             
         finally:
             # Cleanup
             if doc:
                 try:
-                    doc.Close(SaveChanges=False)
+                    with timer.stage("close"):
+                        doc.Close(SaveChanges=False)
                 except:
                     pass
             if word:
                 try:
-                    word.Quit()
+                    with timer.stage("quit"):
+                        word.Quit()
                 except:
                     pass
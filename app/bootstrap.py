@@ -0,0 +1,51 @@
+"""
+Shared application wiring for the desktop and command-line entry points.
+"""
+from core.services.conversion_service import ConversionService
+from core.services.converter_registry import ConverterSpec
+from core.services.metrics import ConversionMetrics
+from core.services.output_verifier import OutputVerifier
+from core.services.preflight import Preflight
+from core.services.slide_shards import SLIDE_COSTS
+
+# Built-in converters, imported on first use (win32com is slow to import)
+BUILTIN_CONVERTERS = (
+    ConverterSpec("PowerPointAdapter", "adapters.office.powerpoint_adapter", (".ppt", ".pptx")),
+    ConverterSpec("WordAdapter", "adapters.office.word_adapter", (".doc", ".docx")),
+    ConverterSpec("ExcelAdapter", "adapters.office.excel_adapter", (".xls", ".xlsx", ".xlsm")),
+)
+
+
+def create_conversion_service(
+    verify_output: bool = True,
+    metrics: ConversionMetrics = None,
+    preflight: bool = True,
+    slide_costs_file: str = None
+) -> ConversionService:
+    """
+    Create a ConversionService with all Office converters registered.
+    
+    Args:
+        verify_output: Check every generated PDF for truncation before reporting success
+        metrics: Optional metrics fed by every conversion
+        preflight: Reject empty, corrupt, encrypted and locked inputs before Office opens them
+        slide_costs_file: JSON file keeping the measured per-slide PowerPoint export
+                          cost across runs (used to plan slide shards)
+    
+    Returns:
+        Configured ConversionService
+    """
+    service = ConversionService(
+        verifier=OutputVerifier() if verify_output else None,
+        metrics=metrics,
+        preflight=Preflight() if preflight else None
+    )
+    
+    if slide_costs_file:
+        SLIDE_COSTS.persist_to(slide_costs_file)
+    
+    # Register converters (Dependency Injection)
+    for spec in BUILTIN_CONVERTERS:
+        service.register_lazy(spec)
+    
+    return service
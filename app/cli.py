@@ -0,0 +1,815 @@
+"""
+PdfConverter - Headless Command-Line Entry Point
+
+Converts Office documents to PDF without the desktop UI, for schedulers,
+scripts and remote sessions.
+
+Usage:
+    python -m app.cli INPUT [INPUT ...] -o OUTPUT_DIR [options]
+    python -m app.cli [INPUT ...] --queue SHARED_DIR -o OUTPUT_DIR [options]   (one per node)
+
+Exit codes:
+    0  All files converted (or skipped as up to date)
+    1  One or more conversions failed
+    2  Invalid command-line arguments or manifest
+    3  No convertible input files found
+    4  Fatal error (e.g. output folder or report cannot be created)
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set
+from app.config import APP_NAME, APP_VERSION, LOG_LEVEL, LOG_FILE, LOG_FORMAT, SLIDE_COSTS_FILE
+from core.models.conversion_job import ConversionJob
+from core.models.export_profile import DEFAULT_EXPORT_PROFILE, EXPORT_PROFILE_OPTION, EXPORT_PROFILES
+from core.services.slide_shards import SLIDE_SHARDS_OPTION
+from core.services.batch_runner import BatchRunner, BatchSummary, JobOutcome
+from core.services.concurrency import ConcurrencyPolicy
+from core.services.conversion_service import ConversionService
+from core.services.file_scanner import FileScanner
+from core.services.manifest import ManifestEntry, ManifestJobSource, iter_manifest
+from core.services.metrics import ConversionMetrics
+from core.services.metrics_export import MetricsHttpServer, MetricsSnapshotWriter
+from core.services.output_layout import LAYOUTS, LAYOUT_FLAT, MAX_SHARD_LEVELS, OutputPlanner
+from core.services.pdf_merger import MergeError, MERGE_ORDERS, ORDER_INPUT, merge_pdfs
+from core.services.profiling import JobProfiler
+from core.services.progress import ProgressBus, LoggingProgressSubscriber
+from core.services.shared_queue import DEFAULT_LEASE_SECONDS, SharedJobQueue, format_node_table
+from core.services.staging import DEFAULT_SCRATCH_LIMIT, StagingArea
+from core.services.trace import TraceRecorder
+from core.services.zip_packager import (
+    COMPRESSION_DEFLATE, COMPRESSION_MODES, PackagingError, ZipPackager
+)
+from utils.exceptions import ValidationError
+from utils.logging import LOG_FORMATS, setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+EXIT_OK = 0
+EXIT_CONVERSION_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_INPUT = 3
+EXIT_FATAL = 4
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description=f"{APP_NAME} v{APP_VERSION} - convert Office documents to PDF without the UI."
+    )
+    parser.add_argument(
+        "inputs", nargs="*",
+        help="Input folders, files or glob patterns (e.g. 'reports/**/*.docx')"
+    )
+    parser.add_argument(
+        "-m", "--manifest",
+        help="CSV or JSONL manifest listing jobs (input, output_name, output_folder, options)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Output folder for the generated PDFs (created if missing; required unless --queue-status); "
+             "manifest rows may override it per job"
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="Scan input folders recursively"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Number of parallel conversion workers (default: 1); with --max-workers, the number to start with"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, metavar="N",
+        help="Adapt the number of active workers between --min-workers and N during the batch, "
+             "from throughput, system CPU/memory load and failure rate"
+    )
+    parser.add_argument(
+        "--min-workers", type=int, default=1, metavar="N",
+        help="Lowest number of active workers with --max-workers (default: 1)"
+    )
+    parser.add_argument(
+        "--include", default="",
+        help="Comma-separated extensions or types to convert (e.g. 'docx,xlsx' or 'word,excel')"
+    )
+    parser.add_argument(
+        "--exclude", default="",
+        help="Comma-separated extensions or types to skip"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Skip files whose PDF already exists and is newer than the source"
+    )
+    parser.add_argument(
+        "--report",
+        help="Write a machine-readable report to this path"
+    )
+    parser.add_argument(
+        "--report-format", choices=("json", "jsonl"),
+        help="Report format (default: inferred from the report file extension, else json)"
+    )
+    parser.add_argument(
+        "--merge",
+        help="After converting, merge all generated PDFs into this file (one bookmark per source)"
+    )
+    parser.add_argument(
+        "--merge-order", choices=MERGE_ORDERS, default=ORDER_INPUT,
+        help="Order of documents in the merged PDF (default: input)"
+    )
+    parser.add_argument(
+        "--layout", choices=LAYOUTS, default=LAYOUT_FLAT,
+        help="Output folder layout: flat, mirror (recreate source folders) or "
+             "sharded (hash-named subfolders for very large batches) (default: flat)"
+    )
+    parser.add_argument(
+        "--shard-levels", type=int, default=1,
+        help=f"Nested subfolder levels for --layout sharded, 256 folders each, 1-{MAX_SHARD_LEVELS} (default: 1)"
+    )
+    parser.add_argument(
+        "--zip", nargs="?", const="", metavar="ARCHIVE",
+        help="Also add each PDF to a ZIP archive as it finishes "
+             "(default: <output folder name>.zip inside the output folder)"
+    )
+    parser.add_argument(
+        "--zip-compression", choices=sorted(COMPRESSION_MODES), default=COMPRESSION_DEFLATE,
+        help="Compression for --zip (default: deflate)"
+    )
+    parser.add_argument(
+        "--queue", metavar="DIR",
+        help="Share the batch with other nodes through this shared queue folder: the given inputs "
+             "are queued, then this node converts jobs from the queue until it is drained "
+             "(with no inputs, it only converts)"
+    )
+    parser.add_argument(
+        "--node-id",
+        help="Name of this node in the queue (default: <host>-<pid>)"
+    )
+    parser.add_argument(
+        "--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+        help="Seconds without heartbeat after which another node takes over a claimed job; "
+             f"must exceed the clock skew between nodes (default: {DEFAULT_LEASE_SECONDS:.0f})"
+    )
+    parser.add_argument(
+        "--queue-status", action="store_true",
+        help="Print the job counts and per-node throughput of --queue and exit"
+    )
+    parser.add_argument(
+        "--stage-dir", metavar="DIR",
+        help="Copy inputs to this local folder before converting and upload PDFs in the background "
+             "(for inputs or outputs on network shares)"
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=4,
+        help="Number of inputs to copy ahead when staging (default: 4)"
+    )
+    parser.add_argument(
+        "--scratch-limit-mb", type=int, default=DEFAULT_SCRATCH_LIMIT // (1024 * 1024),
+        help=f"Maximum size of the staging folder in MB (default: {DEFAULT_SCRATCH_LIMIT // (1024 * 1024)})"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while the batch runs"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write a JSON metrics snapshot to this file every 15 seconds and at the end"
+    )
+    parser.add_argument(
+        "--trace",
+        help="Record every conversion (type, size, pages, stage timings, outcome) to this workload trace "
+             "for `python -m app.replay` (gzip-compressed if it ends in .gz)"
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="all", metavar="SELECT",
+        help="Profile conversions (cProfile, memory, COM call counts); optionally only these "
+             "converters or extensions, e.g. ExcelAdapter,.xlsb"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Folder for profile files (default: <output>/profiles)"
+    )
+    parser.add_argument(
+        "--export-profile", choices=list(EXPORT_PROFILES), default=None,
+        help=(
+            "Export settings: draft (fast, small, screen quality), standard or archival "
+            f"(PDF/A, full recalculation); manifest options may override it (default: {DEFAULT_EXPORT_PROFILE})"
+        )
+    )
+    parser.add_argument(
+        "--slide-shards", type=int, default=0, metavar="N",
+        help=(
+            "Export very large PowerPoint decks as up to N slide ranges in separate "
+            "PowerPoint sessions and merge the parts; draft profile only, as the merge "
+            "drops tags and bookmarks (default: 0, one export call)"
+        )
+    )
+    parser.add_argument(
+        "--no-verify", action="store_true",
+        help="Skip the truncation check on generated PDFs"
+    )
+    parser.add_argument(
+        "--no-preflight", action="store_true",
+        help="Skip the content check that rejects empty, corrupt, encrypted and locked inputs before Office opens them"
+    )
+    parser.add_argument(
+        "--log-level", default=LOG_LEVEL,
+        help=f"Logging level (default: {LOG_LEVEL})"
+    )
+    parser.add_argument(
+        "--log-format", choices=LOG_FORMATS, default=LOG_FORMAT,
+        help=f"Log output format; json writes one object per line with job id, converter and stage (default: {LOG_FORMAT})"
+    )
+    return parser
+
+
+def parse_type_filter(value: str, service: ConversionService) -> Set[str]:
+    """
+    Expand a comma-separated type filter into a set of extensions.
+
+    Tokens may be extensions ('docx', '.docx') or converter type names
+    ('word', 'excel', 'powerpoint').
+
+    Args:
+        value: Raw filter string
+        service: Service providing the registered converters
+
+    Returns:
+        Set of lower-case extensions including the dot
+
+    Raises:
+        ValueError: If a token matches no known extension or type
+    """
+    converters = service.get_available_converters()
+    by_type: Dict[str, List[str]] = {}
+    for ext, converter_name in converters.items():
+        by_type.setdefault(converter_name.replace("Adapter", "").lower(), []).append(ext)
+
+    extensions = set()
+    for token in filter(None, (t.strip().lower() for t in value.split(","))):
+        if token in by_type:
+            extensions.update(by_type[token])
+            continue
+        ext = token if token.startswith(".") else f".{token}"
+        if ext not in converters:
+            raise ValueError(f"Unknown file type: {token}")
+        extensions.add(ext)
+    return extensions
+
+
+def collect_inputs(patterns: Iterable[str], scanner: FileScanner, recursive: bool) -> List[str]:
+    """
+    Resolve folders, files and glob patterns into a list of supported files.
+
+    Args:
+        patterns: Input arguments from the command line
+        scanner: Scanner configured with the extensions to convert
+        recursive: Whether folders are scanned recursively
+
+    Returns:
+        Absolute file paths in input order, without duplicates
+    """
+    seen = set()
+    files = []
+
+    def add(path: str):
+        path = os.path.abspath(path)
+        key = os.path.normcase(path)
+        if key not in seen:
+            seen.add(key)
+            files.append(path)
+
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            logger.warning(f"No match for input: {pattern}")
+        for match in sorted(matches):
+            if os.path.isdir(match):
+                try:
+                    for entry in scanner.iter_entries(match, recursive=recursive):
+                        add(entry.path)
+                except OSError as e:
+                    logger.error(f"Error scanning folder {match}: {e}")
+            elif os.path.isfile(match):
+                if os.path.splitext(match)[1].lower() in scanner.supported_extensions:
+                    add(match)
+            else:
+                logger.warning(f"Input not found: {match}")
+    return files
+
+
+def is_up_to_date(job: ConversionJob) -> bool:
+    """
+    Check whether a job's PDF exists and is at least as new as its source.
+
+    Args:
+        job: Conversion job
+
+    Returns:
+        True if the conversion can be skipped
+    """
+    try:
+        return os.path.getmtime(job.output_path) >= os.path.getmtime(job.input_path)
+    except OSError:
+        return False
+
+
+class ReportWriter:
+    """
+    Thread-safe streaming writer for the JSON / JSONL batch report.
+
+    Records are written as they arrive, so memory use does not grow with
+    the batch size. In JSON mode the document is
+    {"files": [...], "summary": {...}}; in JSONL mode every line is a file
+    record and the last line is {"summary": {...}}.
+    """
+
+    def __init__(self, stream: IO[str], fmt: str):
+        """
+        Initialize the writer.
+
+        Args:
+            stream: Text stream to write to
+            fmt: 'json' or 'jsonl'
+        """
+        self._stream = stream
+        self._fmt = fmt
+        self._lock = threading.Lock()
+        self._count = 0
+        if fmt == "json":
+            self._stream.write('{"files": [\n')
+
+    def write(self, record: dict):
+        """Append one file record."""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._fmt == "json":
+                self._stream.write(("  " if self._count == 0 else ",\n  ") + line)
+            else:
+                self._stream.write(line + "\n")
+            self._count += 1
+
+    def close(self, summary: dict):
+        """Write the summary and close the stream."""
+        with self._lock:
+            if self._fmt == "json":
+                self._stream.write('\n], "summary": ' + json.dumps(summary, ensure_ascii=False) + "}\n")
+            else:
+                self._stream.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+            self._stream.close()
+
+
+def report_record(
+    input_path: str,
+    output_path: Optional[str],
+    status: str,
+    message: str,
+    job_id: Optional[str] = None,
+    started_at: Optional[float] = None,
+    duration: float = 0.0,
+    input_bytes: Optional[int] = None,
+    output_bytes: Optional[int] = None,
+    pages: Optional[int] = None,
+    converter: Optional[str] = None,
+    stages: Optional[dict] = None,
+    error: Optional[BaseException] = None,
+    error_type: Optional[str] = None
+) -> dict:
+    """
+    Build one report record; every record has the same keys, whatever its status.
+
+    Args:
+        input_path: Input file
+        output_path: PDF path (None if no job could be created)
+        status: 'converted', 'failed' or 'skipped'
+        message: Human-readable outcome
+        job_id: Job id (None if no job could be created)
+        started_at: Start time (time.time()), None if the job never ran
+        duration: Seconds spent converting
+        input_bytes: Size of the input file
+        output_bytes: Size of the PDF
+        pages: Page count of the PDF
+        converter: Converter class name
+        stages: Seconds per conversion stage
+        error: Exception of a failed job (gives error_type and error_code)
+        error_type: Error type name when there is no exception object
+
+    Returns:
+        JSON-serializable dict
+    """
+    return {
+        "job_id": job_id,
+        "input": input_path,
+        "output": output_path,
+        "status": status,
+        "started_at": (
+            datetime.fromtimestamp(started_at).isoformat(timespec="milliseconds") if started_at is not None else None
+        ),
+        "duration_seconds": round(duration, 4),
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "pages": pages,
+        "converter": converter or None,
+        "stages": {stage: round(seconds, 4) for stage, seconds in (stages or {}).items()},
+        "message": message,
+        "error_type": type(error).__name__ if error is not None else error_type,
+        "error_code": getattr(error, "code", None),
+    }
+
+
+def outcome_record(outcome: JobOutcome) -> dict:
+    """
+    Build the report record for a finished job.
+
+    Args:
+        outcome: Finished job with timing
+
+    Returns:
+        JSON-serializable dict
+    """
+    result = outcome.result
+    return report_record(
+        outcome.job.input_path,
+        result.output_path or outcome.job.output_path,
+        "converted" if result.success else "failed",
+        result.message,
+        job_id=outcome.job.job_id,
+        started_at=outcome.started_at,
+        duration=outcome.duration,
+        input_bytes=outcome.input_bytes,
+        output_bytes=result.output_bytes if result.success else None,
+        pages=result.page_count,
+        converter=result.converter,
+        stages=result.stage_timings,
+        error=result.error
+    )
+
+
+def skipped_record(job: ConversionJob) -> dict:
+    """Build the report record for a job skipped by incremental mode."""
+    return report_record(job.input_path, job.output_path, "skipped", "Output is up to date", job_id=job.job_id)
+
+
+def print_queue_status(queue_dir: str, lease_seconds: float) -> int:
+    """
+    Print the job counts and per-node throughput of a shared queue.
+
+    Returns:
+        Process exit code
+    """
+    if not os.path.isdir(queue_dir):
+        print(f"No queue folder: {queue_dir}", file=sys.stderr)
+        return EXIT_USAGE
+    queue = SharedJobQueue(queue_dir, node_id="status", lease_seconds=lease_seconds)
+    counts = queue.counts()
+    print(f"{queue.queue_dir}: {counts['pending']} pending, {counts['claimed']} claimed, {counts['done']} done")
+    nodes = queue.node_stats()
+    if nodes:
+        print(format_node_table(nodes, lease_seconds))
+    return EXIT_OK
+
+
+def run(argv: Optional[List[str]] = None, service: Optional[ConversionService] = None) -> int:
+    """
+    Run the command-line converter.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+        service: Conversion service to use (defaults to one with all Office converters)
+
+    Returns:
+        Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    setup_logging(log_level=args.log_level, log_file=LOG_FILE, log_format=args.log_format)
+    logger.info(f"Starting {APP_NAME} v{APP_VERSION} (command line)")
+
+    if args.queue_status:
+        if not args.queue:
+            parser.error("--queue-status needs --queue")
+        return print_queue_status(args.queue, args.lease_seconds)
+
+    if not args.output:
+        parser.error("the following arguments are required: -o/--output")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_workers is not None and not 1 <= args.min_workers <= args.workers <= args.max_workers:
+        parser.error("--min-workers, --workers and --max-workers must satisfy 1 <= min <= workers <= max")
+    if not 1 <= args.shard_levels <= MAX_SHARD_LEVELS:
+        parser.error(f"--shard-levels must be between 1 and {MAX_SHARD_LEVELS}")
+    if args.slide_shards < 0:
+        parser.error("--slide-shards must not be negative")
+    if args.lease_seconds <= 0:
+        parser.error("--lease-seconds must be positive")
+    if args.queue and args.merge:
+        parser.error("--merge cannot be combined with --queue (each node only sees its own PDFs)")
+    if not args.inputs and not args.manifest and not args.queue:
+        parser.error("give input folders/files, --manifest or --queue")
+
+    if service is None:
+        try:
+            from app.bootstrap import create_conversion_service
+            service = create_conversion_service(
+                verify_output=not args.no_verify,
+                preflight=not args.no_preflight,
+                slide_costs_file=SLIDE_COSTS_FILE
+            )
+        except Exception as e:
+            logger.critical(f"Failed to initialize converters: {e}", exc_info=True)
+            return EXIT_FATAL
+
+    try:
+        included = parse_type_filter(args.include, service) if args.include else set(service.get_supported_extensions())
+        excluded = parse_type_filter(args.exclude, service) if args.exclude else set()
+    except ValueError as e:
+        parser.error(str(e))
+
+    scanner = FileScanner(included - excluded)
+    files = collect_inputs(args.inputs, scanner, args.recursive) if args.inputs else []
+    if args.inputs and not files and not args.manifest:
+        logger.error("No convertible input files found")
+        return EXIT_NO_INPUT
+
+    try:
+        os.makedirs(args.output, exist_ok=True)
+        output_folder = os.path.abspath(args.output)
+    except OSError as e:
+        logger.critical(f"Failed to create output folder: {e}")
+        return EXIT_FATAL
+
+    try:
+        planner = OutputPlanner(output_folder, layout=args.layout, shard_levels=args.shard_levels)
+        planned_outputs = planner.plan_all(files)
+    except OSError as e:
+        logger.critical(f"Failed to create output folders: {e}")
+        return EXIT_FATAL
+
+    # Resources released in reverse order on every exit path
+    cleanup = contextlib.ExitStack()
+
+    manifest_entries = None
+    if args.manifest:
+        try:
+            manifest_entries = iter_manifest(args.manifest)
+        except (OSError, ValidationError) as e:
+            logger.critical(f"Failed to read manifest: {e}")
+            return EXIT_USAGE
+        cleanup.callback(manifest_entries.close)
+
+    if args.metrics_port is not None or args.metrics_file:
+        if service.metrics is None:
+            service.metrics = ConversionMetrics()
+        if args.metrics_file:
+            snapshots = MetricsSnapshotWriter(service.metrics.registry, args.metrics_file)
+            snapshots.start()
+            cleanup.callback(snapshots.stop)
+        if args.metrics_port is not None:
+            try:
+                metrics_server = MetricsHttpServer(service.metrics.registry, port=args.metrics_port)
+            except OSError as e:
+                logger.critical(f"Failed to start metrics endpoint: {e}")
+                cleanup.close()
+                return EXIT_FATAL
+            metrics_server.start()
+            cleanup.callback(metrics_server.stop)
+
+    if args.profile:
+        selectors = None
+        if args.profile.lower() != "all":
+            selectors = {item.strip().lower() for item in args.profile.split(",") if item.strip()}
+        service.profiler = JobProfiler(args.profile_dir or os.path.join(output_folder, "profiles"), selectors)
+
+    if args.trace:
+        try:
+            service.trace = TraceRecorder(args.trace)
+        except OSError as e:
+            logger.critical(f"Failed to create trace file: {e}")
+            cleanup.close()
+            return EXIT_FATAL
+        cleanup.callback(service.trace.close)
+
+    packager = None
+    if args.zip is not None:
+        archive = args.zip or os.path.join(output_folder, os.path.basename(output_folder) + ".zip")
+        try:
+            # Incremental runs continue the archive of an earlier (possibly interrupted) run
+            packager = ZipPackager(archive, compression=args.zip_compression, resume=args.incremental)
+        except PackagingError as e:
+            logger.critical(str(e))
+            cleanup.close()
+            return EXIT_FATAL
+        cleanup.callback(packager.close)
+
+    queue = None
+    if args.queue:
+        try:
+            queue = SharedJobQueue(args.queue, node_id=args.node_id, lease_seconds=args.lease_seconds)
+        except (OSError, ValueError) as e:
+            logger.critical(f"Failed to open queue folder: {e}")
+            cleanup.close()
+            return EXIT_FATAL
+        # Closed after staging: PDFs still uploading complete their claims first
+        cleanup.callback(queue.close)
+
+    staging = None
+    if args.stage_dir:
+        try:
+            staging = StagingArea(
+                args.stage_dir,
+                prefetch=args.prefetch,
+                max_scratch_bytes=args.scratch_limit_mb * 1024 * 1024,
+                screen=service.screen
+            )
+        except OSError as e:
+            logger.critical(f"Failed to create staging folder: {e}")
+            cleanup.close()
+            return EXIT_FATAL
+        # Closed before the archive: pending uploads still add to it
+        cleanup.callback(staging.close)
+
+    report = None
+    if args.report:
+        fmt = args.report_format or ("jsonl" if args.report.lower().endswith(".jsonl") else "json")
+        try:
+            report = ReportWriter(open(args.report, "w", encoding="utf-8"), fmt)
+        except OSError as e:
+            logger.critical(f"Failed to create report file: {e}")
+            cleanup.close()
+            return EXIT_FATAL
+
+    def package(pdf_path: str, skipped: bool = False):
+        rel = os.path.relpath(pdf_path, output_folder)
+        arcname = os.path.basename(pdf_path) if rel.startswith(os.pardir) or os.path.isabs(rel) else rel
+        if skipped and packager.contains(arcname):
+            return
+        try:
+            packager.add(pdf_path, arcname)
+        except PackagingError as e:
+            logger.error(str(e))
+            counts["zip_errors"] += 1
+
+    counts = {"inputs": 0, "skipped": 0, "invalid": 0, "zip_errors": 0}
+
+    def reject(path: str, message: str, error_type: str):
+        counts["inputs"] += 1
+        counts["invalid"] += 1
+        if report:
+            report.write(report_record(path, None, "failed", message, error_type=error_type))
+
+    job_options = {}
+    if args.export_profile:
+        job_options[EXPORT_PROFILE_OPTION] = args.export_profile
+    if args.slide_shards > 1:
+        job_options[SLIDE_SHARDS_OPTION] = args.slide_shards
+    job_options = job_options or None
+
+    def scanned_jobs() -> Iterator[ConversionJob]:
+        for path, output_path in zip(files, planned_outputs):
+            try:
+                yield OutputPlanner.job_for(service, path, output_path, job_options)
+            except Exception as e:
+                logger.error(f"Cannot create job for {path}: {e}")
+                reject(path, str(e), type(e).__name__)
+
+    def filtered(entry: ManifestEntry):
+        counts["inputs"] += 1
+        counts["skipped"] += 1
+        if report:
+            report.write(report_record(entry.input_path, None, "skipped", "Excluded by --include/--exclude"))
+
+    def manifest_jobs() -> Iterator[ConversionJob]:
+        source = ManifestJobSource(
+            service,
+            default_output_folder=output_folder,
+            planner=planner,
+            on_error=lambda err: reject(err.input_path, f"Manifest line {err.line}: {err.reason}", "ManifestError"),
+            extensions=scanner.supported_extensions,
+            on_filtered=filtered
+        )
+        for job in source.iter_jobs(manifest_entries):
+            for key, value in (job_options or {}).items():
+                job.options.setdefault(key, value)
+            yield job
+
+    # Outputs to merge as ((runner sequence, kind, position), input, pdf), kept only when merging;
+    # an up-to-date output sorts just before the next job the runner gets
+    merge_sources = []
+
+    def all_jobs() -> Iterator[ConversionJob]:
+        """Lazily yield jobs to run, honouring incremental mode."""
+        sources = [scanned_jobs()]
+        if args.manifest:
+            sources.append(manifest_jobs())
+        yielded = 0
+        for source in sources:
+            for job in source:
+                counts["inputs"] += 1
+                if args.incremental and is_up_to_date(job):
+                    counts["skipped"] += 1
+                    if report:
+                        report.write(skipped_record(job))
+                    if packager:
+                        package(job.output_path, skipped=True)
+                    if args.merge:
+                        merge_sources.append(((yielded, 0, counts["inputs"]), job.input_path, job.output_path))
+                    continue
+                yielded += 1
+                yield job
+
+    logger.info(
+        ("Queueing" if queue else "Converting") + f" {len(files)} scanned file(s)"
+        + (f" plus manifest {args.manifest}" if args.manifest else "")
+        + (f", then converting from {queue.queue_dir} as node {queue.node_id}" if queue else "")
+        + f" using {args.workers} worker(s)"
+        + (f" (adaptive, {args.min_workers}-{args.max_workers})" if args.max_workers else "")
+    )
+
+    progress = ProgressBus(max_rate_hz=1)
+    progress.subscribe(LoggingProgressSubscriber())
+
+    concurrency = None
+    if args.max_workers:
+        concurrency = ConcurrencyPolicy(min_workers=args.min_workers, max_workers=args.max_workers)
+    runner = BatchRunner(service, num_workers=args.workers, progress=progress, staging=staging, concurrency=concurrency)
+
+    def on_outcome(outcome: JobOutcome):
+        if queue:
+            queue.complete(outcome.job, outcome.result, outcome.duration)
+        if report:
+            report.write(outcome_record(outcome))
+        if packager and outcome.result.success:
+            package(outcome.result.output_path or outcome.job.output_path)
+        if args.merge and outcome.result.success:
+            merge_sources.append(((outcome.sequence, 1, 0), outcome.job.input_path, outcome.result.output_path))
+
+    summary = BatchSummary()
+    try:
+        if queue:
+            if args.inputs or args.manifest:
+                queued = queue.enqueue(all_jobs())
+                logger.info(f"Queued {queued} job(s) in {queue.queue_dir}")
+            queue.start()
+            jobs, total = queue.iter_jobs(), None
+        else:
+            jobs, total = all_jobs(), None if (args.manifest or args.incremental) else len(files)
+        summary = runner.run(jobs, on_outcome=on_outcome, total=total)
+    except OSError as e:
+        logger.critical(f"Failed to {'queue jobs' if queue else 'run batch'}: {e}")
+        return EXIT_FATAL
+    except KeyboardInterrupt:
+        logger.warning("Interrupted")
+        raise
+    finally:
+        cleanup.close()
+        if report:
+            report.close({
+                "inputs": counts["inputs"],
+                "converted": summary.succeeded,
+                "failed": summary.failed + counts["invalid"],
+                "skipped": counts["skipped"],
+                "elapsed_seconds": round(summary.elapsed, 3),
+                "workers": args.workers,
+                "max_workers": args.max_workers,
+                "node": queue.node_id if queue else None,
+                "output_folder": output_folder,
+                "stages": summary.stages,
+            })
+
+    failed = summary.failed + counts["invalid"] + counts["zip_errors"]
+    if queue:
+        logger.info(f"Queue {queue.queue_dir}: {queue.counts()}\n"
+                    + format_node_table(queue.node_stats(), queue.lease_seconds))
+    elif counts["inputs"] == 0:
+        logger.error("No convertible input files found")
+        return EXIT_NO_INPUT
+
+    if args.merge and merge_sources:
+        merge_sources.sort()
+        try:
+            pages, skipped_pdfs = merge_pdfs(
+                [(source, pdf) for _, source, pdf in merge_sources],
+                args.merge,
+                order=args.merge_order
+            )
+            logger.info(f"Merged {len(merge_sources) - len(skipped_pdfs)} PDF(s), {pages} page(s) into {args.merge}")
+            failed += len(skipped_pdfs)
+        except (MergeError, OSError) as e:
+            logger.error(f"Merge failed: {e}")
+            failed += 1
+    logger.info(f"Done: {summary.succeeded} converted, {failed} failed, {counts['skipped']} skipped")
+    return EXIT_CONVERSION_FAILED if failed else EXIT_OK
+
+
+def main():
+    """Command-line entry point."""
+    sys.exit(run())
+
+
+if __name__ == "__main__":
+    main()
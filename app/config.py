@@ -12,10 +12,11 @@ APP_DESCRIPTION = "Production-grade Office to PDF converter"
 # Logging configuration
 LOG_LEVEL = os.getenv("PDFCONVERTER_LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("PDFCONVERTER_LOG_FILE", None)  # None = console only
+LOG_FORMAT = os.getenv("PDFCONVERTER_LOG_FORMAT", "text")  # text or json
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
-LOGS_DIR = PROJECT_ROOT / "logs"
+LOGS_DIR = PROJECT_ROOT / "logs"  # created by setup_logging when a log file is configured there
 
-# Ensure directories exist
-LOGS_DIR.mkdir(exist_ok=True)
+# Per-slide PowerPoint export cost measured by earlier runs (empty = not kept)
+SLIDE_COSTS_FILE = os.getenv("PDFCONVERTER_SLIDE_COSTS_FILE", str(LOGS_DIR / "slide_costs.json"))
@@ -4,31 +4,23 @@ PdfConverter v2.0 - Main Entry Point
 A production-grade Office to PDF converter following Clean Architecture principles.
 """
 import sys
-from app.config import APP_NAME, APP_VERSION, LOG_LEVEL, LOG_FILE
+from app.config import APP_NAME, APP_VERSION, LOG_LEVEL, LOG_FILE, LOG_FORMAT, SLIDE_COSTS_FILE
 from utils.logging import setup_logging, get_logger
-from core.services.conversion_service import ConversionService
-from adapters.office.powerpoint_adapter import PowerPointAdapter
-from adapters.office.word_adapter import WordAdapter
-from adapters.office.excel_adapter import ExcelAdapter
+from app.bootstrap import create_conversion_service
 from ui.desktop.main_window import MainWindow
 
 
 def main():
     """Application entry point."""
     # Setup logging
-    setup_logging(log_level=LOG_LEVEL, log_file=LOG_FILE)
+    setup_logging(log_level=LOG_LEVEL, log_file=LOG_FILE, log_format=LOG_FORMAT)
     logger = get_logger(__name__)
     
     logger.info(f"Starting {APP_NAME} v{APP_VERSION}")
     
     try:
-        # Initialize conversion service
-        service = ConversionService()
-        
-        # Register converters (Dependency Injection)
-        service.register_converter(PowerPointAdapter())
-        service.register_converter(WordAdapter())
-        service.register_converter(ExcelAdapter())  # NEW in v2.1
+        # Initialize conversion service with all converters registered
+        service = create_conversion_service(slide_costs_file=SLIDE_COSTS_FILE)
         
         logger.info(f"Registered converters for: {', '.join(service.get_supported_extensions())}")
         
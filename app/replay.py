@@ -0,0 +1,109 @@
+"""
+PdfConverter - Workload Trace Replay
+
+Replays a trace recorded with `python -m app.cli ... --trace FILE` on the
+batch scheduler and worker pool with simulated conversion times, to see how
+the same workload would perform with other worker counts and orderings.
+
+Usage:
+    python -m app.replay TRACE [--workers 2,4,8] [--order recorded,largest-first] [options]
+
+Exit codes:
+    0  Replay finished
+    2  Invalid arguments or trace file
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from typing import List, Optional
+from app.config import APP_NAME, APP_VERSION
+from core.services.trace import read_trace
+from core.services.trace_replay import ORDERS, ORDER_RECORDED, replay
+from utils.logging import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+EXIT_OK = 0
+EXIT_USAGE = 2
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        items = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got '{value}'")
+    if not items or min(items) < 1:
+        raise argparse.ArgumentTypeError("worker counts must be at least 1")
+    return items
+
+
+def _order_list(value: str) -> List[str]:
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in items if v not in ORDERS]
+    if unknown or not items:
+        raise argparse.ArgumentTypeError(f"unknown order(s) {', '.join(unknown)}; supported: {', '.join(ORDERS)}")
+    return items
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Replay entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.replay",
+        description=f"{APP_NAME} v{APP_VERSION} - replay a workload trace with simulated conversions."
+    )
+    parser.add_argument("trace", help="Trace file written with --trace")
+    parser.add_argument(
+        "-w", "--workers", type=_int_list, default=[1, 2, 4, 8],
+        help="Comma-separated worker counts to try (default: 1,2,4,8)"
+    )
+    parser.add_argument(
+        "--order", type=_order_list, default=[ORDER_RECORDED],
+        help=f"Comma-separated submission orders to try: {', '.join(ORDERS)} (default: {ORDER_RECORDED})"
+    )
+    parser.add_argument(
+        "--speedup", type=float, default=100.0,
+        help="Recorded seconds per replayed second (default: 100)"
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level (default: WARNING)")
+    args = parser.parse_args(argv)
+
+    if args.speedup <= 0:
+        parser.error("--speedup must be positive")
+
+    setup_logging(log_level=args.log_level)
+
+    try:
+        records = read_trace(args.trace)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not records:
+        print(f"error: {args.trace} contains no conversions", file=sys.stderr)
+        return EXIT_USAGE
+
+    recorded = sum(r.duration for r in records)
+    print(f"{len(records)} conversions, {recorded:.1f}s of recorded conversion time")
+    print(f"{'workers':>7} {'order':<15} {'makespan':>10} {'util':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+
+    reports = []
+    for order in args.order:
+        for workers in args.workers:
+            report = replay(records, workers, order=order, speedup=args.speedup)
+            reports.append(report)
+            print(
+                f"{report.workers:>7} {report.order:<15} {report.makespan:>9.1f}s {report.utilization:>6.0%} "
+                + " ".join(f"{v:>8.1f}s" for v in (
+                    report.latency_p50, report.latency_p90, report.latency_p99, report.latency_max
+                ))
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in reports], f, indent=2)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
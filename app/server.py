@@ -0,0 +1,504 @@
+"""
+PdfConverter - Local HTTP Conversion Service
+
+Exposes ConversionService over a small HTTP API so other tools can
+request PDFs without embedding the desktop application.
+
+Usage:
+    python -m app.server --port 8765 --data-dir C:\\PdfConverterData [options]
+
+Endpoints:
+    POST /jobs?filename=NAME      Upload a document (raw request body) and queue it
+    POST /jobs                    Queue a server-side file: JSON body {"path": "..."}
+                                  (only for files under an --allow-path-root folder)
+    GET  /jobs/<id>               Job status as JSON
+    GET  /jobs/<id>/result        Download the PDF of a finished job
+    GET  /health                  Service status and queue counts
+    GET  /metrics                 Prometheus metrics
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlsplit, parse_qs, quote
+from app.config import APP_NAME, APP_VERSION, LOG_LEVEL, LOG_FILE, LOG_FORMAT, SLIDE_COSTS_FILE
+from core.models.conversion_job import ConversionJob
+from core.services.conversion_service import ConversionService
+from core.services.metrics import ConversionMetrics
+from core.services.metrics_export import MetricsSnapshotWriter, send_prometheus
+from core.services.job_queue import (
+    PersistentJobQueue, JobRecord, STATE_QUEUED, STATE_RUNNING,
+    STATE_SUCCEEDED, STATE_FAILED, FINISHED_STATES
+)
+from utils.threading import ConversionWorker
+from utils.logging import LOG_FORMATS, setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_JSON_BODY = 64 * 1024
+
+
+class ConversionServer:
+    """
+    HTTP front end for a ConversionService with a persistent job queue.
+
+    Uploads and downloads are streamed to and from disk in fixed-size
+    chunks, so request size never affects memory use.
+    """
+
+    def __init__(
+        self,
+        service: ConversionService,
+        data_dir: str,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = 1,
+        max_upload_bytes: int = 200 * 1024 * 1024,
+        allowed_roots: Optional[List[str]] = None
+    ):
+        """
+        Initialize the server (call `start` or `serve_forever` to run it).
+
+        Args:
+            service: Conversion service that executes jobs
+            data_dir: Directory for the job queue, uploads and results
+            host: Interface to bind (default: localhost only)
+            port: TCP port (0 = pick a free port)
+            workers: Number of parallel conversion workers
+            max_upload_bytes: Maximum accepted upload size
+            allowed_roots: Folders from which path-based jobs may read files
+                           (path-based submission is disabled when empty)
+        """
+        self.service = service
+        self.data_dir = os.path.abspath(data_dir)
+        self.uploads_dir = os.path.join(self.data_dir, "uploads")
+        self.results_dir = os.path.join(self.data_dir, "results")
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self.max_upload_bytes = max_upload_bytes
+        self.allowed_roots = [os.path.normcase(os.path.realpath(r)) for r in (allowed_roots or [])]
+        self.queue = PersistentJobQueue(self.data_dir)
+        self.worker = ConversionWorker(num_threads=workers, name="ServerWorker")
+        if service.metrics is not None:
+            service.metrics.watch_worker(self.worker)
+            service.metrics.retries.inc(self.queue.requeued)
+
+        handler = type("BoundRequestHandler", (_RequestHandler,), {"server_app": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._serve_thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        """The (host, port) the server is bound to."""
+        return self.httpd.server_address
+
+    def start(self):
+        """Start workers and serve requests on a background thread."""
+        self._start_workers()
+        self._serve_thread = threading.Thread(target=self.httpd.serve_forever, name="HttpServer", daemon=True)
+        self._serve_thread.start()
+        logger.info(f"Conversion server listening on http://{self.address[0]}:{self.address[1]}")
+
+    def serve_forever(self):
+        """Start workers and serve requests on the calling thread until interrupted."""
+        self._start_workers()
+        logger.info(f"Conversion server listening on http://{self.address[0]}:{self.address[1]}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop serving requests and shut down the workers."""
+        if self._serve_thread is not None:
+            self.httpd.shutdown()
+            self._serve_thread.join()
+            self._serve_thread = None
+        self.httpd.server_close()
+        self.worker.stop()
+
+    def _start_workers(self):
+        """Start the worker pool and enqueue jobs persisted by a previous run."""
+        self.worker.start()
+        for record in self.queue.pending():
+            self.worker.submit(lambda job_id=record.job_id: self._run_job(job_id))
+
+    def submit_upload(self, filename: str, stream, length: int) -> JobRecord:
+        """
+        Store an uploaded document and queue it.
+
+        Args:
+            filename: Original file name (used for the extension and PDF name)
+            stream: Readable binary stream positioned at the upload data
+            length: Number of bytes to read from the stream
+
+        Returns:
+            The queued JobRecord
+        """
+        job_id = PersistentJobQueue.new_job_id()
+        upload_dir = os.path.join(self.uploads_dir, job_id)
+        os.makedirs(upload_dir, exist_ok=True)
+        input_path = os.path.join(upload_dir, filename)
+
+        remaining = length
+        try:
+            with open(input_path, "wb") as f:
+                while remaining > 0:
+                    chunk = stream.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ConnectionError("Upload ended before Content-Length bytes were received")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+        except Exception:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
+
+        return self._enqueue(job_id, input_path, source="upload")
+
+    def submit_path(self, path: str) -> JobRecord:
+        """
+        Queue a document that already exists on this machine.
+
+        Args:
+            path: Absolute path of the source document
+
+        Returns:
+            The queued JobRecord
+        """
+        # The resolved path: the one is_path_allowed checked, even if a link is changed later
+        return self._enqueue(PersistentJobQueue.new_job_id(), os.path.realpath(path), source="path")
+
+    def is_path_allowed(self, path: str) -> bool:
+        """
+        Check whether a path lies under one of the allowed roots.
+
+        Symbolic links and junctions are resolved first, so a link inside
+        an allowed root cannot point outside it.
+        """
+        candidate = os.path.normcase(os.path.realpath(path))
+        for root in self.allowed_roots:
+            try:
+                if os.path.commonpath([candidate, root]) == root:
+                    return True
+            except ValueError:  # Different drives on Windows
+                continue
+        return False
+
+    def _enqueue(self, job_id: str, input_path: str, source: str) -> JobRecord:
+        """Create, persist and schedule a job."""
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(self.results_dir, job_id, stem + ".pdf")
+        record = JobRecord(job_id=job_id, input_path=input_path, output_path=output_path, source=source)
+        self.queue.add(record)
+        self.worker.submit(lambda: self._run_job(job_id))
+        logger.info(f"Queued job {job_id} ({source}): {input_path}")
+        return record
+
+    def _run_job(self, job_id: str):
+        """Convert one queued job (runs on a worker thread)."""
+        record = self.queue.get(job_id)
+        if record is None or record.state != STATE_QUEUED:
+            return
+
+        record = self.queue.update(job_id, state=STATE_RUNNING, started_at=_now())
+        os.makedirs(os.path.dirname(record.output_path), exist_ok=True)
+        try:
+            job = ConversionJob(
+                input_path=record.input_path,
+                output_path=record.output_path,
+                output_folder=os.path.dirname(record.output_path),
+                options=dict(record.options),
+                job_id=job_id
+            )
+            result = self.service.convert(job)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self.queue.update(
+                job_id, state=STATE_FAILED, finished_at=_now(),
+                message=f"Unexpected error: {e}", error_type=type(e).__name__
+            )
+            return
+
+        if result.success:
+            self.queue.update(
+                job_id, state=STATE_SUCCEEDED, finished_at=_now(), message=result.message,
+                output_path=result.output_path or record.output_path
+            )
+        else:
+            self.queue.update(
+                job_id, state=STATE_FAILED, finished_at=_now(), message=result.message,
+                error_type=type(result.error).__name__ if result.error else None
+            )
+
+
+def _now() -> float:
+    """Current POSIX timestamp."""
+    return time.time()
+
+
+def _content_disposition(filename: str) -> str:
+    """
+    Attachment header for a file name taken from an upload.
+
+    The quoted filename is an ASCII fallback without quotes, backslashes or
+    control characters; the exact name goes in the RFC 5987 filename*.
+    """
+    fallback = "".join(c if " " <= c <= "~" and c not in '"\\' else "_" for c in filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Request handler; `server_app` is bound to the owning ConversionServer."""
+
+    server_app: ConversionServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Route access logs through the application logger."""
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def do_GET(self):
+        """Handle status, download and health requests."""
+        parts = [p for p in urlsplit(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {
+                "status": "ok",
+                "version": APP_VERSION,
+                "jobs": self.server_app.queue.counts(),
+                "supported_extensions": self.server_app.service.get_supported_extensions(),
+            })
+        elif parts == ["metrics"] and self.server_app.service.metrics is not None:
+            send_prometheus(self, self.server_app.service.metrics.registry)
+        elif len(parts) == 2 and parts[0] == "jobs":
+            record = self.server_app.queue.get(parts[1])
+            if record is None:
+                self._send_error(HTTPStatus.NOT_FOUND, "Unknown job")
+            else:
+                self._send_json(HTTPStatus.OK, self._job_view(record))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            self._send_result(parts[1])
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self):
+        """Handle job submission."""
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._discard_body()
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+
+        if "Content-Length" not in self.headers:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            self.close_connection = True
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+        except ValueError:
+            self._send_error(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+            self.close_connection = True
+            return
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type == "application/json":
+            self._submit_path(length)
+        else:
+            filename = parse_qs(url.query).get("filename", [""])[0] or self.headers.get("X-Filename", "")
+            self._submit_upload(filename, length)
+
+    def _submit_upload(self, filename: str, length: int):
+        """Validate and store an uploaded document."""
+        filename = os.path.basename(filename.replace("\\", "/"))
+        if not filename:
+            self._reject(HTTPStatus.BAD_REQUEST, "A filename query parameter is required")
+            return
+        if not self._is_supported(filename):
+            self._reject(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Unsupported file type: {filename}")
+            return
+        if length <= 0:
+            self._reject(HTTPStatus.BAD_REQUEST, "Empty upload")
+            return
+        if length > self.server_app.max_upload_bytes:
+            self._reject(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Upload exceeds {self.server_app.max_upload_bytes} bytes"
+            )
+            return
+
+        try:
+            record = self.server_app.submit_upload(filename, self.rfile, length)
+        except (OSError, ConnectionError) as e:
+            logger.error(f"Upload failed: {e}")
+            self.close_connection = True
+            return
+        self._send_json(HTTPStatus.ACCEPTED, self._job_view(record))
+
+    def _submit_path(self, length: int):
+        """Validate and queue a path-based job."""
+        if length > MAX_JSON_BODY:
+            self._reject(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "JSON body too large")
+            return
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+            path = body["path"]
+        except (ValueError, KeyError, TypeError):
+            self._send_error(HTTPStatus.BAD_REQUEST, 'Expected JSON body {"path": "..."}')
+            return
+
+        if not self.server_app.is_path_allowed(path):
+            self._send_error(HTTPStatus.FORBIDDEN, "Path is outside the allowed roots")
+        elif not os.path.isfile(path):
+            self._send_error(HTTPStatus.NOT_FOUND, f"File not found: {path}")
+        elif not self._is_supported(path):
+            self._send_error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Unsupported file type: {path}")
+        else:
+            record = self.server_app.submit_path(path)
+            self._send_json(HTTPStatus.ACCEPTED, self._job_view(record))
+
+    def _send_result(self, job_id: str):
+        """Stream the PDF of a finished job."""
+        record = self.server_app.queue.get(job_id)
+        if record is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown job")
+            return
+        if record.state != STATE_SUCCEEDED:
+            status = HTTPStatus.CONFLICT if record.state not in FINISHED_STATES else HTTPStatus.GONE
+            self._send_error(status, f"Job is {record.state}")
+            return
+
+        try:
+            f = open(record.output_path, "rb")
+        except OSError:
+            self._send_error(HTTPStatus.GONE, "Result file is no longer available")
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", _content_disposition(os.path.basename(record.output_path)))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def _is_supported(self, filename: str) -> bool:
+        """Check the file extension against the registered converters."""
+        ext = os.path.splitext(filename)[1].lower()
+        return ext in self.server_app.service.get_supported_extensions()
+
+    def _job_view(self, record: JobRecord) -> dict:
+        """Public JSON representation of a job."""
+        view = {
+            "id": record.job_id,
+            "state": record.state,
+            "source": record.source,
+            "input": os.path.basename(record.input_path),
+            "created_at": record.created_at,
+            "started_at": record.started_at,
+            "finished_at": record.finished_at,
+            "message": record.message,
+            "error_type": record.error_type,
+        }
+        if record.state == STATE_SUCCEEDED:
+            view["result_url"] = f"/jobs/{record.job_id}/result"
+        return view
+
+    def _reject(self, status: HTTPStatus, message: str):
+        """Reject a request without reading its (possibly huge) body."""
+        self._send_error(status, message)
+        self.close_connection = True
+
+    def _discard_body(self):
+        """Read and drop a small request body so the connection can be reused."""
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if 0 < length <= MAX_JSON_BODY:
+            self.rfile.read(length)
+        elif length:
+            self.close_connection = True
+
+    def _send_json(self, status: HTTPStatus, payload: dict):
+        """Send a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        """Send a JSON error response."""
+        self._send_json(status, {"error": message})
+
+
+def main(argv: Optional[List[str]] = None):
+    """Server entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.server",
+        description=f"{APP_NAME} v{APP_VERSION} - local HTTP conversion service."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--data-dir", required=True, help="Folder for the job queue, uploads and results")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Parallel conversion workers (default: 1)")
+    parser.add_argument("--max-upload-mb", type=float, default=200, help="Maximum upload size in MB (default: 200)")
+    parser.add_argument(
+        "--allow-path-root", action="append", default=[],
+        help="Allow path-based jobs for files under this folder (repeatable)"
+    )
+    parser.add_argument("--metrics-file", help="Write a JSON metrics snapshot to this file periodically")
+    parser.add_argument(
+        "--metrics-interval", type=float, default=15.0,
+        help="Seconds between metrics snapshots (default: 15)"
+    )
+    parser.add_argument("--log-level", default=LOG_LEVEL, help=f"Logging level (default: {LOG_LEVEL})")
+    parser.add_argument(
+        "--log-format", choices=LOG_FORMATS, default=LOG_FORMAT,
+        help=f"Log output format: text or json (default: {LOG_FORMAT})"
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging(log_level=args.log_level, log_file=LOG_FILE, log_format=args.log_format)
+    logger.info(f"Starting {APP_NAME} v{APP_VERSION} (HTTP server)")
+
+    try:
+        from app.bootstrap import create_conversion_service
+        metrics = ConversionMetrics()
+        service = create_conversion_service(metrics=metrics, slide_costs_file=SLIDE_COSTS_FILE)
+        server = ConversionServer(
+            service,
+            data_dir=args.data_dir,
+            host=args.host,
+            port=args.port,
+            workers=max(1, args.workers),
+            max_upload_bytes=int(args.max_upload_mb * 1024 * 1024),
+            allowed_roots=args.allow_path_root
+        )
+    except Exception as e:
+        logger.critical(f"Fatal error: {e}", exc_info=True)
+        sys.exit(1)
+
+    snapshots = None
+    if args.metrics_file:
+        snapshots = MetricsSnapshotWriter(metrics.registry, args.metrics_file, args.metrics_interval)
+        snapshots.start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server shutdown requested")
+    finally:
+        if snapshots:
+            snapshots.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Throughput benchmarks that run without Office (see benchmarks.simcom)."""
@@ -0,0 +1,559 @@
+"""
+Benchmark suite for the conversion pipeline on the simulated COM backend.
+
+Usage:
+    python -m benchmarks.run                      # run and compare with baseline.json
+    python -m benchmarks.run --only scanner       # run a subset
+    python -m benchmarks.run --update-baseline    # record the current numbers
+
+Modules that import win32com are imported inside the `SimulatedOffice`
+blocks; later blocks re-point them at their own backend.
+
+Workloads are generated from a fixed seed, so every run converts the same
+files with the same simulated latencies. Each benchmark reports metrics
+whose names end in:
+    _s        seconds (lower is better, compared with a relative tolerance)
+    _per_s    rate (higher is better, compared with a relative tolerance)
+    _bytes    memory (lower is better, compared with a relative tolerance)
+    anything else is a count (COM calls, failures, files found) and must
+              match exactly, since the workloads are deterministic
+
+Exit codes: 0 no regression, 1 regression against the baseline, 2 invalid arguments.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, List
+
+# Allow `python benchmarks/run.py` as well as `python -m benchmarks.run`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simcom import OfficeProfile, SimulatedOffice, _Worksheet
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+SEED = 20260113
+
+EXTENSIONS = (".docx", ".pptx", ".xlsx")
+_MAIN_PARTS = {".docx": "word/document.xml", ".pptx": "ppt/presentation.xml", ".xlsx": "xl/workbook.xml"}
+
+# Lease of the shared-queue nodes in bench_shared_queue (heartbeat every quarter)
+QUEUE_LEASE_SECONDS = 1.0
+
+# Memory the tables of a 1,000,000-job batch may hold (bench_compact_batch)
+COMPACT_BATCH_BUDGET_BYTES = 96 * 1024 * 1024
+
+
+def make_workload(folder: str, count: int, seed: int = SEED) -> List[str]:
+    """
+    Create `count` input packages of reproducible sizes (10 KB - 400 KB) in `folder`.
+
+    Returns:
+        Paths of the created files
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        path = os.path.join(folder, f"doc_{i:05d}{ext}")
+        _write_package(path, ext, rng.randint(10_000, 400_000))
+        paths.append(path)
+    return paths
+
+
+def _write_package(path: str, ext: str, size: int):
+    """Write a minimal OOXML package of about `size` bytes (passes the preflight check)."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as package:
+        package.writestr("[Content_Types].xml", "<Types/>")
+        package.writestr(_MAIN_PARTS[ext], "<root/>")
+        package.writestr("docProps/padding.bin", b"\0" * size)
+
+
+def _jobs(service, inputs: List[str], output_folder: str, options: dict = None):
+    os.makedirs(output_folder, exist_ok=True)
+    return [service.create_job(path, output_folder, options=options) for path in inputs]
+
+
+def bench_convert_batch(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """Sequential ConversionService.convert_batch over all three adapters."""
+    inputs = make_workload(os.path.join(workdir, "batch_in"), 30)
+    with SimulatedOffice(profile) as office:
+        from app.bootstrap import create_conversion_service
+        service = create_conversion_service(verify_output=True)
+        jobs = _jobs(service, inputs, os.path.join(workdir, "batch_out"))
+        start = time.perf_counter()
+        results = service.convert_batch(jobs)
+        elapsed = time.perf_counter() - start
+
+    failed = sum(1 for r in results if not r.success)
+    return {
+        "wall_s": elapsed,
+        "files_per_s": len(jobs) / elapsed,
+        "failed": failed,
+        "com_calls": office.stats.com_calls,
+    }
+
+
+def bench_convert_batch_faults(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """convert_batch with injected open/export failures and truncated PDFs."""
+    faulty = OfficeProfile(**{**vars(profile), "fail_open": 0.1, "fail_export": 0.1, "truncate_export": 0.1})
+    inputs = make_workload(os.path.join(workdir, "faults_in"), 30)
+    with SimulatedOffice(faulty) as office:
+        from app.bootstrap import create_conversion_service
+        service = create_conversion_service(verify_output=True)
+        jobs = _jobs(service, inputs, os.path.join(workdir, "faults_out"))
+        start = time.perf_counter()
+        results = service.convert_batch(jobs)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "wall_s": elapsed,
+        "failed": sum(1 for r in results if not r.success),
+        "injected": sum(office.stats.failures.values()),
+    }
+
+
+def _bench_worker(workdir: str, profile: OfficeProfile, threads: int) -> Dict[str, float]:
+    inputs = make_workload(os.path.join(workdir, f"worker{threads}_in"), 40)
+    with SimulatedOffice(profile):
+        from app.bootstrap import create_conversion_service
+        from utils.threading import ConversionWorker
+        service = create_conversion_service(verify_output=True)
+        jobs = _jobs(service, inputs, os.path.join(workdir, f"worker{threads}_out"))
+        worker = ConversionWorker(num_threads=threads, max_queue_size=threads * 2)
+        done = []
+        lock = threading.Lock()
+
+        def collect(result):
+            with lock:
+                done.append(result)
+
+        worker.start()
+        start = time.perf_counter()
+        try:
+            for job in jobs:
+                worker.submit(lambda job=job: service.convert(job), callback=collect)
+            worker.wait_until_idle()
+            elapsed = time.perf_counter() - start
+        finally:
+            worker.stop()
+
+    return {
+        "wall_s": elapsed,
+        "files_per_s": len(jobs) / elapsed,
+        "failed": sum(1 for r in done if not r.success),
+    }
+
+
+def bench_worker_1(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """ConversionWorker with one thread."""
+    return _bench_worker(workdir, profile, 1)
+
+
+def bench_worker_4(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """ConversionWorker with four threads."""
+    return _bench_worker(workdir, profile, 4)
+
+
+def bench_scanner(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """FileScanner over a flat folder of 20,000 files (one in four unsupported)."""
+    from core.services.file_scanner import FileScanner
+
+    folder = os.path.join(workdir, "scan")
+    os.makedirs(folder)
+    extensions = EXTENSIONS + (".txt",)
+    for i in range(20_000):
+        open(os.path.join(folder, f"f{i:05d}{extensions[i % 4]}"), "wb").close()
+
+    scanner = FileScanner(set(EXTENSIONS))
+    start = time.perf_counter()
+    paths = scanner.scan_folder(folder)
+    scan_folder_s = time.perf_counter() - start
+    start = time.perf_counter()
+    entries = scanner.scan_entries(folder)
+    scan_entries_s = time.perf_counter() - start
+    return {
+        "scan_folder_s": scan_folder_s,
+        "scan_entries_s": scan_entries_s,
+        "found": len(paths) + len(entries),
+    }
+
+
+def bench_excel_layout(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """ExcelAdapter._optimize_sheet_layout on 500 simulated worksheets."""
+    with SimulatedOffice(profile) as office:
+        from adapters.office.excel_adapter import ExcelAdapter
+        adapter = ExcelAdapter()
+        sheets = [_Worksheet(office, i + 1) for i in range(500)]
+        calls_before = office.stats.com_calls
+        start = time.perf_counter()
+        for sheet in sheets:
+            adapter._optimize_sheet_layout(sheet)
+        elapsed = time.perf_counter() - start
+        calls = office.stats.com_calls - calls_before
+
+    return {
+        "per_sheet_s": elapsed / len(sheets),
+        "per_sheet_calls": calls / len(sheets),
+    }
+
+
+def bench_export_profiles(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """The same 30 files converted with each export profile: time and total PDF size."""
+    from core.models.export_profile import EXPORT_PROFILE_OPTION, EXPORT_PROFILES
+    inputs = make_workload(os.path.join(workdir, "profiles_in"), 30)
+    metrics = {}
+    for name in EXPORT_PROFILES:
+        with SimulatedOffice(profile) as office:
+            from app.bootstrap import create_conversion_service
+            service = create_conversion_service(verify_output=True)
+            jobs = _jobs(service, inputs, os.path.join(workdir, f"profiles_{name}"), {EXPORT_PROFILE_OPTION: name})
+            start = time.perf_counter()
+            results = service.convert_batch(jobs)
+            elapsed = time.perf_counter() - start
+        metrics[f"{name}_wall_s"] = elapsed
+        metrics[f"{name}_output_bytes"] = sum(r.output_bytes or 0 for r in results)
+        metrics[f"{name}_failed"] = sum(1 for r in results if not r.success)
+        metrics[f"{name}_com_calls"] = office.stats.com_calls
+    return metrics
+
+
+def bench_ppt_shards(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """
+    A 900-slide deck exported (draft profile) in one call and as slide-range
+    shards (up to 4 sessions), plus a 40-slide deck that must keep the single
+    call and a tagged (standard profile) export that must not be sharded.
+
+    The simulated PowerPoint, like the real one, runs a single instance that
+    serializes exports from all sessions, so the sharded time shows the
+    overhead of sharding.
+    """
+    from core.models.export_profile import EXPORT_PROFILE_OPTION
+    from core.services.slide_shards import SLIDE_SHARDS_OPTION, SlideCostModel
+    deck_profile = OfficeProfile(**{**vars(profile), "bytes_per_page": 500})
+    folder = os.path.join(workdir, "shards_in")
+    os.makedirs(folder, exist_ok=True)
+    large = os.path.join(folder, "training.pptx")
+    small = os.path.join(folder, "status.pptx")
+    _write_package(large, ".pptx", 900 * 500)
+    _write_package(small, ".pptx", 40 * 500)
+
+    metrics = {}
+    with SimulatedOffice(deck_profile):
+        from app.bootstrap import create_conversion_service
+        from adapters.office.powerpoint_adapter import PowerPointAdapter
+        service = create_conversion_service(verify_output=True)
+        # Cost model seeded with a measurement of the simulated draft export; shards of ~0.5 s
+        slide_costs = SlideCostModel()
+        slide_costs.observe(1, deck_profile.export_per_page)
+        service.register_converter(PowerPointAdapter(slide_costs=slide_costs, shard_target_seconds=0.5))
+        output = os.path.join(workdir, "shards_out")
+        runs = (
+            ("single", large, 0, "draft"),
+            ("sharded", large, 4, "draft"),
+            ("small", small, 4, "draft"),
+            ("tagged", large, 4, "standard"),
+        )
+        for name, path, sessions, export_profile in runs:
+            options = {SLIDE_SHARDS_OPTION: sessions, EXPORT_PROFILE_OPTION: export_profile}
+            job = service.create_job(path, output, custom_output_name=name, options=options)
+            os.makedirs(output, exist_ok=True)
+            start = time.perf_counter()
+            result = service.convert(job)
+            metrics[f"{name}_s"] = time.perf_counter() - start
+            metrics[f"{name}_pages"] = result.page_count or 0
+            metrics[f"{name}_merged"] = int("merge" in result.stage_timings)
+    return metrics
+
+
+def bench_adaptive_workers(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """
+    BatchRunner with 4 and 12 fixed workers and with the adaptive controller
+    (1-12 workers, starting at 2) on a simulated 4-core machine where exports
+    are CPU-bound, oversubscribed cores thrash and every Office instance
+    takes 8% of memory.
+    """
+    machine = OfficeProfile(**{
+        **vars(profile), "bytes_per_page": 4000, "cores": 4, "contention": 0.3, "instance_memory": 0.08
+    })
+    inputs = make_workload(os.path.join(workdir, "adaptive_in"), 80)
+    metrics = {}
+    with SimulatedOffice(machine) as office:
+        from app.bootstrap import create_conversion_service
+        from core.services.batch_runner import BatchRunner
+        from core.services.concurrency import ConcurrencyPolicy
+        from utils.system import SystemLoad
+        service = create_conversion_service(verify_output=True)
+        policy = ConcurrencyPolicy(
+            min_workers=1, max_workers=12, interval=0.25, min_samples=4, probe=lambda: SystemLoad(*office.load())
+        )
+        for name, workers, concurrency in (("fixed4", 4, None), ("fixed12", 12, None), ("adaptive", 2, policy)):
+            jobs = _jobs(service, inputs, os.path.join(workdir, f"adaptive_{name}_out"))
+            summary = BatchRunner(service, num_workers=workers, concurrency=concurrency).run(jobs)
+            metrics[f"{name}_wall_s"] = summary.elapsed
+            metrics[f"{name}_failed"] = summary.failed
+    return metrics
+
+
+def _queue_node(queue_dir: str, node_id: str, profile_fields: dict, workers: int, crash_after: int = 0):
+    """One node of bench_shared_queue (runs in its own process)."""
+    logging.disable(logging.ERROR)
+    with SimulatedOffice(OfficeProfile(**profile_fields)):
+        from app.bootstrap import create_conversion_service
+        from core.services.batch_runner import BatchRunner
+        from core.services.shared_queue import SharedJobQueue
+        service = create_conversion_service(verify_output=True)
+        queue = SharedJobQueue(queue_dir, node_id=node_id, lease_seconds=QUEUE_LEASE_SECONDS)
+        if crash_after:
+            # Claim jobs, then die without completing or releasing them
+            queue.start()
+            for _ in range(crash_after):
+                queue.claim()
+            os._exit(1)
+        with queue:
+            BatchRunner(service, num_workers=workers).run(
+                queue.iter_jobs(),
+                on_outcome=lambda outcome: queue.complete(outcome.job, outcome.result, outcome.duration)
+            )
+
+
+def bench_shared_queue(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """
+    Three node processes (two workers each) drain a shared-directory queue
+    of 90 jobs after a fourth node claimed 5 jobs and crashed; its claims
+    must be re-queued when their lease expires and converted exactly once.
+    """
+    from core.models.conversion_job import ConversionJob
+    from core.services.shared_queue import SharedJobQueue
+    inputs = make_workload(os.path.join(workdir, "queue_in"), 90)
+    output_folder = os.path.join(workdir, "queue_out")
+    os.makedirs(output_folder)
+    queue_dir = os.path.join(workdir, "queue")
+    producer = SharedJobQueue(queue_dir, node_id="producer")
+    producer.enqueue(
+        ConversionJob(path, os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0] + ".pdf"))
+        for path in inputs
+    )
+
+    context = multiprocessing.get_context("spawn")
+    fields = vars(profile)
+    crashed = context.Process(target=_queue_node, args=(queue_dir, "crashed", fields, 1, 5))
+    crashed.start()
+    crashed.join()
+
+    start = time.perf_counter()
+    nodes = [context.Process(target=_queue_node, args=(queue_dir, f"node{i}", fields, 2)) for i in range(3)]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join()
+    elapsed = time.perf_counter() - start
+
+    stats = [s for s in producer.node_stats() if s.node != "crashed"]
+    completed = sum(s.completed for s in stats)
+    counts = producer.counts()
+    return {
+        "wall_s": elapsed,
+        "files_per_s": len(inputs) / elapsed,
+        "done": counts["done"],
+        "left": counts["pending"] + counts["claimed"],
+        "failed": sum(s.failed for s in stats),
+        "reclaimed": sum(s.reclaimed for s in stats),
+        "duplicates": completed - len(inputs),
+        "nodes_exited_cleanly": sum(1 for node in nodes if node.exitcode == 0),
+    }
+
+
+def _compact_batch(count: int, failure_every: int = 100):
+    """Synthetic batch of `count` jobs and results in the compact tables."""
+    from core.models.conversion_job import ConversionJob, ConversionResult
+    from core.services.result_table import JobTable, ResultTable
+    from utils.exceptions import ConversionError
+    root = os.path.abspath("batch")
+    output = os.path.join(root, "PDF_Output")
+    jobs = JobTable(root)
+    for i in range(count):
+        folder = os.path.join(root, f"dept{i // 20000:02d}", f"case{i // 500:04d}")
+        name = f"document_{i:07d}"
+        jobs.append(ConversionJob(
+            input_path=os.path.join(folder, name + EXTENSIONS[i % len(EXTENSIONS)]),
+            output_path=os.path.join(output, name + ".pdf"),
+            job_id=format(i, "012x")
+        ))
+    results = ResultTable(jobs)
+    for i in range(count):
+        if i % failure_every == 0:
+            error = ConversionError(f"Document is corrupt: document_{i:07d}")
+            result = ConversionResult.failure_result(error=error, message=str(error))
+        else:
+            result = ConversionResult.success_result(os.path.join(output, f"document_{i:07d}.pdf"))
+            result.page_count = 1 + i % 40
+            result.output_bytes = 20000 + i % 5000
+        result.converter = "WordAdapter"
+        result.duration = 0.5
+        results.set(i, result)
+    return jobs, results
+
+
+def bench_compact_batch(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """
+    Memory held by the job and result tables of a large batch (1% failed).
+
+    tracemalloc slows allocation down several times, so 200,000 jobs are
+    measured and the (linear) cost projected to 1,000,000.
+    """
+    import gc
+    import tracemalloc
+    count = 200_000
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        jobs, results = _compact_batch(count)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    failed = results.failed
+    del jobs, results
+    per_job = held / count
+    return {
+        "build_per_job_s": elapsed / count,
+        "held_per_job_bytes": per_job,
+        "peak_per_job_bytes": peak / count,
+        "projected_1m_bytes": per_job * 1_000_000,
+        "failed": failed,
+        "within_budget": int(per_job * 1_000_000 <= COMPACT_BATCH_BUDGET_BYTES),
+    }
+
+
+def bench_startup(workdir: str, profile: OfficeProfile) -> Dict[str, float]:
+    """Import times of the entry points and time to first paint (see benchmarks.startup)."""
+    from benchmarks.startup import startup_metrics
+    return startup_metrics()
+
+
+BENCHMARKS: Dict[str, Callable[[str, OfficeProfile], Dict[str, float]]] = {
+    "convert_batch": bench_convert_batch,
+    "convert_batch_faults": bench_convert_batch_faults,
+    "worker_1": bench_worker_1,
+    "worker_4": bench_worker_4,
+    "scanner": bench_scanner,
+    "excel_layout": bench_excel_layout,
+    "export_profiles": bench_export_profiles,
+    "ppt_shards": bench_ppt_shards,
+    "shared_queue": bench_shared_queue,
+    "adaptive_workers": bench_adaptive_workers,
+    "compact_batch": bench_compact_batch,
+    "startup": bench_startup,
+}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name, {})
+        for metric, value in metrics.items():
+            if metric not in expected:
+                continue
+            base = expected[metric]
+            if metric.endswith("_per_s"):
+                if value < base * (1 - tolerance):
+                    regressions.append(f"{name}.{metric}: {value:.4g} < {base:.4g} (-{tolerance:.0%} allowed)")
+            elif metric.endswith("_s") or metric.endswith("_bytes"):
+                if value > base * (1 + tolerance):
+                    regressions.append(f"{name}.{metric}: {value:.4g} > {base:.4g} (+{tolerance:.0%} allowed)")
+            elif value != base:
+                regressions.append(f"{name}.{metric}: {value:g} != {base:g}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Run the PdfConverter benchmarks on a simulated Office backend.",
+    )
+    parser.add_argument("--only", help="Comma-separated benchmarks to run: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown for timings (default: 0.25)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [n.strip() for n in args.only.split(",") if n.strip()]
+        unknown = [n for n in names if n not in BENCHMARKS]
+        if unknown:
+            parser.print_usage(sys.stderr)
+            print(f"error: unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+    # Per-conversion logs (including the injected failures) would dominate the timings
+    logging.disable(logging.ERROR)
+    profile = OfficeProfile()
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="pdfconverter_bench_")
+    try:
+        for name in names:
+            bench_dir = os.path.join(workdir, name)
+            os.makedirs(bench_dir)
+            results[name] = BENCHMARKS[name](bench_dir, profile)
+            metrics = ", ".join(f"{k}={v:.4g}" for k, v in results[name].items())
+            print(f"{name:<22} {metrics}")
+    finally:
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update({
+            name: {k: float(f"{v:.4g}") if isinstance(v, float) else v for k, v in metrics.items()}
+            for name, metrics in results.items()
+        })
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (run with --update-baseline)")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
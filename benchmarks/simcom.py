@@ -0,0 +1,530 @@
+"""
+Simulated Office COM backend for benchmarks.
+
+Provides drop-in `win32com.client` and `pythoncom` modules whose
+Word, Excel and PowerPoint objects behave like the real ones as far as
+the adapters are concerned: they sleep for configurable latencies,
+count every COM call, write a valid PDF with one page per simulated
+page, and can fail at chosen rates. Nothing here needs Windows.
+
+Usage:
+    with SimulatedOffice(OfficeProfile(startup=0.05)) as office:
+        from adapters.office.word_adapter import WordAdapter
+        WordAdapter().convert(job)
+    print(office.stats.com_calls)
+"""
+import os
+import random
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Adapter modules that bind `win32com` at import time
+ADAPTER_MODULES = (
+    "adapters.office.word_adapter",
+    "adapters.office.excel_adapter",
+    "adapters.office.powerpoint_adapter",
+)
+
+
+class SimulatedComError(Exception):
+    """Stands in for pywintypes.com_error."""
+    pass
+
+
+@dataclass
+class OfficeProfile:
+    """
+    Latencies (seconds) and failure rates of the simulated applications.
+
+    Attributes:
+        startup: Dispatch (application start)
+        open_base: Opening a document
+        open_per_mb: Additional open time per MB of input
+        export_per_page: Export time per page
+        com_call: Cost of every property access, property set and method call
+        close: Closing a document
+        quit: Application shutdown
+        bytes_per_page: Input bytes per simulated page (page count = size / this)
+        sheet_columns: Used columns per worksheet
+        sheet_rows: Used rows per worksheet
+        sheets: Worksheets per workbook
+        print_quality_cost: Extra export time (fraction) for print-resolution images
+        structure_tags_cost: Extra export time (fraction) for a tagged PDF
+        bookmarks_cost: Extra export time (fraction) for heading bookmarks
+        pdfa_cost: Extra export time (fraction) for PDF/A (font embedding)
+        recalc_per_sheet: Full recalculation time per worksheet
+        screen_bytes_per_page: Output bytes per page with screen-quality images
+        print_bytes_per_page: Output bytes per page with print-quality images
+        tag_bytes_per_page: Output bytes per page for structure tags
+        pdfa_bytes: Output bytes for embedded fonts and PDF/A metadata
+        fail_dispatch: Probability that Dispatch fails
+        fail_open: Probability that opening a document fails
+        fail_export: Probability that the export call fails
+        truncate_export: Probability that the export "succeeds" but leaves a truncated PDF
+        cores: CPUs shared by concurrent opens, exports and recalculations (0 = no contention)
+        contention: Extra slowdown per concurrent operation beyond `cores` (cache and
+                    disk thrashing), on top of sharing the CPUs
+        instance_memory: Fraction of system memory each running application takes
+        seed: Random seed for failure injection
+    """
+    startup: float = 0.02
+    open_base: float = 0.01
+    open_per_mb: float = 0.005
+    export_per_page: float = 0.002
+    com_call: float = 0.0001
+    close: float = 0.002
+    quit: float = 0.01
+    bytes_per_page: int = 20_000
+    sheet_columns: int = 12
+    sheet_rows: int = 400
+    sheets: int = 3
+    print_quality_cost: float = 0.5
+    structure_tags_cost: float = 0.25
+    bookmarks_cost: float = 0.1
+    pdfa_cost: float = 0.3
+    recalc_per_sheet: float = 0.01
+    screen_bytes_per_page: int = 8_000
+    print_bytes_per_page: int = 30_000
+    tag_bytes_per_page: int = 2_000
+    pdfa_bytes: int = 60_000
+    fail_dispatch: float = 0.0
+    fail_open: float = 0.0
+    fail_export: float = 0.0
+    truncate_export: float = 0.0
+    cores: int = 0
+    contention: float = 0.0
+    instance_memory: float = 0.0
+    seed: int = 1234
+
+
+@dataclass
+class SimulationStats:
+    """Counters collected by the backend."""
+    dispatches: int = 0
+    com_calls: int = 0
+    documents_opened: int = 0
+    pages_exported: int = 0
+    failures: Dict[str, int] = field(default_factory=dict)
+
+
+class SimulatedOffice:
+    """
+    Installs the simulated backend into sys.modules (and already imported
+    adapter modules) for the duration of a `with` block.
+    """
+
+    def __init__(self, profile: Optional[OfficeProfile] = None):
+        self.profile = profile or OfficeProfile()
+        self.stats = SimulationStats()
+        self._lock = threading.Lock()
+        self.powerpoint_lock = threading.Lock()
+        self._working = 0
+        self._instances = 0
+        self._single_instances: Dict[str, object] = {}
+        self._startup_lock = threading.Lock()
+        self._random = random.Random(self.profile.seed)
+        self._saved: Dict[str, object] = {}
+        self._saved_attrs: List = []
+        self.win32com, self.client, self.pythoncom = self._build_modules()
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def install(self):
+        """Make `import win32com.client` / `import pythoncom` return the simulation."""
+        for name, module in (("win32com", self.win32com), ("win32com.client", self.client), ("pythoncom", self.pythoncom)):
+            self._saved[name] = sys.modules.get(name)
+            sys.modules[name] = module
+        for name in ADAPTER_MODULES:
+            module = sys.modules.get(name)
+            if module is not None:
+                self._saved_attrs.append((module, getattr(module, "win32com", None)))
+                module.win32com = self.win32com
+        threading_module = sys.modules.get("utils.threading")
+        if threading_module is not None:
+            self._saved_attrs.append((threading_module, threading_module.pythoncom))
+            threading_module.pythoncom = self.pythoncom
+
+    def uninstall(self):
+        """Restore the previous modules."""
+        for name, module in self._saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        self._saved.clear()
+        for module, value in reversed(self._saved_attrs):
+            if module.__name__ == "utils.threading":
+                module.pythoncom = value
+            else:
+                module.win32com = value
+        self._saved_attrs.clear()
+
+    # Backend internals used by the COM objects
+
+    def call(self, cost_multiplier: float = 1.0):
+        """Account for one COM round trip."""
+        with self._lock:
+            self.stats.com_calls += 1
+        if self.profile.com_call:
+            time.sleep(self.profile.com_call * cost_multiplier)
+
+    def work(self, seconds: float):
+        """Spend `seconds` of CPU-bound work, slowed down when more operations run than there are cores."""
+        cores = self.profile.cores
+        with self._lock:
+            self._working += 1
+            running = self._working
+        try:
+            if cores and running > cores:
+                seconds *= running / cores * (1 + self.profile.contention * (running - cores))
+            time.sleep(seconds)
+        finally:
+            with self._lock:
+                self._working -= 1
+
+    def instance_started(self, delta: int):
+        with self._lock:
+            self._instances += delta
+
+    def load(self) -> Tuple[float, float]:
+        """Simulated (CPU busy fraction, memory use fraction) of the machine."""
+        with self._lock:
+            cpu = min(1.0, self._working / self.profile.cores) if self.profile.cores else 0.0
+            return cpu, min(1.0, self._instances * self.profile.instance_memory)
+
+    def maybe_fail(self, kind: str, rate: float, message: str):
+        """Raise SimulatedComError with probability `rate`."""
+        if rate <= 0:
+            return
+        with self._lock:
+            hit = self._random.random() < rate
+            if hit:
+                self.stats.failures[kind] = self.stats.failures.get(kind, 0) + 1
+        if hit:
+            raise SimulatedComError(message)
+
+    def count(self, attr: str, amount: int = 1):
+        with self._lock:
+            setattr(self.stats, attr, getattr(self.stats, attr) + amount)
+
+    def _build_modules(self):
+        backend = self
+
+        def Dispatch(progid: str):
+            backend.call()
+            backend.maybe_fail("dispatch", backend.profile.fail_dispatch, f"Cannot start {progid}")
+            app_class = _APPLICATIONS.get(progid)
+            if app_class is None:
+                raise SimulatedComError(f"Invalid class string: {progid}")
+            backend.count("dispatches")
+            if app_class.single_instance:
+                # Like PowerPoint: every Dispatch attaches to the one running instance
+                with backend._startup_lock:
+                    app = backend._single_instances.get(progid)
+                    if app is None:
+                        time.sleep(backend.profile.startup)
+                        app = backend._single_instances[progid] = app_class(backend)
+                        backend.instance_started(1)
+                return app
+            time.sleep(backend.profile.startup)
+            backend.instance_started(1)
+            return app_class(backend)
+
+        client = types.ModuleType("win32com.client")
+        client.Dispatch = Dispatch
+        client.DispatchEx = Dispatch
+        package = types.ModuleType("win32com")
+        package.client = client
+        package.__path__ = []
+
+        pythoncom = types.ModuleType("pythoncom")
+        pythoncom.CoInitialize = lambda: None
+        pythoncom.CoInitializeEx = lambda flags=0: None
+        pythoncom.CoUninitialize = lambda: None
+        pythoncom.COINIT_MULTITHREADED = 0
+        pythoncom.COINIT_APARTMENTTHREADED = 2
+        return package, client, pythoncom
+
+
+class _ComObject:
+    """
+    Base for simulated COM objects: every public attribute read or write
+    costs one COM call, like a late-bound IDispatch proxy.
+    """
+
+    def __init__(self, backend: SimulatedOffice):
+        object.__setattr__(self, "_backend", backend)
+        object.__setattr__(self, "_props", {})
+
+    def __getattribute__(self, name):
+        if not name.startswith("_"):
+            object.__getattribute__(self, "_backend").call()
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name):
+        # Unknown properties read back whatever was set (e.g. PageSetup fields)
+        props = object.__getattribute__(self, "_props")
+        if name in props:
+            return props[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_"):
+            object.__getattribute__(self, "_backend").call()
+        object.__getattribute__(self, "_props")[name] = value
+
+
+class _Collection(_ComObject):
+    """Documents / Presentations / Workbooks."""
+
+    def __init__(self, backend, document_class):
+        super().__init__(backend)
+        object.__setattr__(self, "_document_class", document_class)
+
+    def Open(self, path, *args, **kwargs):
+        backend = self._backend
+        profile = backend.profile
+        if not os.path.isfile(path):
+            raise SimulatedComError(f"File not found: {path}")
+        backend.maybe_fail("open", profile.fail_open, f"Cannot open {path}")
+        size = os.path.getsize(path)
+        backend.work(profile.open_base + profile.open_per_mb * size / (1024 * 1024))
+        backend.count("documents_opened")
+        return self._document_class(backend, path, max(1, size // profile.bytes_per_page))
+
+
+class _Document(_ComObject):
+    """Word document or PowerPoint presentation."""
+
+    def __init__(self, backend, path, pages):
+        super().__init__(backend)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_pages", pages)
+
+    def _export(self, output_path, print_quality=True, tags=False, bookmarks=False, pdfa=False, pages=None):
+        backend = self._backend
+        profile = backend.profile
+        backend.maybe_fail("export", profile.fail_export, "Export failed")
+        pages = pages or self._pages
+        cost = 1.0
+        padding = (profile.print_bytes_per_page if print_quality else profile.screen_bytes_per_page) * pages
+        if print_quality:
+            cost += profile.print_quality_cost
+        if tags:
+            cost += profile.structure_tags_cost
+            padding += profile.tag_bytes_per_page * pages
+        if bookmarks:
+            cost += profile.bookmarks_cost
+        if pdfa:
+            cost += profile.pdfa_cost
+            padding += profile.pdfa_bytes
+        backend.work(profile.export_per_page * pages * cost)
+        data = minimal_pdf(pages, padding)
+        with backend._lock:
+            truncate = profile.truncate_export > 0 and backend._random.random() < profile.truncate_export
+        if truncate:
+            data = data[:len(data) // 2]
+        with open(output_path, "wb") as f:
+            f.write(data)
+        backend.count("pages_exported", pages)
+
+    def ExportAsFixedFormat(self, OutputFileName=None, ExportFormat=17, **kwargs):
+        self._export(
+            OutputFileName,
+            print_quality=kwargs.get("OptimizeFor", 0) == 0,
+            tags=bool(kwargs.get("DocStructureTags", True)),
+            bookmarks=kwargs.get("CreateBookmarks", 0) == 1,
+            pdfa=bool(kwargs.get("UseISO19005_1", False))
+        )
+
+    def SaveAs(self, path, file_format=None):
+        self._export(path)
+
+    def Close(self, *args, **kwargs):
+        time.sleep(self._backend.profile.close)
+
+
+class _Presentation(_Document):
+    """
+    PowerPoint presentation. PowerPoint is a single-instance server, so
+    exports from all client threads run one at a time.
+    """
+
+    def __init__(self, backend, path, pages):
+        super().__init__(backend, path, pages)
+        object.__setattr__(self, "_props", {
+            "Slides": _Count(backend, pages),
+            "PrintOptions": _PrintOptions(backend),
+        })
+
+    def ExportAsFixedFormat(self, Path=None, FixedFormatType=2, **kwargs):
+        pages = None
+        if kwargs.get("RangeType") == 4:  # ppPrintSlideRange
+            slide_range = kwargs["PrintRange"]
+            pages = slide_range.End - slide_range.Start + 1
+        with self._backend.powerpoint_lock:
+            self._export(
+                Path,
+                print_quality=kwargs.get("Intent", 1) == 2,
+                tags=bool(kwargs.get("DocStructureTags", False)),
+                pdfa=bool(kwargs.get("UseISO19005_1", False)),
+                pages=pages
+            )
+
+
+class _PrintOptions(_ComObject):
+    def __init__(self, backend):
+        super().__init__(backend)
+        object.__setattr__(self, "_props", {"Ranges": _PrintRanges(backend)})
+
+
+class _PrintRanges(_ComObject):
+    def ClearAll(self):
+        pass
+
+    def Add(self, Start, End):
+        slide_range = _ComObject(self._backend)
+        object.__setattr__(slide_range, "_props", {"Start": Start, "End": End})
+        return slide_range
+
+
+class _Range(_ComObject):
+    def __init__(self, backend, rows, columns):
+        super().__init__(backend)
+        object.__setattr__(self, "_props", {
+            "Rows": _Count(backend, rows),
+            "Columns": _Count(backend, columns),
+            "Address": f"$A$1:${_column_name(columns)}${rows}",
+        })
+
+
+class _Count(_ComObject):
+    def __init__(self, backend, count):
+        super().__init__(backend)
+        object.__setattr__(self, "_props", {"Count": count})
+
+
+class _PageSetup(_ComObject):
+    pass
+
+
+class _Worksheet(_ComObject):
+    def __init__(self, backend, index):
+        super().__init__(backend)
+        profile = backend.profile
+        object.__setattr__(self, "_props", {
+            "Name": f"Sheet{index}",
+            "Visible": True,
+            "UsedRange": _Range(backend, profile.sheet_rows, profile.sheet_columns),
+            "PageSetup": _PageSetup(backend),
+        })
+
+    def ResetAllPageBreaks(self):
+        pass
+
+
+class _Workbook(_Document):
+    def __init__(self, backend, path, pages):
+        super().__init__(backend, path, pages)
+        object.__setattr__(self, "_props", {
+            "Worksheets": [_Worksheet(backend, i + 1) for i in range(backend.profile.sheets)],
+        })
+
+    def ExportAsFixedFormat(self, Type=0, Filename=None, **kwargs):
+        self._export(Filename, print_quality=kwargs.get("Quality", 0) == 0)
+
+
+class _Application(_ComObject):
+    collection_name = ""
+    document_class = _Document
+    single_instance = False
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        cls = type(self)
+        object.__setattr__(self, "_props", {
+            cls.collection_name: _Collection(backend, cls.document_class),
+        })
+
+    def Quit(self):
+        backend = self._backend
+        time.sleep(backend.profile.quit)
+        if type(self).single_instance:
+            with backend._startup_lock:
+                backend._single_instances = {
+                    progid: app for progid, app in backend._single_instances.items() if app is not self
+                }
+        backend.instance_started(-1)
+
+
+class _WordApplication(_Application):
+    collection_name = "Documents"
+
+
+class _PowerPointApplication(_Application):
+    collection_name = "Presentations"
+    document_class = _Presentation
+    single_instance = True
+
+
+class _ExcelApplication(_Application):
+    collection_name = "Workbooks"
+    document_class = _Workbook
+
+    def CalculateFull(self):
+        profile = self._backend.profile
+        self._backend.work(profile.recalc_per_sheet * profile.sheets)
+
+
+_APPLICATIONS = {
+    "Word.Application": _WordApplication,
+    "PowerPoint.Application": _PowerPointApplication,
+    "Excel.Application": _ExcelApplication,
+}
+
+
+def _column_name(index: int) -> str:
+    """Excel column letters for a 1-based index."""
+    name = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+def minimal_pdf(pages: int, padding: int = 0) -> bytes:
+    """
+    Build a small, structurally valid PDF with the given number of empty pages.
+
+    `padding` bytes of comment lines stand in for images, fonts and tags.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode("ascii"))
+    for _ in range(pages):
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>")
+
+    out = bytearray(b"%PDF-1.7\n")
+    while padding > 0:
+        line = min(padding, 255)
+        out += b"%" + b"x" * (line - 2) + b"\n"
+        padding -= line
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
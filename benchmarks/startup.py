@@ -0,0 +1,132 @@
+"""
+Startup-time benchmark: import time per module and time to first paint.
+
+Usage:
+    python -m benchmarks.startup [--module app.main] [--top 25]
+
+Every measurement runs in a fresh interpreter, so nothing is cached
+from earlier imports.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported before the first conversion
+DEFERRED_MODULES = ("win32com", "win32com.client", "pythoncom", "pywintypes", "cProfile", "pstats", "tracemalloc")
+
+_FIRST_PAINT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from app.bootstrap import create_conversion_service
+from ui.desktop.main_window import MainWindow
+window = MainWindow(create_conversion_service())
+window.root.update()
+print(time.perf_counter() - start)
+window.root.destroy()
+"""
+
+
+def import_times(module: str) -> List[Tuple[str, float, float]]:
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        (module, self seconds, cumulative seconds) for every imported module,
+        in import completion order (the requested module is last)
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        rows.append((parts[2].strip(), self_us / 1e6, cumulative_us / 1e6))
+    return rows
+
+
+def time_to_first_paint() -> Optional[float]:
+    """
+    Seconds from the first application import to the main window's first
+    update, in a fresh interpreter.
+
+    Returns:
+        Seconds, or None if no display is available
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_PAINT_SCRIPT],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None
+    try:
+        return float(proc.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+def startup_metrics() -> Dict[str, float]:
+    """Metrics for the benchmark suite (see benchmarks.run)."""
+    metrics = {}
+    deferred_loaded = 0
+    for module in ("app.bootstrap", "app.cli", "app.main"):
+        rows = import_times(module)
+        metrics[f"import_{module.replace('.', '_')}_s"] = rows[-1][2]
+        names = {name for name, _, _ in rows}
+        deferred_loaded += sum(1 for name in DEFERRED_MODULES if name in names)
+    metrics["deferred_modules_imported"] = deferred_loaded
+    first_paint = time_to_first_paint()
+    if first_paint is not None:
+        metrics["first_paint_s"] = first_paint
+    return metrics
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Report import time per module and time to first paint."
+    )
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest modules to list (default: 25)")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = import_times(args.module)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    total = rows[-1][2]
+    print(f"import {args.module}: {total * 1000:.1f} ms ({len(rows)} modules)")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_s, cumulative_s in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_s * 1000:>10.1f}ms {self_s * 1000:>8.1f}ms  {name}")
+
+    loaded = [name for name in DEFERRED_MODULES if any(row[0] == name for row in rows)]
+    if loaded:
+        print(f"Imported at startup but should be deferred: {', '.join(loaded)}")
+
+    first_paint = time_to_first_paint()
+    if first_paint is None:
+        print("Time to first paint: n/a (no display)")
+    else:
+        print(f"Time to first paint: {first_paint * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
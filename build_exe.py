@@ -31,6 +31,12 @@ args = [
     '--hidden-import=win32com',
     '--hidden-import=win32com.client',
     '--hidden-import=pywintypes',
+    '--hidden-import=pythoncom',
+    
+    # Converters are imported by name on first use (app/bootstrap.py)
+    '--hidden-import=adapters.office.powerpoint_adapter',
+    '--hidden-import=adapters.office.word_adapter',
+    '--hidden-import=adapters.office.excel_adapter',
     
     # Add data files
     '--add-data=README.md;.',
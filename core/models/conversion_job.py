@@ -1,6 +1,7 @@
 """
 Core domain models for the PdfConverter application.
 """
+import uuid
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 
@@ -15,11 +16,13 @@ class ConversionJob:
         output_path: Absolute path where PDF should be saved
         output_folder: Optional output folder override (if None, uses output_path's directory)
         options: Additional conversion options (for future use, e.g., Excel sheet selection)
+        job_id: Short unique id that ties log records and reports to this job
     """
     input_path: str
     output_path: str
     output_folder: Optional[str] = None
     options: Dict[str, Any] = field(default_factory=dict)
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
     
     def __post_init__(self):
         """Validate job parameters."""
@@ -39,11 +42,23 @@ class ConversionResult:
         output_path: Path to the generated PDF (if successful)
         message: Human-readable status message
         error: Error details (if failed)
+        page_count: Page count of the generated PDF (if verified)
+        converter: Name of the converter that handled the job
+        stage_timings: Seconds per conversion stage (dispatch, open, export, ...)
+        duration: Total seconds spent in ConversionService.convert
+        input_bytes: Size of the input file
+        output_bytes: Size of the generated PDF
     """
     success: bool
     output_path: Optional[str] = None
     message: str = ""
     error: Optional[Exception] = None
+    page_count: Optional[int] = None
+    converter: str = ""
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    duration: float = 0.0
+    input_bytes: Optional[int] = None
+    output_bytes: Optional[int] = None
     
     @classmethod
     def success_result(cls, output_path: str, message: str = "Conversion successful") -> "ConversionResult":
@@ -0,0 +1,112 @@
+"""
+Named export profiles that trade output fidelity for conversion speed.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from utils.exceptions import ValidationError
+
+# Job option that selects the profile (ConversionJob.options["export_profile"])
+EXPORT_PROFILE_OPTION = "export_profile"
+
+RECALC_MANUAL = "manual"
+RECALC_AUTOMATIC = "automatic"
+RECALC_FULL = "full"
+
+
+@dataclass(frozen=True)
+class ExportProfile:
+    """
+    Export settings shared by the Office adapters.
+
+    Attributes:
+        name: Profile name used in job options
+        print_quality: Print-resolution images (Word OptimizeFor, Excel Quality,
+                       PowerPoint Intent); False exports for screen
+        bookmarks: Word bookmarks from headings
+        structure_tags: Tagged PDF (accessibility and reflow; Word, PowerPoint)
+        document_properties: Include title, author and other document properties
+        pdfa: Export as PDF/A-1b with embedded fonts (Word, PowerPoint)
+        recalculation: Excel: RECALC_MANUAL (no recalculation), RECALC_AUTOMATIC
+                       (Excel's default) or RECALC_FULL (full recalculation before export)
+        screen_updating: Keep Word/Excel screen updating on during the conversion
+        events: Excel: run workbook event macros (EnableEvents)
+        optimize_layout: Excel: fit sheets to the page width and set orientation
+    """
+    name: str
+    print_quality: bool
+    bookmarks: bool
+    structure_tags: bool
+    document_properties: bool
+    pdfa: bool
+    recalculation: str
+    screen_updating: bool
+    events: bool
+    optimize_layout: bool
+
+
+# Smallest and fastest output: screen images, no tags, bookmarks or layout work
+DRAFT = ExportProfile(
+    name="draft",
+    print_quality=False,
+    bookmarks=False,
+    structure_tags=False,
+    document_properties=False,
+    pdfa=False,
+    recalculation=RECALC_MANUAL,
+    screen_updating=False,
+    events=False,
+    optimize_layout=False,
+)
+
+# The adapters' original settings; screen updating off does not change the output
+STANDARD = ExportProfile(
+    name="standard",
+    print_quality=True,
+    bookmarks=True,
+    structure_tags=True,
+    document_properties=True,
+    pdfa=False,
+    recalculation=RECALC_AUTOMATIC,
+    screen_updating=False,
+    events=True,
+    optimize_layout=True,
+)
+
+# Long-term storage: PDF/A, fresh formula results, everything tagged
+ARCHIVAL = ExportProfile(
+    name="archival",
+    print_quality=True,
+    bookmarks=True,
+    structure_tags=True,
+    document_properties=True,
+    pdfa=True,
+    recalculation=RECALC_FULL,
+    screen_updating=False,
+    events=True,
+    optimize_layout=True,
+)
+
+EXPORT_PROFILES: Dict[str, ExportProfile] = {p.name: p for p in (DRAFT, STANDARD, ARCHIVAL)}
+DEFAULT_EXPORT_PROFILE = STANDARD.name
+
+
+def export_profile_for(options: Optional[Dict[str, Any]]) -> ExportProfile:
+    """
+    Resolve the export profile selected by job options.
+
+    Args:
+        options: ConversionJob.options (may be None or empty)
+
+    Returns:
+        The selected profile (STANDARD if none is selected)
+
+    Raises:
+        ValidationError: If the option names an unknown profile
+    """
+    name = (options or {}).get(EXPORT_PROFILE_OPTION) or DEFAULT_EXPORT_PROFILE
+    profile = EXPORT_PROFILES.get(str(name).lower())
+    if profile is None:
+        raise ValidationError(
+            f"Unknown export profile: {name}. Supported: {', '.join(EXPORT_PROFILES)}"
+        )
+    return profile
@@ -0,0 +1,26 @@
+"""
+File metadata model shared by the scanner and the UI.
+"""
+from dataclasses import dataclass
+
+
+@dataclass
+class FileEntry:
+    """
+    A convertible file discovered during a folder scan.
+
+    Metadata is captured once during the scan so that consumers
+    (file list, job planning) never need to stat the file again.
+
+    Attributes:
+        path: Absolute path to the file
+        name: File name including extension
+        ext: Lower-case extension including the dot (e.g. '.docx')
+        size: File size in bytes (-1 if unknown)
+        mtime: Last modification time as a POSIX timestamp (0.0 if unknown)
+    """
+    path: str
+    name: str
+    ext: str
+    size: int = -1
+    mtime: float = 0.0
@@ -0,0 +1,236 @@
+"""
+Parallel batch execution on top of ConversionService.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+from core.models.conversion_job import ConversionJob, ConversionResult
+from core.services.concurrency import ConcurrencyController, ConcurrencyPolicy
+from core.services.conversion_service import ConversionService
+from core.services.progress import ProgressBus
+from core.services.stage_stats import StageStatistics
+from core.services.staging import StagingArea
+from utils.threading import ConversionWorker
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class JobOutcome:
+    """
+    The result of one job in a batch together with its timing.
+
+    Attributes:
+        job: The executed job
+        result: The conversion result
+        started_at: Wall-clock start time (POSIX timestamp)
+        duration: Seconds spent in ConversionService.convert
+        input_bytes: Input file size in bytes (0 if unknown)
+        sequence: Position of the job in the input order (0-based)
+    """
+    job: ConversionJob
+    result: ConversionResult
+    started_at: float
+    duration: float
+    input_bytes: int = 0
+    sequence: int = 0
+
+
+@dataclass
+class BatchSummary:
+    """
+    Aggregate counts for a finished batch.
+
+    Attributes:
+        total: Number of jobs executed
+        succeeded: Number of successful jobs
+        failed: Number of failed jobs
+        elapsed: Wall-clock seconds for the whole batch
+        stages: Stage timing percentiles per converter (see StageStatistics.summary)
+    """
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    stages: dict = field(default_factory=dict)
+
+
+class BatchRunner:
+    """
+    Runs conversion jobs on a pool of COM-safe worker threads.
+
+    Jobs are pulled lazily from the input iterable and submitted to a
+    bounded queue, so very large (or streamed) batches never need to be
+    materialized up front.
+    """
+
+    def __init__(
+        self,
+        service: ConversionService,
+        num_workers: int = 1,
+        progress: Optional[ProgressBus] = None,
+        staging: Optional[StagingArea] = None,
+        concurrency: Optional[ConcurrencyPolicy] = None
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            service: Conversion service that executes each job
+            num_workers: Number of parallel worker threads (with `concurrency`:
+                         the number of workers active at the start)
+            progress: Optional progress bus that receives per-job events
+            staging: Optional local scratch area; inputs are prefetched as jobs
+                     are queued and outcomes are reported once the PDF is uploaded
+            concurrency: Optional policy for adapting the number of active
+                         workers during the batch (see core.services.concurrency)
+        """
+        self.service = service
+        self.num_workers = max(1, num_workers)
+        self.progress = progress
+        self.staging = staging
+        self.concurrency = concurrency
+
+    def run(
+        self,
+        jobs: Iterable[ConversionJob],
+        on_outcome: Callable[[JobOutcome], None] = None,
+        total: Optional[int] = None
+    ) -> BatchSummary:
+        """
+        Execute all jobs and wait for them to finish.
+
+        Args:
+            jobs: Jobs to execute (may be a lazy iterator)
+            on_outcome: Optional callback for each finished job (called on worker threads)
+            total: Number of jobs, for progress reporting (defaults to len(jobs) if available)
+
+        Returns:
+            BatchSummary with aggregate counts
+        """
+        if total is None and hasattr(jobs, "__len__"):
+            total = len(jobs)
+
+        summary = BatchSummary()
+        stage_stats = StageStatistics()
+        lock = threading.Lock()
+        num_threads = max(self.num_workers, self.concurrency.max_workers) if self.concurrency else self.num_workers
+        queue_size = num_threads * 2
+        if self.staging:
+            # Queued jobs are the prefetch window
+            queue_size = max(queue_size, self.staging.prefetch_count)
+        worker = ConversionWorker(
+            num_threads=num_threads,
+            max_queue_size=queue_size,
+            name="BatchWorker"
+        )
+        controller = None
+        if self.concurrency:
+            controller = ConcurrencyController(worker, self.concurrency, initial=self.num_workers, progress=self.progress)
+
+        if self.progress:
+            self.progress.start(total=total or 0)
+        if self.service.metrics is not None:
+            self.service.metrics.watch_worker(worker)
+
+        def make_task(job: ConversionJob, sequence: int):
+            def task():
+                return self._execute(job, sequence)
+
+            def callback(outcome):
+                if isinstance(outcome, Exception):
+                    # _execute never raises; this only happens if on_outcome itself failed
+                    return
+                if self.staging:
+                    def uploaded(result):
+                        outcome.result = result
+                        report(outcome)
+                    self.staging.upload(job, outcome.result, uploaded)
+                else:
+                    report(outcome)
+
+            def report(outcome):
+                stage_stats.add(outcome.result)
+                if controller:
+                    controller.record(outcome.result.success)
+                with lock:
+                    summary.total += 1
+                    if outcome.result.success:
+                        summary.succeeded += 1
+                    else:
+                        summary.failed += 1
+                if on_outcome:
+                    try:
+                        on_outcome(outcome)
+                    except Exception as e:
+                        logger.error("Outcome handler failed for %s: %s", job.input_path, e, exc_info=True)
+
+            return task, callback
+
+        batch_start = time.monotonic()
+        if controller:
+            # Before the threads start, so none of them takes a slot over the initial limit
+            controller.start()
+        worker.start()
+        try:
+            for sequence, job in enumerate(jobs):
+                task, callback = make_task(job, sequence)
+                if self.staging:
+                    self.staging.prefetch(job)
+                worker.submit(task, callback)
+            worker.wait_until_idle()
+            if self.staging:
+                self.staging.wait_for_uploads()
+        finally:
+            if controller:
+                controller.stop()
+            worker.stop()
+            summary.elapsed = time.monotonic() - batch_start
+            summary.stages = stage_stats.summary()
+            if self.progress:
+                self.progress.finish()
+
+        logger.info(
+            f"Batch finished: {summary.succeeded} succeeded, {summary.failed} failed "
+            f"in {summary.elapsed:.1f}s"
+        )
+        if summary.stages:
+            logger.info("Stage timings (ms):\n" + stage_stats.format_table())
+        return summary
+
+    def _execute(self, job: ConversionJob, sequence: int = 0) -> JobOutcome:
+        """Convert a single job with timing and progress events (worker thread)."""
+        try:
+            input_bytes = os.path.getsize(job.input_path)
+        except OSError:
+            input_bytes = 0
+
+        if self.progress:
+            self.progress.job_started(job.input_path)
+
+        started_at = time.time()
+        t0 = time.perf_counter()
+        try:
+            if self.staging:
+                result = self.staging.convert(job, self.service.convert)
+            else:
+                result = self.service.convert(job)
+        except Exception as e:
+            logger.error("Unexpected error converting %s: %s", job.input_path, e, exc_info=True)
+            result = ConversionResult.failure_result(error=e, message=f"Unexpected error: {e}")
+        duration = time.perf_counter() - t0
+
+        if self.progress:
+            self.progress.job_finished(result.success, input_bytes)
+
+        return JobOutcome(
+            job=job,
+            result=result,
+            started_at=started_at,
+            duration=duration,
+            input_bytes=input_bytes,
+            sequence=sequence
+        )
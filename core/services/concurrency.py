@@ -0,0 +1,281 @@
+"""
+Adaptive concurrency: how many Office workers convert at once.
+
+The best number of parallel Office instances depends on the machine's
+CPUs, memory and disk and on the document mix, and changes during a
+batch. The controller samples each interval and adjusts the active limit
+of a ConversionWorker AIMD-style:
+
+    memory pressure or a high failure rate
+                        -> multiplicative decrease (limit * decrease_factor)
+    the last increase did not raise throughput
+                        -> step back by one and hold for a few intervals
+    work is waiting, the CPUs have headroom and the last step paid off
+                        -> additive increase (limit + 1)
+
+A busy CPU only stops increases: Office conversions are mostly CPU-bound,
+so full CPUs are the goal, and oversubscription shows up as a throughput
+drop that the next interval steps back from.
+
+Every change is logged and published as ProgressSnapshot.worker_limit.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+from core.services.progress import ProgressBus
+from utils.logging import get_logger
+from utils.system import SystemLoad, SystemLoadProbe
+from utils.threading import ConversionWorker
+
+logger = get_logger(__name__)
+
+# Reasons for a limit change (ConcurrencyDecision.reason)
+REASON_START = "start"
+REASON_INCREASE = "increase"
+REASON_NO_GAIN = "no_gain"
+REASON_MEMORY = "memory"
+REASON_FAILURES = "failures"
+
+# Decisions kept in ConcurrencyController.decisions
+_DECISION_HISTORY = 1000
+
+
+@dataclass
+class ConcurrencyPolicy:
+    """
+    Bounds and thresholds of the adaptive controller.
+
+    Attributes:
+        min_workers: Lowest active limit
+        max_workers: Highest active limit (the worker pool has this many threads)
+        interval: Seconds between decisions
+        cpu_high: System CPU busy fraction above which the limit is not raised
+        memory_high: System memory use fraction that counts as pressure
+        failure_high: Failure rate in an interval that counts as pressure
+        min_samples: Conversions a window needs before it is judged; shorter
+                     windows are extended into the next interval
+        decrease_factor: Multiplier applied to the limit under pressure
+        min_gain: Relative throughput gain an increase must bring to be kept
+        cooldown: Windows to hold the limit after a decrease
+        probe: Callable returning the current SystemLoad (default: SystemLoadProbe)
+    """
+    min_workers: int = 1
+    max_workers: int = 4
+    interval: float = 15.0
+    cpu_high: float = 0.90
+    memory_high: float = 0.85
+    failure_high: float = 0.25
+    min_samples: int = 8
+    decrease_factor: float = 0.5
+    min_gain: float = 0.05
+    cooldown: int = 2
+    probe: Optional[Callable[[], SystemLoad]] = None
+
+
+@dataclass(frozen=True)
+class ConcurrencyDecision:
+    """
+    One change of the active limit.
+
+    Attributes:
+        elapsed: Seconds since the controller started
+        previous: Limit before the change (0 for the initial limit)
+        limit: Limit after the change
+        reason: One of the REASON_* values
+        files_per_second: Throughput in the interval that led to the change
+        failure_rate: Failed fraction of the interval's conversions
+        cpu: System CPU busy fraction (None if unknown)
+        memory: System memory use fraction (None if unknown)
+    """
+    elapsed: float
+    previous: int
+    limit: int
+    reason: str
+    files_per_second: float = 0.0
+    failure_rate: float = 0.0
+    cpu: Optional[float] = None
+    memory: Optional[float] = None
+
+
+class ConcurrencyController:
+    """
+    AIMD controller for a ConversionWorker's active limit.
+
+    Usage:
+        controller = ConcurrencyController(worker, policy, initial=2, progress=bus)
+        controller.start()
+        ...                               # controller.record(success) per finished job
+        controller.stop()
+    """
+
+    def __init__(
+        self,
+        worker: ConversionWorker,
+        policy: ConcurrencyPolicy,
+        initial: Optional[int] = None,
+        progress: Optional[ProgressBus] = None
+    ):
+        """
+        Args:
+            worker: Worker pool to control (with at least policy.max_workers threads)
+            policy: Bounds and thresholds
+            initial: Starting limit (default: policy.min_workers)
+            progress: Optional progress bus that receives every change
+        """
+        self.worker = worker
+        self.policy = policy
+        self.progress = progress
+        self.decisions: deque = deque(maxlen=_DECISION_HISTORY)
+        self._probe = policy.probe or SystemLoadProbe()
+        self._limit = self._clamp(initial if initial is not None else policy.min_workers)
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+        self._started_at = time.monotonic()
+        self._last_tick = self._started_at
+        self._cooldown = 0
+        # Throughput before the last increase, while its effect is being judged
+        self._probing_from: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def limit(self) -> int:
+        """Current active limit."""
+        return self._limit
+
+    def _clamp(self, limit: int) -> int:
+        return max(self.policy.min_workers, min(self.policy.max_workers, limit))
+
+    def start(self):
+        """Apply the initial limit and start deciding on a background thread."""
+        self._started_at = self._last_tick = time.monotonic()
+        self._probe()  # starts the CPU measurement window
+        self._apply(self._limit, REASON_START, 0.0, 0.0, SystemLoad(), previous=0)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ConcurrencyController", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop deciding and log a summary of the changes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        changes = [d for d in self.decisions if d.reason != REASON_START]
+        if changes:
+            limits = [d.limit for d in self.decisions]
+            logger.info(
+                "Worker limit changed %d time(s) (range %d-%d, final %d)",
+                len(changes), min(limits), max(limits), self._limit
+            )
+
+    def record(self, success: bool):
+        """Count a finished conversion (any thread)."""
+        with self._lock:
+            self._completed += 1
+            if not success:
+                self._failed += 1
+
+    def tick(self) -> Optional[ConcurrencyDecision]:
+        """
+        Evaluate the window since the previous decision and adjust the limit.
+
+        Called by the background thread every policy.interval seconds.
+
+        Returns:
+            The decision if the limit changed, else None
+        """
+        load = self._probe()
+        policy = self.policy
+        limit = self._limit
+        memory_pressure = load.memory is not None and load.memory >= policy.memory_high
+        now = time.monotonic()
+        with self._lock:
+            completed, failed = self._completed, self._failed
+        if completed < policy.min_samples and not memory_pressure:
+            # Too few conversions to judge: extend the window into the next interval
+            return None
+        failure_rate = failed / completed if completed else 0.0
+
+        reason = None
+        if memory_pressure:
+            reason = REASON_MEMORY
+        elif failure_rate >= policy.failure_high:
+            reason = REASON_FAILURES
+        if reason is not None and self._cooldown > 0 and self.worker.active_count > limit:
+            # Workers over the last decrease are still finishing; wait for it to take
+            # effect and keep this window's counts for the next decision
+            return None
+
+        with self._lock:
+            # Conversions recorded since the counts were read stay in the next window
+            self._completed -= completed
+            self._failed -= failed
+        elapsed, self._last_tick = now - self._last_tick, now
+        files_per_second = completed / elapsed if elapsed > 0 else 0.0
+
+        if reason is not None:
+            # Multiplicative decrease
+            self._probing_from = None
+            self._cooldown = policy.cooldown
+            return self._apply(int(limit * policy.decrease_factor), reason, files_per_second, failure_rate, load)
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return None
+
+        if self._probing_from is not None:
+            baseline, self._probing_from = self._probing_from, None
+            if files_per_second < baseline * (1 + policy.min_gain):
+                self._cooldown = policy.cooldown
+                return self._apply(limit - 1, REASON_NO_GAIN, files_per_second, failure_rate, load)
+
+        cpu_headroom = load.cpu is None or load.cpu < policy.cpu_high
+        if cpu_headroom and limit < policy.max_workers and self.worker.queue_size > 0:
+            # Additive increase while work is waiting for a worker
+            self._probing_from = files_per_second
+            return self._apply(limit + 1, REASON_INCREASE, files_per_second, failure_rate, load)
+        return None
+
+    def _apply(
+        self, limit: int, reason: str, files_per_second: float, failure_rate: float,
+        load: SystemLoad, previous: Optional[int] = None
+    ) -> Optional[ConcurrencyDecision]:
+        limit = self._clamp(limit)
+        previous = self._limit if previous is None else previous
+        if limit == previous:
+            return None
+        self._limit = self.worker.set_active_limit(limit)
+        decision = ConcurrencyDecision(
+            elapsed=time.monotonic() - self._started_at,
+            previous=previous,
+            limit=self._limit,
+            reason=reason,
+            files_per_second=files_per_second,
+            failure_rate=failure_rate,
+            cpu=load.cpu,
+            memory=load.memory
+        )
+        self.decisions.append(decision)
+        logger.info(
+            "Worker limit %d -> %d (%s): %.2f files/s, %.0f%% failed, CPU %s, memory %s",
+            previous, self._limit, reason, files_per_second, failure_rate * 100,
+            _percent(load.cpu), _percent(load.memory)
+        )
+        if self.progress:
+            self.progress.worker_limit_changed(self._limit, reason)
+        return decision
+
+    def _loop(self):
+        while not self._stop.wait(self.policy.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Concurrency controller failed: %s", e, exc_info=True)
+
+
+def _percent(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0%}"
@@ -2,15 +2,32 @@
 Conversion service - orchestrates the conversion workflow.
 """
 import os
+import threading
+import time
+from array import array
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple, Union
 from core.interfaces.converter import IConverter
+from core.services.converter_registry import ConverterSpec
+from core.services.metrics import ConversionMetrics
 from core.models.conversion_job import ConversionJob, ConversionResult
-from utils.exceptions import UnsupportedFileTypeError, ValidationError
-from utils.logging import get_logger
+from core.models.export_profile import export_profile_for
+from core.services.output_verifier import OutputVerifier
+from core.services.preflight import Preflight, PreflightReport, APP_EXTENSIONS
+from core.services.profiling import PROFILE_OPTION, JobProfiler
+from core.services.progress import ProgressBus
+from core.services.result_table import ResultTable
+from core.services.trace import TraceRecorder
+from utils.exceptions import (
+    OfficeApplicationError, OutputVerificationError, PreflightError, UnsupportedFileTypeError, ValidationError
+)
+from utils.logging import get_logger, log_context
 
 logger = get_logger(__name__)
 
+# Metrics label of jobs rejected before a converter was chosen
+NO_CONVERTER = "none"
+
 
 class ConversionService:
     """
@@ -20,9 +37,35 @@ class ConversionService:
     it depends on the IConverter abstraction, not concrete implementations.
     """
     
-    def __init__(self):
-        """Initialize the conversion service."""
-        self._converters: Dict[str, IConverter] = {}
+    def __init__(
+        self,
+        verifier: Optional[OutputVerifier] = None,
+        metrics: Optional[ConversionMetrics] = None,
+        trace: Optional[TraceRecorder] = None,
+        profiler: Optional[JobProfiler] = None,
+        preflight: Optional[Preflight] = None
+    ):
+        """
+        Initialize the conversion service.
+        
+        Args:
+            verifier: Optional verifier run on every successful output
+            metrics: Optional metrics that record every conversion
+            trace: Optional recorder that writes every conversion to a workload trace
+            profiler: Optional profiler for selected jobs (defaults to one configured by
+                      PDFCONVERTER_PROFILE, if set)
+            preflight: Optional content check run before a converter is chosen; rejects
+                       bad inputs without a COM call and reroutes mis-named files
+        """
+        # Extension -> converter instance, or its spec until first use
+        self._converters: Dict[str, Union[IConverter, ConverterSpec]] = {}
+        self._loaded: Dict[ConverterSpec, IConverter] = {}
+        self._load_lock = threading.Lock()
+        self.verifier = verifier
+        self.metrics = metrics
+        self.trace = trace
+        self.profiler = profiler or JobProfiler.from_environment()
+        self.preflight = preflight
         
     def register_converter(self, converter: IConverter):
         """
@@ -33,7 +76,43 @@ class ConversionService:
         """
         for ext in converter.supported_extensions():
             self._converters[ext.lower()] = converter
-            logger.debug(f"Registered converter for {ext}: {converter.__class__.__name__}")
+            logger.debug("Registered converter for %s: %s", ext, converter.__class__.__name__)
+    
+    def register_lazy(self, spec: ConverterSpec):
+        """
+        Register a converter by metadata; it is imported and instantiated
+        when the first file with one of its extensions is converted.
+        
+        Args:
+            spec: Converter module, class name and extensions
+        """
+        for ext in spec.extensions:
+            self._converters[ext.lower()] = spec
+        logger.debug("Registered lazy converter %s for %s", spec.name, ", ".join(spec.extensions))
+    
+    def _load_converter(self, spec: ConverterSpec) -> IConverter:
+        """
+        Instantiate a lazily registered converter (once) and register it in place of its spec.
+        
+        Raises:
+            OfficeApplicationError: If the converter cannot be imported
+        """
+        with self._load_lock:
+            converter = self._loaded.get(spec)
+            if converter is not None:
+                # Another thread loaded it while this one waited
+                return converter
+            start = time.perf_counter()
+            try:
+                converter = spec.load()
+            except (ImportError, AttributeError) as e:
+                raise OfficeApplicationError(f"Failed to load {spec.name}: {e}")
+            self._loaded[spec] = converter
+            for ext, value in self._converters.items():
+                if value is spec:
+                    self._converters[ext] = converter
+        logger.debug("Loaded %s in %.1f ms", spec.name, (time.perf_counter() - start) * 1000)
+        return converter
             
     def get_supported_extensions(self) -> List[str]:
         """
@@ -53,11 +132,17 @@ class ConversionService:
         """
         result = {}
         for ext, converter in self._converters.items():
-            result[ext] = converter.__class__.__name__
+            result[ext] = converter.name if isinstance(converter, ConverterSpec) else converter.__class__.__name__
         return result
         return list(self._converters.keys())
     
-    def create_job(self, input_path: str, output_folder: str = None, custom_output_name: str = None) -> ConversionJob:
+    def create_job(
+        self,
+        input_path: str,
+        output_folder: str = None,
+        custom_output_name: str = None,
+        options: Dict[str, Any] = None
+    ) -> ConversionJob:
         """
         Create a conversion job.
         
@@ -65,24 +150,50 @@ class ConversionService:
             input_path: Path to the input file
             output_folder: Optional output folder (defaults to same as input)
             custom_output_name: Optional custom output filename (without extension)
+            options: Optional conversion options
             
         Returns:
             ConversionJob instance
             
         Raises:
-            ValidationError: If the file doesn't exist or is unsupported
+            ValidationError: If the file doesn't exist or is unsupported, or the
+                             options name an unknown export profile
         """
         if not os.path.isfile(input_path):
             raise ValidationError(f"File not found: {input_path}")
         
-        # Determine output path
-        input_file = Path(input_path)
-        ext = input_file.suffix.lower()
-        
+        ext = Path(input_path).suffix.lower()
         if ext not in self._converters:
             raise UnsupportedFileTypeError(
                 f"Unsupported file type: {ext}. Supported: {', '.join(self.get_supported_extensions())}"
             )
+        export_profile_for(options)
+        
+        return self.build_job(input_path, output_folder, custom_output_name, options)
+    
+    def build_job(
+        self,
+        input_path: str,
+        output_folder: str = None,
+        custom_output_name: str = None,
+        options: Dict[str, Any] = None
+    ) -> ConversionJob:
+        """
+        Build a conversion job without touching the file system.
+        
+        Callers are responsible for validation; bulk loaders use this after
+        checking many files at once instead of one stat per file.
+        
+        Args:
+            input_path: Path to the input file
+            output_folder: Optional output folder (defaults to same as input)
+            custom_output_name: Optional custom output filename (without extension)
+            options: Optional conversion options
+            
+        Returns:
+            ConversionJob instance
+        """
+        input_file = Path(input_path)
         
         # Determine output filename
         if custom_output_name:
@@ -94,12 +205,13 @@ class ConversionService:
         if output_folder:
             output_path = os.path.join(output_folder, pdf_name)
         else:
-            output_path = str(input_file.with_suffix(".pdf"))
+            output_path = str(input_file.with_name(pdf_name))
             
         return ConversionJob(
             input_path=input_path,
             output_path=output_path,
-            output_folder=output_folder
+            output_folder=output_folder,
+            options=dict(options) if options else {}
         )
     
     def convert(self, job: ConversionJob) -> ConversionResult:
@@ -112,29 +224,226 @@ class ConversionService:
         Returns:
             ConversionResult
         """
-        # Determine converter based on file extension
+        # Determine converter based on file extension, or on content if it disagrees
+        start = time.perf_counter()
         ext = Path(job.input_path).suffix.lower()
+        preflight_seconds = None
+        if self.preflight is not None:
+            report, rejected = self._preflight(job, start)
+            if rejected is not None:
+                return rejected
+            preflight_seconds = time.perf_counter() - start
+            if report is not None and not report.matches(ext):
+                ext = self._route(job, report)
         converter = self._converters.get(ext)
         
         if not converter:
             error = UnsupportedFileTypeError(f"No converter registered for {ext}")
-            return ConversionResult.failure_result(error=error, message=str(error))
+            result = ConversionResult.failure_result(error=error, message=str(error))
+            return self._finish(job, result, start, started=False)
+        if isinstance(converter, ConverterSpec):
+            try:
+                converter = self._load_converter(converter)
+            except OfficeApplicationError as e:
+                logger.error(str(e))
+                result = ConversionResult.failure_result(error=e, message=str(e))
+                result.converter = converter.name
+                return self._finish(job, result, start, started=False)
         
-        logger.info(f"Converting {job.input_path} using {converter.__class__.__name__}")
-        return converter.convert(job)
+        converter_name = converter.__class__.__name__
+        with log_context(job_id=job.job_id, converter=converter_name):
+            return self._run_converter(job, converter, converter_name, preflight_seconds)
+    
+    def screen(self, job: ConversionJob) -> Optional[ConversionResult]:
+        """
+        Run the preflight check on a job's input before it is staged.
+
+        The staging area calls this on the original path: the "~$" owner
+        file of a document open elsewhere lies next to the original, not
+        next to the scratch copy, and a rejected input is not copied.
+
+        Args:
+            job: The original job
+
+        Returns:
+            The job's failure result if the input is rejected, else None
+        """
+        if self.preflight is None:
+            return None
+        return self._preflight(job, time.perf_counter())[1]
+    
+    def _preflight(
+        self,
+        job: ConversionJob,
+        start: float
+    ) -> Tuple[Optional[PreflightReport], Optional[ConversionResult]]:
+        """Preflight report for a job's input, or the finished failure result if it is rejected."""
+        try:
+            return self.preflight.check(job.input_path), None
+        except PreflightError as e:
+            logger.warning("Preflight rejected %s [%s]: %s", job.input_path, e.code, e)
+            result = ConversionResult.failure_result(error=e, message=str(e))
+            result.stage_timings["preflight"] = time.perf_counter() - start
+            return None, self._finish(job, result, start, started=False)
+    
+    def _route(self, job: ConversionJob, report: PreflightReport) -> str:
+        """Extension whose converter handles the content found by the preflight check."""
+        for ext in (report.extension,) + APP_EXTENSIONS[report.application]:
+            if ext in self._converters:
+                logger.info(
+                    "Routing %s as %s: content is a %s %s file",
+                    job.input_path, ext, report.container.upper(), report.application
+                )
+                return ext
+        return report.extension
+    
+    def _run_converter(
+        self,
+        job: ConversionJob,
+        converter: IConverter,
+        converter_name: str,
+        preflight_seconds: Optional[float] = None
+    ) -> ConversionResult:
+        """Run a converter with verification, timing, metrics and tracing."""
+        logger.info("Converting %s using %s", job.input_path, converter_name)
+        start = time.perf_counter()
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.job_started(converter_name)
+        profiler = self.profiler
+        if profiler is None and job.options.get(PROFILE_OPTION):
+            profiler = self.profiler = JobProfiler(selectors=set())
+        try:
+            if profiler is not None and profiler.wants(job, converter_name):
+                result = profiler.run(job, converter_name, lambda: converter.convert(job))
+            else:
+                result = converter.convert(job)
+        except Exception as e:
+            if metrics is not None:
+                metrics.job_finished(converter_name, ConversionResult.failure_result(error=e))
+            raise
+        if result.success and self.verifier is not None:
+            result = self._verify_output(job, result)
+        if preflight_seconds is not None:
+            result.stage_timings["preflight"] = preflight_seconds
+        result.converter = converter_name
+        return self._finish(job, result, start)
+
+    def _finish(
+        self,
+        job: ConversionJob,
+        result: ConversionResult,
+        start: float,
+        started: bool = True
+    ) -> ConversionResult:
+        """
+        Complete a result and record it in metrics and the trace.
+
+        Every result returned by convert goes through here, including jobs
+        rejected before a converter ran.
+
+        Args:
+            job: The job
+            result: Its result (converter already set, if any)
+            start: perf_counter value when the conversion started
+            started: Whether metrics.job_started was called for the job
+        """
+        result.duration = time.perf_counter() - start
+        result.input_bytes = self._input_size(job)
+        if result.success and result.output_bytes is None:
+            try:
+                result.output_bytes = os.path.getsize(result.output_path or job.output_path)
+            except OSError:
+                pass
+        metrics = self.metrics
+        if metrics is not None:
+            label = result.converter or NO_CONVERTER
+            if not started:
+                # Count the job; its instance gauge goes up and straight back down
+                metrics.job_started(label)
+            metrics.job_finished(label, result)
+        if self.trace is not None:
+            self.trace.record(job, result)
+        if result.error is not None:
+            _release_traceback(result.error)
+        return result
+    
+    def _verify_output(self, job: ConversionJob, result: ConversionResult) -> ConversionResult:
+        """Check a reported success against the file actually written."""
+        output_path = result.output_path or job.output_path
+        start = time.perf_counter()
+        check = self.verifier.verify(output_path)
+        result.stage_timings["verify"] = time.perf_counter() - start
+        if not check.ok:
+            error = OutputVerificationError(f"{check.problem}: {output_path}")
+            failure = ConversionResult.failure_result(error=error, message=f"Output verification failed: {check.problem}")
+            failure.stage_timings = result.stage_timings
+            return failure
+        result.page_count = check.page_count
+        result.output_bytes = check.size
+        return result
     
-    def convert_batch(self, jobs: List[ConversionJob]) -> List[ConversionResult]:
+    def convert_batch(
+        self,
+        jobs: List[ConversionJob],
+        progress: Optional[ProgressBus] = None,
+        results: Optional[ResultTable] = None
+    ) -> Union[List[ConversionResult], ResultTable]:
         """
         Convert multiple files.
         
         Args:
-            jobs: List of conversion jobs
+            jobs: List of conversion jobs (or a JobTable)
+            progress: Optional progress bus that receives per-job events
+            results: Optional ResultTable to fill instead of building a list;
+                     each result is stored as soon as it is produced
             
         Returns:
-            List of conversion results
+            List of conversion results, or `results` if given
         """
-        results = []
-        for job in jobs:
-            result = self.convert(job)
-            results.append(result)
-        return results
+        if progress is None and results is None:
+            return [self.convert(job) for job in jobs]
+        
+        if progress is not None:
+            sizes = array("q", (self._input_size(job) for job in jobs))
+            progress.start(total=len(jobs), bytes_total=sum(sizes))
+        
+        collected = []
+        try:
+            for index, job in enumerate(jobs):
+                if progress is not None:
+                    progress.job_started(job.input_path)
+                result = self.convert(job)
+                if progress is not None:
+                    progress.job_finished(result.success, sizes[index])
+                if results is not None:
+                    results.set(index, result)
+                else:
+                    collected.append(result)
+        finally:
+            if progress is not None:
+                progress.finish()
+        return results if results is not None else collected
+    
+    @staticmethod
+    def _input_size(job: ConversionJob) -> int:
+        """Get the input file size in bytes (0 if it cannot be determined)."""
+        try:
+            return os.path.getsize(job.input_path)
+        except OSError:
+            return 0
+
+
+def _release_traceback(error: BaseException):
+    """
+    Drop the traceback of a failed conversion (and of the errors it chains).
+
+    The traceback keeps the adapter's frames alive, and with them the COM
+    objects they referenced; the error has already been logged, and
+    results may be kept until the end of a large batch.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        error.__traceback__ = None
+        error = error.__cause__ or error.__context__
@@ -0,0 +1,38 @@
+"""
+Lightweight converter metadata for lazy loading.
+
+Importing an Office adapter pulls in win32com, which dominates startup
+time of the frozen build. A ConverterSpec names the adapter class and the
+extensions it handles, so ConversionService can list supported types
+right away and import the adapter only when the first file needs it.
+"""
+import importlib
+from dataclasses import dataclass
+from typing import Tuple
+from core.interfaces.converter import IConverter
+
+
+@dataclass(frozen=True)
+class ConverterSpec:
+    """
+    Where to find a converter and what it handles.
+
+    Attributes:
+        name: Converter class name (also the name used in reports and metrics)
+        module: Dotted module path that defines the class
+        extensions: File extensions the converter handles (lower case, with dot)
+    """
+    name: str
+    module: str
+    extensions: Tuple[str, ...]
+
+    def load(self) -> IConverter:
+        """
+        Import the module and instantiate the converter.
+
+        Raises:
+            ImportError: If the module (or one of its dependencies) cannot be imported
+            AttributeError: If the module does not define the class
+        """
+        module = importlib.import_module(self.module)
+        return getattr(module, self.name)()
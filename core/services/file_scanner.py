@@ -3,7 +3,9 @@ File scanning service for discovering convertible documents.
 """
 import os
 from pathlib import Path
-from typing import List, Set
+import threading
+from typing import Iterator, List, Optional, Set
+from core.models.file_entry import FileEntry
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -54,3 +56,97 @@ class FileScanner:
         except Exception as e:
             logger.error(f"Error scanning folder {folder_path}: {e}")
             return []
+    
+    def scan_entries(self, folder_path: str, recursive: bool = False) -> List[FileEntry]:
+        """
+        Scan a folder for supported files, collecting size and mtime in the same pass.
+        
+        Args:
+            folder_path: Path to the folder to scan
+            recursive: If True, also scan subfolders
+            
+        Returns:
+            List of FileEntry objects for supported files
+        """
+        if not os.path.isdir(folder_path):
+            logger.warning(f"Invalid folder path: {folder_path}")
+            return []
+        
+        try:
+            found_entries = list(self.iter_entries(folder_path, recursive=recursive))
+            logger.info(f"Found {len(found_entries)} convertible file(s) in {folder_path}")
+            return found_entries
+            
+        except Exception as e:
+            logger.error(f"Error scanning folder {folder_path}: {e}")
+            return []
+    
+    def iter_entries(
+        self,
+        folder_path: str,
+        cancel_event: Optional[threading.Event] = None,
+        recursive: bool = False
+    ) -> Iterator[FileEntry]:
+        """
+        Lazily yield supported files in a folder as they are discovered.
+        
+        Uses os.scandir, whose directory entries carry cached stat data on
+        Windows, so no extra system call is needed per file.
+        
+        Args:
+            folder_path: Path to the folder to scan
+            cancel_event: Optional event; when set, the scan stops at the next entry
+            recursive: If True, also scan subfolders (depth-first, unreadable subfolders are skipped)
+            
+        Yields:
+            FileEntry objects for supported files
+            
+        Raises:
+            OSError: If the top-level folder cannot be listed
+        """
+        root = os.path.abspath(folder_path)
+        pending = [root]
+        while pending:
+            current = pending.pop()
+            subfolders = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if cancel_event is not None and cancel_event.is_set():
+                            return
+                        if recursive and entry.is_dir(follow_symlinks=False):
+                            subfolders.append(entry.path)
+                            continue
+                        file_entry = self._make_entry(entry)
+                        if file_entry is not None:
+                            yield file_entry
+            except OSError as e:
+                if current == root:
+                    raise
+                logger.warning(f"Skipping unreadable folder {current}: {e}")
+            # Visit subfolders in listing order
+            pending.extend(reversed(subfolders))
+    
+    def _make_entry(self, entry: os.DirEntry) -> FileEntry:
+        """
+        Build a FileEntry from a directory entry if it is a supported file.
+        
+        Args:
+            entry: Directory entry returned by os.scandir
+            
+        Returns:
+            FileEntry, or None if the entry is not a supported file
+        """
+        ext = os.path.splitext(entry.name)[1].lower()
+        if ext not in self.supported_extensions:
+            return None
+        
+        try:
+            if not entry.is_file():
+                return None
+            st = entry.stat()
+            size, mtime = st.st_size, st.st_mtime
+        except OSError:
+            size, mtime = -1, 0.0
+        
+        return FileEntry(path=entry.path, name=entry.name, ext=ext, size=size, mtime=mtime)
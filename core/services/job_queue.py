@@ -0,0 +1,178 @@
+"""
+Persistent job queue for long-running conversion services.
+
+Each job is stored as a small JSON file, so queued work survives a
+restart of the process.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Job states
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_SUCCEEDED = "succeeded"
+STATE_FAILED = "failed"
+
+FINISHED_STATES = (STATE_SUCCEEDED, STATE_FAILED)
+
+
+@dataclass
+class JobRecord:
+    """
+    Persistent state of a queued conversion job.
+
+    Attributes:
+        job_id: Unique job identifier
+        input_path: Path to the source document
+        output_path: Path where the PDF is written
+        state: One of queued, running, succeeded, failed
+        source: How the job was submitted ('upload' or 'path')
+        created_at: Submission time (POSIX timestamp)
+        started_at: Conversion start time (None until running)
+        finished_at: Conversion end time (None until finished)
+        message: Human-readable status message
+        error_type: Exception class name for failed jobs
+        options: Conversion options passed to the job
+    """
+    job_id: str
+    input_path: str
+    output_path: str
+    state: str = STATE_QUEUED
+    source: str = "path"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    message: str = ""
+    error_type: Optional[str] = None
+    options: Dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dict."""
+        return asdict(self)
+
+
+class PersistentJobQueue:
+    """
+    Thread-safe job store backed by one JSON file per job.
+
+    On startup, jobs that were running when the process stopped are
+    returned to the queue so they are converted again.
+    """
+
+    def __init__(self, data_dir: str):
+        """
+        Open (or create) a job store.
+
+        Args:
+            data_dir: Directory holding the job files
+        """
+        self.jobs_dir = os.path.join(data_dir, "jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._records: Dict[str, JobRecord] = {}
+        # Jobs found in the running state at load time (interrupted by a crash or restart)
+        self.requeued = 0
+        self._load()
+
+    @staticmethod
+    def new_job_id() -> str:
+        """Generate a new unique job id."""
+        return uuid.uuid4().hex
+
+    def add(self, record: JobRecord):
+        """
+        Persist a new job.
+
+        Args:
+            record: Job to add (normally in the queued state)
+        """
+        with self._lock:
+            self._records[record.job_id] = record
+            self._save(record)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            JobRecord, or None if unknown
+        """
+        with self._lock:
+            return self._records.get(job_id)
+
+    def update(self, job_id: str, **changes) -> JobRecord:
+        """
+        Update and persist fields of a job.
+
+        Args:
+            job_id: Job identifier
+            **changes: Field values to set
+
+        Returns:
+            The updated JobRecord
+
+        Raises:
+            KeyError: If the job is unknown
+        """
+        with self._lock:
+            record = self._records[job_id]
+            for name, value in changes.items():
+                setattr(record, name, value)
+            self._save(record)
+            return record
+
+    def pending(self) -> List[JobRecord]:
+        """Get queued jobs in submission order."""
+        with self._lock:
+            queued = [r for r in self._records.values() if r.state == STATE_QUEUED]
+        return sorted(queued, key=lambda r: r.created_at)
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of jobs per state."""
+        result = {state: 0 for state in (STATE_QUEUED, STATE_RUNNING) + FINISHED_STATES}
+        with self._lock:
+            for record in self._records.values():
+                result[record.state] = result.get(record.state, 0) + 1
+        return result
+
+    def _save(self, record: JobRecord):
+        """Atomically write a job file (caller holds the lock)."""
+        path = os.path.join(self.jobs_dir, f"{record.job_id}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        """Load all job files, re-queueing interrupted jobs."""
+        requeued = 0
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    record = JobRecord(**json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable job file {path}: {e}")
+                continue
+            if record.state == STATE_RUNNING:
+                record.state = STATE_QUEUED
+                record.started_at = None
+                self._save(record)
+                requeued += 1
+            self._records[record.job_id] = record
+        self.requeued = requeued
+        if self._records:
+            logger.info(f"Loaded {len(self._records)} job(s) from {self.jobs_dir} ({requeued} re-queued)")
@@ -0,0 +1,359 @@
+"""
+Manifest-driven batches.
+
+A manifest lists conversion jobs explicitly, one per row, so that very
+large batches with per-job output names and options can be fed to the
+batch pipeline without scanning folders.
+
+Supported formats:
+    CSV:   header row with an 'input' column and optional 'output_name',
+           'output_folder' and 'options' (a JSON object) columns
+    JSONL: one JSON object per line with the same keys
+"""
+import csv
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
+from core.models.conversion_job import ConversionJob
+from core.services.conversion_service import ConversionService
+from core.services.output_layout import OutputPlanner
+from utils.exceptions import ValidationError
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """
+    One job definition read from a manifest.
+
+    Attributes:
+        line: Line (JSONL) or row (CSV) number in the manifest, for error reporting
+        input_path: Absolute path to the source document
+        output_name: Optional output file name without extension
+        output_folder: Optional output folder override
+        options: Conversion options for the job
+    """
+    line: int
+    input_path: str
+    output_name: Optional[str] = None
+    output_folder: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ManifestError:
+    """
+    A manifest row that could not be turned into a job.
+
+    Attributes:
+        line: Line or row number in the manifest
+        input_path: Input path from the row (may be empty)
+        reason: Why the row was rejected
+    """
+    line: int
+    input_path: str
+    reason: str
+
+
+def iter_manifest(manifest_path: str, fmt: Optional[str] = None) -> Iterator[Any]:
+    """
+    Stream entries from a CSV or JSONL manifest.
+
+    Malformed rows are yielded as ManifestError instead of raising, so one
+    bad line does not abort a large batch. Relative input paths are resolved
+    against the manifest's folder. The file is opened (and a CSV header
+    read) by this call, not on the first iteration, so a missing or invalid
+    manifest is reported before the batch starts.
+
+    Args:
+        manifest_path: Path to the manifest file
+        fmt: 'csv' or 'jsonl' (default: inferred from the file extension)
+
+    Returns:
+        Iterator of ManifestEntry or ManifestError objects, in file order;
+        closing it closes the file
+
+    Raises:
+        OSError: If the manifest cannot be opened
+        ValidationError: If the format is unknown or the CSV has no 'input' column
+    """
+    if fmt is None:
+        fmt = "csv" if manifest_path.lower().endswith(".csv") else "jsonl"
+    if fmt not in ("csv", "jsonl"):
+        raise ValidationError(f"Unknown manifest format: {fmt}")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    f = open(manifest_path, "r", encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "input" not in reader.fieldnames:
+                raise ValidationError("CSV manifest must have an 'input' column")
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            rows = _iter_jsonl(f)
+    except BaseException:
+        f.close()
+        raise
+    return _ManifestIterator(f, rows, base_dir)
+
+
+class _ManifestIterator:
+    """Entries of an open manifest; close() closes the file even before iteration starts."""
+
+    def __init__(self, f, rows: Iterator[tuple], base_dir: str):
+        self._f = f
+        self._rows = rows
+        self._base_dir = base_dir
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            line, row = next(self._rows)
+        except StopIteration:
+            self.close()
+            raise
+        if isinstance(row, ManifestError):
+            return row
+        return _parse_row(line, row, self._base_dir)
+
+    def close(self):
+        """Close the manifest file."""
+        self._rows = iter(())
+        self._f.close()
+
+
+def _iter_jsonl(f) -> Iterator[tuple]:
+    """Yield (line number, parsed object or ManifestError) for a JSONL stream."""
+    for line_no, text in enumerate(f, start=1):
+        text = text.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            yield line_no, ManifestError(line_no, "", f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, ManifestError(line_no, "", "Expected a JSON object")
+            continue
+        yield line_no, row
+
+
+# Row fields that must hold text when present
+_TEXT_FIELDS = ("input", "output_name", "output_folder")
+
+
+def _parse_row(line: int, row: Dict[str, Any], base_dir: str):
+    """Convert a raw manifest row into a ManifestEntry or ManifestError."""
+    for name in _TEXT_FIELDS:
+        value = row.get(name)
+        if value is not None and not isinstance(value, str):
+            shown = row.get("input") if isinstance(row.get("input"), str) else ""
+            return ManifestError(line, shown, f"'{name}' must be a string, not {type(value).__name__}")
+
+    input_path = (row.get("input") or "").strip()
+    if not input_path:
+        return ManifestError(line, "", "Missing input path")
+
+    options = row.get("options") or {}
+    if isinstance(options, str):
+        try:
+            options = json.loads(options)
+        except ValueError as e:
+            return ManifestError(line, input_path, f"Invalid options JSON: {e}")
+    if not isinstance(options, dict):
+        return ManifestError(line, input_path, "Options must be a JSON object")
+
+    output_name = (row.get("output_name") or "").strip() or None
+    if output_name and (os.path.basename(output_name) != output_name or output_name in (".", "..")):
+        return ManifestError(line, input_path, f"Output name must not contain folders: {output_name}")
+
+    output_folder = (row.get("output_folder") or "").strip() or None
+    if output_folder:
+        output_folder = os.path.join(base_dir, output_folder)
+
+    return ManifestEntry(
+        line=line,
+        input_path=os.path.abspath(os.path.join(base_dir, input_path)),
+        output_name=output_name,
+        output_folder=output_folder,
+        options=options
+    )
+
+
+class ManifestJobSource:
+    """
+    Validates manifest entries in bulk and yields ConversionJobs lazily.
+
+    Entries are processed in chunks. Within a chunk, file existence is
+    checked with one directory listing per distinct folder (cached across
+    chunks) instead of one stat per file, and output folders are created
+    once each. Only one chunk of entries is held in memory at a time.
+    """
+
+    def __init__(
+        self,
+        service: ConversionService,
+        default_output_folder: Optional[str] = None,
+        chunk_size: int = 5000,
+        max_cached_dirs: int = 64,
+        on_error: Optional[Callable[[ManifestError], None]] = None,
+        planner: Optional[OutputPlanner] = None,
+        extensions: Optional[Iterable[str]] = None,
+        on_filtered: Optional[Callable[[ManifestEntry], None]] = None
+    ):
+        """
+        Initialize the job source.
+
+        Args:
+            service: Service used to build jobs and check supported extensions
+            default_output_folder: Output folder for entries without their own
+            chunk_size: Number of entries validated together
+            max_cached_dirs: Number of directory listings kept in the cache
+            on_error: Called for each rejected entry
+            planner: Output planner shared with the rest of the batch; entries without
+                     an output_name get a unique name from it (the planner's layout
+                     when they have no output_folder either), and entries whose
+                     explicit name is already taken are rejected
+            extensions: Extensions to convert (default: every extension the service
+                        supports); entries with another supported extension are
+                        filtered out before their output is planned
+            on_filtered: Called for each filtered-out entry
+        """
+        self.service = service
+        self.default_output_folder = default_output_folder
+        self.chunk_size = max(1, chunk_size)
+        self.max_cached_dirs = max(1, max_cached_dirs)
+        self.on_error = on_error
+        self.planner = planner
+        self.on_filtered = on_filtered
+        self.accepted = 0
+        self.rejected = 0
+        self.filtered = 0
+        self._supported = set(service.get_supported_extensions())
+        self._wanted = self._supported if extensions is None else {ext.lower() for ext in extensions}
+        self._listings: "OrderedDict[str, Optional[FrozenSet[str]]]" = OrderedDict()
+        self._ready_folders = set()
+
+    def iter_jobs(self, items: Iterable[Any]) -> Iterator[ConversionJob]:
+        """
+        Validate manifest items and yield jobs for the valid ones.
+
+        Args:
+            items: ManifestEntry / ManifestError objects (e.g. from iter_manifest)
+
+        Yields:
+            ConversionJob for each valid entry, in manifest order
+        """
+        chunk: List[Any] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield from self._process_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._process_chunk(chunk)
+        logger.info(
+            f"Manifest processed: {self.accepted} job(s) accepted, {self.rejected} rejected, "
+            f"{self.filtered} filtered out"
+        )
+
+    def _process_chunk(self, chunk: List[Any]) -> Iterator[ConversionJob]:
+        """Validate one chunk with a single listing per directory."""
+        # Held for the whole chunk, however many folders it spans
+        listings = {
+            folder: self._listing(folder)
+            for folder in {os.path.dirname(item.input_path) for item in chunk if isinstance(item, ManifestEntry)}
+        }
+
+        for item in chunk:
+            if isinstance(item, ManifestError):
+                self._reject(item)
+                continue
+
+            folder, name = os.path.split(item.input_path)
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in self._supported:
+                self._reject(ManifestError(item.line, item.input_path, f"Unsupported file type: {ext}"))
+                continue
+            if ext not in self._wanted:
+                self.filtered += 1
+                if self.on_filtered:
+                    self.on_filtered(item)
+                continue
+
+            listing = listings[folder]
+            if listing is None or os.path.normcase(name) not in listing:
+                self._reject(ManifestError(item.line, item.input_path, "File not found"))
+                continue
+
+            output_folder = item.output_folder or self.default_output_folder
+            if output_folder and not self._ensure_folder(output_folder):
+                self._reject(ManifestError(item.line, item.input_path, f"Cannot create output folder: {output_folder}"))
+                continue
+
+            output_name = item.output_name
+            if self.planner is not None:
+                if output_name:
+                    target = os.path.join(output_folder or folder, output_name + ".pdf")
+                    if not self.planner.reserve(target):
+                        self._reject(ManifestError(item.line, item.input_path, f"Output already used by another job: {target}"))
+                        continue
+                else:
+                    if item.output_folder:
+                        planned = self.planner.plan_in(output_folder, item.input_path)
+                    else:
+                        planned = self.planner.plan(item.input_path)
+                    output_folder, output_name = os.path.split(os.path.splitext(planned)[0])
+
+            self.accepted += 1
+            yield self.service.build_job(
+                item.input_path,
+                output_folder=output_folder,
+                custom_output_name=output_name,
+                options=item.options
+            )
+
+    def _listing(self, folder: str) -> Optional[FrozenSet[str]]:
+        """Get the (cached) set of file names in a folder, or None if unreadable."""
+        key = os.path.normcase(folder)
+        if key in self._listings:
+            self._listings.move_to_end(key)
+            return self._listings[key]
+
+        try:
+            with os.scandir(folder) as it:
+                listing = frozenset(os.path.normcase(e.name) for e in it if e.is_file())
+        except OSError:
+            listing = None
+
+        self._listings[key] = listing
+        if len(self._listings) > self.max_cached_dirs:
+            self._listings.popitem(last=False)
+        return listing
+
+    def _ensure_folder(self, folder: str) -> bool:
+        """Create an output folder once; returns False if that fails."""
+        key = os.path.normcase(os.path.abspath(folder))
+        if key in self._ready_folders:
+            return True
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError:
+            return False
+        self._ready_folders.add(key)
+        return True
+
+    def _reject(self, error: ManifestError):
+        """Count and report a rejected entry."""
+        self.rejected += 1
+        logger.warning(f"Manifest line {error.line}: {error.reason} ({error.input_path})")
+        if self.on_error:
+            self.on_error(error)
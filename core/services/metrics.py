@@ -0,0 +1,331 @@
+"""
+In-process metrics registry (counters, gauges, histograms).
+
+Updates are made on the conversion hot path from many worker threads, so
+each metric keeps one accumulator per thread: a thread only ever writes
+its own cell and never takes a lock after its first update. Readers
+(the exporters) sum the cells, which is cheap because they run rarely.
+"""
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from core.models.conversion_job import ConversionResult
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+STAGE_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (10e3, 100e3, 1e6, 10e6, 50e6, 100e6, 500e6, 1e9)
+
+
+class _Cells:
+    """Per-thread accumulators of a fixed width, summed on read."""
+
+    __slots__ = ("_width", "_local", "_all", "_lock")
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._all: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> List[float]:
+        """The calling thread's cell (created on first use)."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0] * self._width
+            with self._lock:
+                self._all.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        """Column sums over all threads."""
+        with self._lock:
+            cells = list(self._all)
+        totals = [0] * self._width
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1):
+        """Add `amount` (must not be negative)."""
+        self._cells.mine()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Gauge:
+    """
+    Value that can go up and down.
+
+    Use either inc()/dec(), set(), or set_function() for values that are
+    cheaper to read on demand (queue depth, pool size).
+    """
+
+    def __init__(self):
+        self._cells = _Cells(1)
+        self._base = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        self._cells.mine()[0] += amount
+
+    def dec(self, amount: float = 1):
+        self._cells.mine()[0] -= amount
+
+    def set(self, value: float):
+        """Set an absolute value (from a single writer)."""
+        self._base = value - self._cells.totals()[0]
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Read the value from `function` at export time (None to clear)."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        function = self._function
+        if function is not None:
+            try:
+                return float(function())
+            except Exception:
+                return float("nan")
+        return self._base + self._cells.totals()[0]
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket, one for +Inf, then the sum
+        self._cells = _Cells(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        cell = self._cells.mine()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[Tuple[float, int]], int, float]:
+        """
+        Returns:
+            (cumulative (upper bound, count) pairs including +Inf, count, sum)
+        """
+        totals = self._cells.totals()
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+            running += count
+            cumulative.append((bound, int(running)))
+        return cumulative, int(running), totals[-1]
+
+
+class MetricFamily:
+    """A named metric with optional labels; children are created on first use."""
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: Sequence[str], factory: Callable[[], Any]):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Any:
+        """Return the child metric for these label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._factory()
+                    self._children[key] = child
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        """(labels dict, child) pairs."""
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    # Unlabeled shortcuts
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    """Owns metric families and renders them for export."""
+
+    def __init__(self, prefix: str = "pdfconverter_"):
+        self.prefix = prefix
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(COUNTER, name, help_text, labelnames, Counter)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(GAUGE, name, help_text, labelnames, Gauge)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DURATION_BUCKETS) -> MetricFamily:
+        return self._register(HISTOGRAM, name, help_text, labelnames, lambda: Histogram(buckets))
+
+    def _register(self, kind, name, help_text, labelnames, factory) -> MetricFamily:
+        full_name = self.prefix + name
+        with self._lock:
+            family = self._families.get(full_name)
+            if family is None:
+                family = MetricFamily(kind, full_name, help_text, labelnames, factory)
+                self._families[full_name] = family
+            elif family.kind != kind:
+                raise ValueError(f"Metric {full_name} already registered as {family.kind}")
+            return family
+
+    def families(self) -> List[MetricFamily]:
+        with self._lock:
+            return list(self._families.values())
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for family in self.families():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, child in family.children():
+                if family.kind == HISTOGRAM:
+                    cumulative, count, total = child.snapshot()
+                    for bound, running in cumulative:
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        lines.append(f"{family.name}_bucket{_format_labels(dict(labels, le=le))} {running}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dict."""
+        result = {}
+        for family in self.families():
+            samples = []
+            for labels, child in family.children():
+                if family.kind == HISTOGRAM:
+                    cumulative, count, total = child.snapshot()
+                    samples.append({
+                        "labels": labels,
+                        "count": count,
+                        "sum": total,
+                        "buckets": {("+Inf" if b == float("inf") else _format_value(b)): c for b, c in cumulative},
+                    })
+                else:
+                    samples.append({"labels": labels, "value": child.value})
+            result[family.name] = {"type": family.kind, "help": family.help, "samples": samples}
+        return result
+
+
+class ConversionMetrics:
+    """
+    The metric set fed by ConversionService and the worker pools.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.jobs = r.counter("jobs_total", "Conversions started", ["converter"])
+        self.succeeded = r.counter("jobs_succeeded_total", "Conversions that produced a PDF", ["converter"])
+        self.failed = r.counter("jobs_failed_total", "Failed conversions by exception type", ["converter", "error_type"])
+        self.retries = r.counter("retries_total", "Jobs run again after an interruption or failure")
+        self.duration = r.histogram("conversion_duration_seconds", "Time per conversion", ["converter"])
+        self.input_size = r.histogram("input_size_bytes", "Input file size", ["converter"], buckets=SIZE_BUCKETS)
+        self.stages = r.histogram(
+            "stage_duration_seconds", "Time per conversion stage", ["converter", "stage"], buckets=STAGE_BUCKETS
+        )
+        self.queue_depth = r.gauge("queue_depth", "Jobs waiting for a worker")
+        self.active_workers = r.gauge("active_workers", "Workers currently converting")
+        self.worker_limit = r.gauge("worker_limit", "Workers allowed to convert at once")
+        self.office_instances = r.gauge(
+            "office_instances", "Office applications started by in-flight conversions", ["converter"]
+        )
+        # Unlabeled series are exported as 0 before their first update
+        for family in (self.retries, self.queue_depth, self.active_workers, self.worker_limit):
+            family.labels()
+
+    def job_started(self, converter: str):
+        """Record the start of a conversion."""
+        self.jobs.labels(converter).inc()
+        self.office_instances.labels(converter).inc()
+
+    def job_finished(self, converter: str, result: ConversionResult):
+        """Record a finished conversion (its Office instance has quit by now)."""
+        self.office_instances.labels(converter).dec()
+        if result.success:
+            self.succeeded.labels(converter).inc()
+        else:
+            self.failed.labels(converter, type(result.error).__name__ if result.error else "Unknown").inc()
+        self.duration.labels(converter).observe(result.duration)
+        if result.input_bytes is not None:
+            self.input_size.labels(converter).observe(result.input_bytes)
+        for stage, seconds in result.stage_timings.items():
+            self.stages.labels(converter, stage).observe(seconds)
+
+    def watch_worker(self, worker):
+        """Report a ConversionWorker's queue depth, busy threads and active limit."""
+        self.queue_depth.set_function(lambda: worker.queue_size)
+        self.active_workers.set_function(lambda: worker.active_count)
+        self.worker_limit.set_function(lambda: worker.active_limit)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render {k: v} as {k="v",...} with Prometheus escaping."""
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a decimal point)."""
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
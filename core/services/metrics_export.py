@@ -0,0 +1,122 @@
+"""
+Exporters for the metrics registry: a Prometheus scrape endpoint and a
+periodically rewritten JSON snapshot file.
+"""
+import json
+import os
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from core.services.metrics import MetricsRegistry
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def send_prometheus(handler: BaseHTTPRequestHandler, registry: MetricsRegistry):
+    """Write the registry as a Prometheus text response on an HTTP handler."""
+    body = registry.render_prometheus().encode("utf-8")
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class MetricsHttpServer:
+    """
+    Serves GET /metrics on its own port, for processes without an HTTP API.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        """
+        Args:
+            registry: Registry to expose
+            host: Interface to bind (default: localhost only)
+            port: TCP port (0 = pick a free port)
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") == "/metrics":
+                    send_prometheus(self, registry)
+                else:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} - {format % args}")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        """The (host, port) the endpoint is bound to."""
+        return self.httpd.server_address
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="MetricsHttp", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics available at http://{self.address[0]}:{self.address[1]}/metrics")
+
+    def stop(self):
+        """Stop serving."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+
+class MetricsSnapshotWriter:
+    """
+    Rewrites a JSON snapshot of the registry every `interval` seconds.
+
+    The file is replaced atomically, so readers never see a partial write.
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        """
+        Args:
+            registry: Registry to snapshot
+            path: Output JSON file
+            interval: Seconds between writes
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start writing in the background."""
+        self._thread = threading.Thread(target=self._run, name="MetricsSnapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop and write a final snapshot."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Write the snapshot now."""
+        payload = {"timestamp": time.time(), "metrics": self.registry.snapshot()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot {self.path}: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.flush()
@@ -0,0 +1,248 @@
+"""
+Output layout planning for batch conversions.
+
+Decides where each PDF goes before any worker starts, so that two inputs
+never map to the same output path (e.g. 'report.doc' and 'report.docx',
+or same-named files from different subfolders) and huge batches can be
+spread over subdirectories instead of one flat folder.
+"""
+import hashlib
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from core.models.conversion_job import ConversionJob
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Supported layouts
+LAYOUT_FLAT = "flat"        # every PDF directly in the output folder
+LAYOUT_MIRROR = "mirror"    # recreate the source folder structure
+LAYOUT_SHARDED = "sharded"  # hash-named subfolders (ab/, 3f/, ...)
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_MIRROR, LAYOUT_SHARDED)
+
+# Hex digits per shard level: 2 gives 256 subfolders per level
+SHARD_WIDTH = 2
+
+# Deepest sharding: 256**4 folders is far beyond any batch, and every level
+# lengthens the output paths (Windows' 260-character limit)
+MAX_SHARD_LEVELS = 4
+
+
+class OutputPlanner:
+    """
+    Assigns a unique output path to every input of a batch.
+
+    Names are compared case-insensitively, since outputs usually end up on
+    Windows or SMB file systems. When several inputs want the same name,
+    the first keeps it and the others get ' (2)', ' (3)', ... suffixes.
+    """
+
+    def __init__(
+        self,
+        output_folder: str,
+        layout: str = LAYOUT_FLAT,
+        source_root: Optional[str] = None,
+        shard_levels: int = 1
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            output_folder: Root folder for all outputs
+            layout: 'flat', 'mirror' or 'sharded'
+            source_root: Folder whose structure is mirrored (mirror layout only;
+                         plan_all defaults it to the inputs' common folder)
+            shard_levels: Number of nested shard folders, 1 to MAX_SHARD_LEVELS
+                          (sharded layout only)
+
+        Raises:
+            ValueError: If the layout is unknown or shard_levels is out of range
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout: {layout}. Supported: {', '.join(LAYOUTS)}")
+        if not 1 <= shard_levels <= MAX_SHARD_LEVELS:
+            raise ValueError(f"shard_levels must be between 1 and {MAX_SHARD_LEVELS}")
+        self.output_folder = os.path.abspath(output_folder)
+        self.layout = layout
+        self.source_root = os.path.abspath(source_root) if source_root else None
+        self.shard_levels = shard_levels
+        self._claimed: Set[str] = set()
+        self._created_dirs: Set[str] = set()
+
+    def plan(self, input_path: str) -> str:
+        """
+        Reserve an output path for one input (first come, first served).
+
+        Args:
+            input_path: Source document
+
+        Returns:
+            Absolute output path; its folder exists on return
+        """
+        folder, stem = self._target(input_path)
+        return self._claim(folder, stem)
+
+    def plan_in(self, folder: str, input_path: str) -> str:
+        """
+        Reserve an output path for one input in a given folder, bypassing the layout.
+
+        Args:
+            folder: Output folder (e.g. a manifest row's output_folder)
+            input_path: Source document (its stem names the PDF)
+
+        Returns:
+            Absolute output path; its folder exists on return
+        """
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        return self._claim(os.path.abspath(folder), stem)
+
+    def reserve(self, output_path: str) -> bool:
+        """
+        Reserve an exact output path (an explicitly named output).
+
+        Args:
+            output_path: Requested PDF path
+
+        Returns:
+            False if another input already has this path
+        """
+        key = _key(os.path.abspath(output_path))
+        if key in self._claimed:
+            return False
+        self._claimed.add(key)
+        return True
+
+    def plan_all(self, input_paths: Iterable[str]) -> List[str]:
+        """
+        Reserve output paths for a whole batch.
+
+        The result does not depend on the input order: within a group of
+        colliding inputs, the one with the lowest source path keeps the
+        plain name. Re-running the same batch therefore gives the same
+        mapping, which incremental mode relies on.
+
+        Args:
+            input_paths: Source documents
+
+        Returns:
+            Absolute output paths, in input order
+        """
+        paths = [os.path.abspath(p) for p in input_paths]
+        if self.layout == LAYOUT_MIRROR and self.source_root is None and paths:
+            self.source_root = _mirror_root(paths)
+
+        groups: Dict[str, List[Tuple[str, int, str, str]]] = defaultdict(list)
+        for index, path in enumerate(paths):
+            folder, stem = self._target(path)
+            groups[_key(os.path.join(folder, stem + ".pdf"))].append((os.path.normcase(path), index, folder, stem))
+
+        # Plain names are taken first so a suffixed name never steals one
+        self._claimed.update(groups)
+
+        planned: List[Optional[str]] = [None] * len(paths)
+        for key in sorted(groups):
+            members = sorted(groups[key])
+            _, index, folder, stem = members[0]
+            planned[index] = self._finish(folder, stem + ".pdf")
+            for _, index, folder, stem in members[1:]:
+                planned[index] = self._claim(folder, stem)
+
+        collisions = sum(len(m) - 1 for m in groups.values())
+        if collisions:
+            logger.info(f"Renamed {collisions} output(s) to avoid name collisions")
+        return planned
+
+    def create_jobs(self, service, input_paths: Iterable[str], options: Optional[dict] = None) -> List[ConversionJob]:
+        """
+        Plan a batch and create its conversion jobs.
+
+        Args:
+            service: ConversionService used to validate and create the jobs
+            input_paths: Source documents
+            options: Optional conversion options for every job
+
+        Returns:
+            Jobs in input order
+        """
+        return list(self.iter_jobs(service, input_paths, options))
+
+    def iter_jobs(self, service, input_paths: Iterable[str], options: Optional[dict] = None) -> Iterator[ConversionJob]:
+        """
+        Like create_jobs, but yields the jobs one at a time.
+
+        Lets large batches go straight into a JobTable without holding
+        every ConversionJob at once.
+        """
+        input_paths = list(input_paths)
+        for path, output_path in zip(input_paths, self.plan_all(input_paths)):
+            yield self.job_for(service, path, output_path, options)
+
+    @staticmethod
+    def job_for(service, input_path: str, output_path: str, options: Optional[dict] = None) -> ConversionJob:
+        """Create (and validate) a job for a planned output path."""
+        folder, name = os.path.split(output_path)
+        return service.create_job(
+            input_path,
+            output_folder=folder,
+            custom_output_name=os.path.splitext(name)[0],
+            options=options
+        )
+
+    def _target(self, input_path: str) -> Tuple[str, str]:
+        """Preferred (folder, file stem) for an input."""
+        input_path = os.path.abspath(input_path)
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+
+        if self.layout == LAYOUT_MIRROR and self.source_root:
+            try:
+                rel_dir = os.path.relpath(os.path.dirname(input_path), self.source_root)
+            except ValueError:  # Windows: another drive
+                return self.output_folder, stem
+            if rel_dir == os.curdir or rel_dir.startswith(os.pardir) or os.path.isabs(rel_dir):
+                # At the root, outside it, or on another drive: keep flat
+                return self.output_folder, stem
+            return os.path.join(self.output_folder, rel_dir), stem
+
+        if self.layout == LAYOUT_SHARDED:
+            digest = hashlib.sha1(os.path.normcase(input_path).encode("utf-8", "surrogatepass")).hexdigest()
+            parts = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(self.shard_levels)]
+            return os.path.join(self.output_folder, *parts), stem
+
+        return self.output_folder, stem
+
+    def _claim(self, folder: str, stem: str) -> str:
+        """Reserve the first free name of the form 'stem.pdf', 'stem (2).pdf', ..."""
+        name = stem + ".pdf"
+        counter = 1
+        while _key(os.path.join(folder, name)) in self._claimed:
+            counter += 1
+            name = f"{stem} ({counter}).pdf"
+        self._claimed.add(_key(os.path.join(folder, name)))
+        return self._finish(folder, name)
+
+    def _finish(self, folder: str, name: str) -> str:
+        """Make sure the folder exists and return the full path."""
+        if folder not in self._created_dirs:
+            os.makedirs(folder, exist_ok=True)
+            self._created_dirs.add(folder)
+        return os.path.join(folder, name)
+
+
+def _mirror_root(paths: List[str]) -> str:
+    """
+    Common folder of the inputs to mirror from.
+
+    Paths on different Windows drives (or UNC shares) have no common folder;
+    the drive holding most inputs is mirrored and the rest stay flat.
+    """
+    by_drive: Dict[str, List[str]] = defaultdict(list)
+    for path in paths:
+        by_drive[os.path.normcase(os.path.splitdrive(path)[0])].append(os.path.dirname(path))
+    folders = max(by_drive.values(), key=len)
+    return os.path.commonpath(folders)
+
+
+def _key(path: str) -> str:
+    """Case-insensitive comparison key for an output path."""
+    return os.path.normcase(path).casefold()
@@ -0,0 +1,105 @@
+"""
+Post-conversion check that a generated PDF is complete.
+
+Office can die half-way through ExportAsFixedFormat/SaveAs and still
+return without an error, leaving an empty or truncated file behind. The
+verifier memory-maps the output and reads only the header, the file tail
+(%%EOF and startxref), the trailer and the page tree root, so its cost
+does not grow with the size of the document.
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+from utils.logging import get_logger
+from utils.pdf.objects import PdfError
+from utils.pdf.reader import PdfReader, TAIL_SIZE
+
+logger = get_logger(__name__)
+
+# Smallest file size accepted as a real Office export
+DEFAULT_MIN_BYTES = 256
+
+
+@dataclass
+class VerificationResult:
+    """
+    Outcome of verifying one PDF.
+
+    Attributes:
+        ok: Whether the file passed all checks
+        size: File size in bytes (-1 if the file does not exist)
+        page_count: Page count from the page tree (None if it could not be read)
+        problem: Description of the first failed check
+    """
+    ok: bool
+    size: int = -1
+    page_count: Optional[int] = None
+    problem: str = ""
+
+
+class OutputVerifier:
+    """
+    Checks generated PDFs for the signs of an interrupted write.
+    """
+
+    def __init__(self, min_bytes: int = DEFAULT_MIN_BYTES, remove_invalid: bool = True):
+        """
+        Initialize the verifier.
+
+        Args:
+            min_bytes: Files smaller than this are rejected as unexpectedly small
+            remove_invalid: Delete outputs that fail verification, so a later
+                            incremental run does not mistake them for finished work
+        """
+        self.min_bytes = min_bytes
+        self.remove_invalid = remove_invalid
+
+    def verify(self, pdf_path: str) -> VerificationResult:
+        """
+        Verify a PDF file.
+
+        Args:
+            pdf_path: Path of the generated PDF
+
+        Returns:
+            VerificationResult (never raises for a bad file)
+        """
+        try:
+            size = os.path.getsize(pdf_path)
+        except OSError:
+            return VerificationResult(ok=False, problem="Output file was not created")
+
+        if size == 0:
+            return self._reject(pdf_path, VerificationResult(ok=False, size=0, problem="Output file is empty"))
+        if size < self.min_bytes:
+            return self._reject(pdf_path, VerificationResult(
+                ok=False, size=size, problem=f"Output file is unexpectedly small ({size} bytes)"
+            ))
+
+        try:
+            with PdfReader(pdf_path, repair=False) as reader:
+                if b"%%EOF" not in reader.buf[max(0, size - TAIL_SIZE):]:
+                    raise PdfError("no %%EOF marker at end of file")
+                page_count = reader.page_count()
+        except PdfError as e:
+            return self._reject(pdf_path, VerificationResult(
+                ok=False, size=size, problem=f"Output is truncated or damaged: {e}"
+            ))
+        except OSError as e:
+            return VerificationResult(ok=False, size=size, problem=f"Output cannot be read: {e}")
+
+        if page_count == 0:
+            return self._reject(pdf_path, VerificationResult(
+                ok=False, size=size, page_count=0, problem="Output has no pages"
+            ))
+        return VerificationResult(ok=True, size=size, page_count=page_count)
+
+    def _reject(self, pdf_path: str, result: VerificationResult) -> VerificationResult:
+        """Log a failed check and remove the bad file if configured."""
+        logger.warning("Verification failed for %s: %s", pdf_path, result.problem)
+        if self.remove_invalid:
+            try:
+                os.remove(pdf_path)
+            except OSError:
+                pass
+        return result
@@ -0,0 +1,328 @@
+"""
+Post-conversion merge stage: combine a batch's PDFs into a single file.
+
+Source documents are copied object by object and stream data is copied
+in fixed-size chunks straight from the memory-mapped source, so memory
+use depends on the largest single object, not on the size or number of
+the inputs. Each source document gets one outline (bookmark) entry that
+points at its first page.
+"""
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from utils.exceptions import PdfConverterException
+from utils.logging import get_logger
+from utils.pdf.objects import Name, Ref, Stream, PdfError, serialize
+from utils.pdf.reader import PdfReader
+
+logger = get_logger(__name__)
+
+# Supported merge orders
+ORDER_INPUT = "input"
+ORDER_NAME = "name"
+ORDER_PATH = "path"
+MERGE_ORDERS = (ORDER_INPUT, ORDER_NAME, ORDER_PATH)
+
+# Fixed object numbers in the merged file
+_CATALOG_NUM = 1
+_PAGES_NUM = 2
+_OUTLINES_NUM = 3
+
+
+class MergeError(PdfConverterException):
+    """Raised when PDFs cannot be merged."""
+    pass
+
+
+class PdfMerger:
+    """
+    Streaming writer that appends whole PDF documents to one output file.
+
+    Usage:
+        with PdfMerger(output_path) as merger:
+            merger.append(path, title="Report")
+    """
+
+    def __init__(self, output_path: str, chunk_size: int = 1 << 20, with_outline: bool = True):
+        """
+        Create the output file and write the PDF header.
+
+        Args:
+            output_path: Path of the merged PDF
+            chunk_size: Buffer size for copying stream data
+            with_outline: Whether to add one bookmark per appended document
+        """
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.with_outline = with_outline
+        self._file = open(output_path, "wb")
+        self._pos = 0
+        # offsets[num] = byte offset of object `num` (index 0 is the free-list head)
+        self._offsets = array("Q", [0, 0, 0, 0])
+        self._next_num = _OUTLINES_NUM + 1
+        self._sections: List[Tuple[int, int]] = []  # (section Pages node, page count)
+        self._bookmarks: List[Tuple[str, int]] = []  # (title, first page object number)
+        self._page_total = 0
+        self._closed = False
+        self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages appended so far."""
+        return self._page_total
+
+    def append(self, pdf_path: str, title: Optional[str] = None) -> int:
+        """
+        Copy all pages of a PDF into the output.
+
+        Args:
+            pdf_path: Source PDF
+            title: Bookmark title (defaults to the file name without extension)
+
+        Returns:
+            Number of pages appended
+
+        Raises:
+            MergeError: If the source is encrypted, damaged or has no pages
+        """
+        if title is None:
+            title = os.path.splitext(os.path.basename(pdf_path))[0]
+
+        try:
+            with PdfReader(pdf_path) as reader:
+                if reader.is_encrypted:
+                    raise MergeError(f"Cannot merge encrypted PDF: {pdf_path}")
+                return self._copy_document(reader, title)
+        except PdfError as e:
+            raise MergeError(f"Cannot read {pdf_path}: {e}")
+        except OSError as e:
+            raise MergeError(f"Cannot open {pdf_path}: {e}")
+
+    def close(self):
+        """Write the page tree, outline, cross-reference table and trailer."""
+        if self._closed:
+            return
+        if not self._sections:
+            self.abort()
+            raise MergeError("No pages to merge")
+
+        # Root of the page tree: one intermediate node per source document
+        self._write_object(_PAGES_NUM, {
+            Name("Type"): Name("Pages"),
+            Name("Kids"): [Ref(num) for num, _ in self._sections],
+            Name("Count"): self._page_total,
+        })
+
+        catalog = {Name("Type"): Name("Catalog"), Name("Pages"): Ref(_PAGES_NUM)}
+        if self.with_outline and self._bookmarks:
+            self._write_outline()
+            catalog[Name("Outlines")] = Ref(_OUTLINES_NUM)
+            catalog[Name("PageMode")] = Name("UseOutlines")
+        self._write_object(_CATALOG_NUM, catalog)
+
+        xref_offset = self._pos
+        size = self._next_num
+        self._write(b"xref\n0 %d\n" % size)
+        self._write(b"0000000000 65535 f \n")
+        # Objects that were reserved but never written become free entries
+        for num in range(1, size):
+            offset = self._offsets[num] if num < len(self._offsets) else 0
+            if offset:
+                self._write(b"%010d 00000 n \n" % offset)
+            else:
+                self._write(b"0000000000 00000 f \n")
+
+        trailer = serialize({Name("Size"): size, Name("Root"): Ref(_CATALOG_NUM)})
+        self._write(b"trailer\n" + trailer + b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+        self._file.close()
+        self._closed = True
+        logger.info(f"Merged {len(self._sections)} document(s), {self._page_total} page(s) into {self.output_path}")
+
+    def abort(self):
+        """Close and delete a partially written output."""
+        if self._closed:
+            return
+        self._closed = True
+        self._file.close()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+    def _copy_document(self, reader: PdfReader, title: str) -> int:
+        """Copy a document's pages and everything they reference."""
+        section_num = self._alloc()
+        mapping: Dict[int, int] = {}
+        pending: List[Tuple[int, int]] = []
+
+        # Links to the old catalog or page tree nodes must not drag the whole
+        # source document along; point them at the new nodes instead.
+        catalog_ref = reader.trailer.get("Root")
+        if isinstance(catalog_ref, Ref):
+            mapping[catalog_ref.num] = _CATALOG_NUM
+        for node_ref in reader.page_tree_nodes():
+            mapping[node_ref.num] = section_num
+
+        def remap(ref: Ref) -> Ref:
+            new_num = mapping.get(ref.num)
+            if new_num is None:
+                new_num = self._alloc()
+                mapping[ref.num] = new_num
+                pending.append((ref.num, new_num))
+            return Ref(new_num)
+
+        # Number all pages first so links between pages never queue a page
+        # for a raw copy (which would lose its inherited attributes)
+        pages = list(reader.iter_pages())
+        kids = []
+        for page_ref, _ in pages:
+            if page_ref.num not in mapping or mapping[page_ref.num] == section_num:
+                mapping[page_ref.num] = self._alloc()
+            kids.append(Ref(mapping[page_ref.num]))
+
+        for (page_ref, page), new_page in zip(pages, kids):
+            page[Name("Parent")] = Ref(section_num)
+            page.pop("StructParents", None)
+            self._write_object(new_page.num, page, remap)
+            self._drain(reader, pending, remap)
+        del pages
+
+        if not kids:
+            raise MergeError(f"{reader.path} has no pages")
+
+        self._write_object(section_num, {
+            Name("Type"): Name("Pages"),
+            Name("Parent"): Ref(_PAGES_NUM),
+            Name("Kids"): kids,
+            Name("Count"): len(kids),
+        })
+        self._sections.append((section_num, len(kids)))
+        self._bookmarks.append((title, kids[0].num))
+        self._page_total += len(kids)
+        return len(kids)
+
+    def _drain(self, reader: PdfReader, pending: List[Tuple[int, int]], remap):
+        """Copy queued objects until nothing new is referenced."""
+        while pending:
+            old_num, new_num = pending.pop()
+            obj = reader.get_object(old_num)
+            if isinstance(obj, Stream):
+                self._write_stream(reader, new_num, obj, remap)
+            else:
+                self._write_object(new_num, obj, remap)
+
+    def _write_outline(self):
+        """Write one top-level bookmark per source document."""
+        first_num = self._next_num
+        count = len(self._bookmarks)
+        for i, (title, page_num) in enumerate(self._bookmarks):
+            num = self._alloc()
+            item = {
+                Name("Title"): title,
+                Name("Parent"): Ref(_OUTLINES_NUM),
+                Name("Dest"): [Ref(page_num), Name("Fit")],
+            }
+            if i > 0:
+                item[Name("Prev")] = Ref(num - 1)
+            if i < count - 1:
+                item[Name("Next")] = Ref(num + 1)
+            self._write_object(num, item)
+        self._write_object(_OUTLINES_NUM, {
+            Name("Type"): Name("Outlines"),
+            Name("First"): Ref(first_num),
+            Name("Last"): Ref(first_num + count - 1),
+            Name("Count"): count,
+        })
+
+    def _alloc(self) -> int:
+        """Reserve the next object number."""
+        num = self._next_num
+        self._next_num += 1
+        self._offsets.append(0)
+        return num
+
+    def _write(self, data):
+        """Write raw bytes and track the output offset."""
+        self._file.write(data)
+        self._pos += len(data)
+
+    def _write_object(self, num: int, obj: Any, remap=None):
+        """Write a non-stream indirect object."""
+        self._offsets[num] = self._pos
+        self._write(b"%d 0 obj\n" % num + serialize(obj, remap) + b"\nendobj\n")
+
+    def _write_stream(self, reader: PdfReader, num: int, stream: Stream, remap):
+        """Write a stream object, copying its data in chunks."""
+        stream_dict = dict(stream.dict)
+        stream_dict[Name("Length")] = stream.length
+        self._offsets[num] = self._pos
+        self._write(b"%d 0 obj\n" % num + serialize(stream_dict, remap) + b"\nstream\n")
+        for chunk in reader.raw_stream_chunks(stream, self.chunk_size):
+            self._write(chunk)
+        self._write(b"\nendstream\nendobj\n")
+
+
+def order_sources(sources: Sequence[Tuple[str, str]], order: str = ORDER_INPUT) -> List[Tuple[str, str]]:
+    """
+    Order (source document, PDF) pairs for merging.
+
+    Args:
+        sources: Pairs of (original input path, generated PDF path) in batch order
+        order: 'input' (batch order), 'name' (source file name) or 'path' (full source path)
+
+    Returns:
+        Ordered list of pairs
+    """
+    if order == ORDER_INPUT:
+        return list(sources)
+    if order == ORDER_NAME:
+        return sorted(sources, key=lambda s: (os.path.basename(s[0]).lower(), s[0].lower()))
+    if order == ORDER_PATH:
+        return sorted(sources, key=lambda s: os.path.normcase(s[0]))
+    raise ValueError(f"Unknown merge order: {order}. Supported: {', '.join(MERGE_ORDERS)}")
+
+
+def merge_pdfs(
+    sources: Iterable[Tuple[str, str]],
+    output_path: str,
+    order: str = ORDER_INPUT,
+    skip_unreadable: bool = True
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Merge converted PDFs into one file with a bookmark per source document.
+
+    Args:
+        sources: Pairs of (original input path, generated PDF path) in batch order
+        output_path: Path of the merged PDF
+        order: Merge order (see order_sources)
+        skip_unreadable: If True, unreadable PDFs are skipped; otherwise the merge fails
+
+    Returns:
+        (total pages, list of (pdf path, reason) for skipped inputs)
+
+    Raises:
+        MergeError: If nothing could be merged, or an input fails and skip_unreadable is False
+    """
+    ordered = order_sources(list(sources), order)
+    skipped = []
+    with PdfMerger(output_path) as merger:
+        for source_path, pdf_path in ordered:
+            title = os.path.basename(source_path)
+            try:
+                merger.append(pdf_path, title=title)
+            except MergeError as e:
+                if not skip_unreadable:
+                    raise
+                logger.warning(f"Skipping {pdf_path} in merge: {e}")
+                skipped.append((pdf_path, str(e)))
+        pages = merger.page_count
+    return pages, skipped
@@ -0,0 +1,394 @@
+"""
+Pre-flight check of input files, run before any COM call.
+
+Opening a bad file in Office is expensive: the application has to be
+started (or reused), the file parsed, and a password-protected document
+can stall the conversion on a hidden password prompt. The pre-flight
+check reads only the first bytes of the file, the zip central directory
+of OOXML packages and a few directory sectors of OLE2 files, and rejects:
+
+    "~$" Office owner files          OfficeLockFileError
+    zero-byte files                  EmptyFileError
+    truncated or damaged containers  CorruptFileError
+    password-protected documents     EncryptedFileError
+    files locked by another user     FileLockedError
+    other binary content             UnrecognizedFormatError
+
+Text content (HTML or XML saved with an Office extension, such as
+SpreadsheetML 2003 workbooks, Word XML documents, MHTML or CSV files) is
+passed through to the application named by the extension, which opens it.
+
+It also reports which application the content belongs to, so a mis-named
+file (a workbook saved as .doc) is routed to the right converter.
+"""
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from utils.exceptions import (
+    CorruptFileError, EmptyFileError, EncryptedFileError, FileLockedError,
+    OfficeLockFileError, UnrecognizedFormatError, UnreadableFileError
+)
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CONTAINER_OLE2 = "ole2"
+CONTAINER_OOXML = "ooxml"
+CONTAINER_RTF = "rtf"
+CONTAINER_TEXT = "text"
+
+APP_WORD = "word"
+APP_EXCEL = "excel"
+APP_POWERPOINT = "powerpoint"
+
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP_SIGNATURE = b"PK\x03\x04"
+_TEXT_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+# Bytes read to tell text from binary content
+TEXT_SNIFF_BYTES = 512
+
+OWNER_FILE_PREFIX = "~$"
+
+# Extensions per application, preferred routing target first
+APP_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    APP_WORD: (".docx", ".doc", ".docm", ".dotx", ".dot", ".dotm", ".rtf"),
+    APP_EXCEL: (".xlsx", ".xls", ".xlsm", ".xlsb", ".xltx", ".xlt", ".xltm"),
+    APP_POWERPOINT: (".pptx", ".ppt", ".pptm", ".ppsx", ".pps", ".potx", ".pot", ".potm"),
+}
+_APP_BY_EXTENSION = {ext: app for app, exts in APP_EXTENSIONS.items() for ext in exts}
+
+# OOXML main part -> (application, extension, extension when the package has macros)
+_OOXML_MAIN_PARTS = (
+    ("word/document.xml", APP_WORD, ".docx", ".docm"),
+    ("xl/workbook.xml", APP_EXCEL, ".xlsx", ".xlsm"),
+    ("xl/workbook.bin", APP_EXCEL, ".xlsb", ".xlsb"),
+    ("ppt/presentation.xml", APP_POWERPOINT, ".pptx", ".pptm"),
+)
+
+# OLE2 root stream -> (application, extension); checked in this order
+_OLE_MAIN_STREAMS = (
+    ("WordDocument", APP_WORD, ".doc"),
+    ("PowerPoint Document", APP_POWERPOINT, ".ppt"),
+    ("Workbook", APP_EXCEL, ".xls"),
+    ("Book", APP_EXCEL, ".xls"),
+)
+
+# Bounds on what is read from an OLE2 file
+MAX_DIRECTORY_SECTORS = 64
+_FREE_SECTOR = 0xFFFFFFFA  # this and above: end of chain / special markers
+_NO_STREAM = 0xFFFFFFFF
+
+_WORD_FIB_IDENT = 0xA5EC
+_WORD_FLAG_ENCRYPTED = 0x0100
+_EXCEL_BOF = 0x0809
+_EXCEL_FILEPASS = 0x002F
+
+
+@dataclass(frozen=True)
+class PreflightReport:
+    """
+    What a file's content turned out to be.
+
+    Attributes:
+        container: CONTAINER_OLE2, CONTAINER_OOXML, CONTAINER_RTF or CONTAINER_TEXT
+        application: APP_WORD, APP_EXCEL or APP_POWERPOINT
+        extension: Extension matching the content (e.g. ".xlsx")
+    """
+    container: str
+    application: str
+    extension: str
+
+    def matches(self, extension: str) -> bool:
+        """Whether a file with this extension is opened by the right application."""
+        return _APP_BY_EXTENSION.get(extension.lower()) == self.application
+
+
+def application_for(extension: str) -> Optional[str]:
+    """Application that opens files with this extension (None if not an Office extension)."""
+    return _APP_BY_EXTENSION.get(extension.lower())
+
+
+class Preflight:
+    """
+    Sniffs Office inputs without opening them in Office.
+
+    Files whose extension is not an Office extension are passed through
+    unchecked, so converters for other formats are unaffected.
+    """
+
+    def check(self, path: str) -> Optional[PreflightReport]:
+        """
+        Check one input file.
+
+        Args:
+            path: Input file path
+
+        Returns:
+            PreflightReport, or None if the extension is not an Office extension
+
+        Raises:
+            PreflightError: A subclass naming the reason the file cannot be converted
+        """
+        folder, name = os.path.split(path)
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in _APP_BY_EXTENSION:
+            return None
+        if name.startswith(OWNER_FILE_PREFIX):
+            raise OfficeLockFileError(f"Office owner (lock) file, not a document: {name}")
+
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    raise EmptyFileError(f"File is empty: {name}")
+                head = f.read(len(OLE2_SIGNATURE))
+                if head == OLE2_SIGNATURE:
+                    report = self._check_ole2(f, size, name)
+                elif head.startswith(ZIP_SIGNATURE):
+                    report = self._check_ooxml(f, size, name)
+                elif head.startswith(b"{\\rtf"):
+                    report = PreflightReport(CONTAINER_RTF, APP_WORD, ".rtf")
+                elif _is_text(head + f.read(TEXT_SNIFF_BYTES - len(head))):
+                    # Markup or delimited text: only the application can tell
+                    report = PreflightReport(CONTAINER_TEXT, _APP_BY_EXTENSION[extension], extension)
+                elif len(head) < len(OLE2_SIGNATURE):
+                    raise CorruptFileError(f"File is truncated ({size} bytes): {name}")
+                else:
+                    raise UnrecognizedFormatError(f"Not an Office document ({_describe(head)}): {name}")
+        except PermissionError as e:
+            raise FileLockedError(f"File is in use by another process: {name} ({e.strerror})")
+        except OSError as e:
+            raise UnreadableFileError(f"Cannot read {name}: {e.strerror or e}")
+
+        self._check_owner_lock(folder, name, path, report.application)
+        return report
+
+    def _check_ooxml(self, f: BinaryIO, size: int, name: str) -> PreflightReport:
+        """Read the zip central directory of an OOXML package."""
+        f.seek(0)
+        try:
+            with zipfile.ZipFile(f) as package:
+                infos = package.infolist()
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, ValueError, EOFError) as e:
+            raise CorruptFileError(f"Damaged or truncated OOXML package ({e}): {name}")
+
+        names = set()
+        for info in infos:
+            # Every entry's data must lie inside the file
+            if info.header_offset + 30 + len(info.filename) + info.compress_size > size:
+                raise CorruptFileError(f"OOXML package is truncated: {name}")
+            if info.flag_bits & 0x1:
+                raise EncryptedFileError(f"Zip-encrypted package: {name}")
+            names.add(info.filename)
+        if "[Content_Types].xml" not in names:
+            raise CorruptFileError(f"Zip file without [Content_Types].xml is not an OOXML package: {name}")
+
+        has_macros = any(entry.endswith("/vbaProject.bin") for entry in names)
+        for part, application, extension, macro_extension in _OOXML_MAIN_PARTS:
+            if part in names:
+                return PreflightReport(CONTAINER_OOXML, application, macro_extension if has_macros else extension)
+        raise UnrecognizedFormatError(f"OOXML package is not a Word, Excel or PowerPoint file: {name}")
+
+    def _check_ole2(self, f: BinaryIO, size: int, name: str) -> PreflightReport:
+        """Read the root directory of an OLE2 compound file."""
+        ole = _OleFile(f, size, name)
+        streams = ole.root_streams()
+
+        if "EncryptedPackage" in streams or "EncryptionInfo" in streams:
+            raise EncryptedFileError(f"Password-protected document (EncryptedPackage): {name}")
+        if "EncryptedSummary" in streams:
+            raise EncryptedFileError(f"Password-protected presentation: {name}")
+
+        for stream, application, extension in _OLE_MAIN_STREAMS:
+            if stream not in streams:
+                continue
+            start, length = streams[stream]
+            if application == APP_WORD:
+                fib = ole.stream_head(start, length, 12)
+                if fib is not None and len(fib) == 12:
+                    ident, flags = struct.unpack_from("<H8xH", fib)
+                    if ident == _WORD_FIB_IDENT and flags & _WORD_FLAG_ENCRYPTED:
+                        raise EncryptedFileError(f"Password-protected document: {name}")
+            elif application == APP_EXCEL:
+                head = ole.stream_head(start, length, 64)
+                if head is not None and len(head) >= 8:
+                    record, record_size = struct.unpack_from("<HH", head)
+                    if record == _EXCEL_BOF and len(head) >= 8 + record_size:
+                        (next_record,) = struct.unpack_from("<H", head, 4 + record_size)
+                        if next_record == _EXCEL_FILEPASS:
+                            raise EncryptedFileError(f"Password-protected workbook: {name}")
+            return PreflightReport(CONTAINER_OLE2, application, extension)
+        raise UnrecognizedFormatError(f"OLE2 file is not a Word, Excel or PowerPoint document: {name}")
+
+    def _check_owner_lock(self, folder: str, name: str, path: str, application: str):
+        """
+        Fail if the document is open in Office elsewhere.
+
+        Office writes a "~$" owner file next to an open document. It is
+        left behind when Office crashes, so the document only counts as
+        locked if it also cannot be opened for writing; Word would
+        otherwise show its "File in Use" dialog. A read-only file cannot be
+        opened for writing by anyone, so its owner file is not checked.
+        """
+        owner_path = _owner_file(folder, name, application)
+        if owner_path is None:
+            return
+        if not os.access(path, os.W_OK):
+            logger.debug("Not checking owner file %s of read-only %s", owner_path, name)
+            return
+        try:
+            with open(path, "r+b"):
+                pass
+        except PermissionError:
+            owner = _owner_name(owner_path)
+            raise FileLockedError(f"File is locked by {owner or 'another user'}: {name}")
+        except OSError:
+            return
+        logger.debug("Ignoring stale owner file %s", owner_path)
+
+
+class _OleFile:
+    """Minimal reader for the header and directory of an OLE2 compound file."""
+
+    def __init__(self, f: BinaryIO, size: int, name: str):
+        self.f = f
+        self.name = name
+        f.seek(0)
+        header = f.read(512)
+        if len(header) < 512:
+            raise CorruptFileError(f"OLE2 header is truncated: {name}")
+        sector_shift, = struct.unpack_from("<H", header, 0x1E)
+        if sector_shift not in (9, 12):
+            raise CorruptFileError(f"Invalid OLE2 sector size: {name}")
+        self.sector_size = 1 << sector_shift
+        self.sector_count = max(0, size - self.sector_size) // self.sector_size
+        fat_sectors, self.first_directory_sector = struct.unpack_from("<II", header, 0x2C)
+        self.mini_stream_cutoff, = struct.unpack_from("<I", header, 0x38)
+        self.fat = list(struct.unpack_from("<109I", header, 0x4C)[:min(fat_sectors, 109)])
+        # A file cut short loses its trailing sectors, FAT sectors included
+        if any(sector >= self.sector_count for sector in self.fat) or self.first_directory_sector >= self.sector_count:
+            raise CorruptFileError(f"OLE2 file is truncated: {name}")
+
+    def _read_sector(self, sector: int, length: int = None) -> bytes:
+        if sector >= self.sector_count:
+            raise CorruptFileError(f"OLE2 file is truncated: {self.name}")
+        self.f.seek((sector + 1) * self.sector_size)
+        return self.f.read(length or self.sector_size)
+
+    def _next_sector(self, sector: int) -> int:
+        per_fat_sector = self.sector_size // 4
+        index = sector // per_fat_sector
+        if index >= len(self.fat):
+            # Described by a DIFAT sector; not followed
+            return _NO_STREAM
+        self.f.seek((self.fat[index] + 1) * self.sector_size + (sector % per_fat_sector) * 4)
+        data = self.f.read(4)
+        if len(data) < 4:
+            raise CorruptFileError(f"OLE2 file is truncated: {self.name}")
+        return struct.unpack("<I", data)[0]
+
+    def root_streams(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Streams directly under the root storage.
+
+        Returns:
+            Stream name -> (start sector, size)
+        """
+        entries: List[Tuple[str, int, int, int, int, int, int]] = []
+        sector = self.first_directory_sector
+        for _ in range(MAX_DIRECTORY_SECTORS):
+            if sector >= _FREE_SECTOR:
+                break
+            data = self._read_sector(sector)
+            for offset in range(0, len(data) - 127, 128):
+                name_length, entry_type = struct.unpack_from("<HB", data, offset + 64)
+                left, right, child = struct.unpack_from("<III", data, offset + 68)
+                start, length = struct.unpack_from("<II", data, offset + 116)
+                entry_name = data[offset:offset + max(0, min(name_length, 64) - 2)].decode("utf-16-le", "replace")
+                entries.append((entry_name, entry_type, left, right, child, start, length))
+            sector = self._next_sector(sector)
+        if not entries or entries[0][1] != 5:
+            raise CorruptFileError(f"OLE2 file has no root entry: {self.name}")
+
+        # Walk the red-black tree of the root's children
+        streams = {}
+        pending = [entries[0][4]]
+        seen = set()
+        while pending:
+            index = pending.pop()
+            if index >= len(entries) or index in seen:
+                continue
+            seen.add(index)
+            entry_name, entry_type, left, right, _, start, length = entries[index]
+            if entry_type == 2:
+                streams[entry_name] = (start, length)
+            pending.extend((left, right))
+        return streams
+
+    def stream_head(self, start: int, length: int, count: int) -> Optional[bytes]:
+        """
+        First `count` bytes of a stream, or None for streams kept in the
+        mini stream (too small to be a document body).
+        """
+        if length < self.mini_stream_cutoff:
+            return None
+        return self._read_sector(start, min(count, length, self.sector_size))
+
+
+def _owner_file(folder: str, name: str, application: str) -> Optional[str]:
+    """Path of the Office owner file for a document, if one exists."""
+    stem = os.path.splitext(name)[0]
+    owner_name = OWNER_FILE_PREFIX + name
+    if application == APP_WORD:
+        # Word keeps the "~$" name the same length as the document's name
+        if len(stem) >= 8:
+            owner_name = OWNER_FILE_PREFIX + name[2:]
+        elif len(stem) == 7:
+            owner_name = OWNER_FILE_PREFIX + name[1:]
+    owner_path = os.path.join(folder, owner_name)
+    return owner_path if os.path.isfile(owner_path) else None
+
+
+def _owner_name(owner_path: str) -> str:
+    """User name recorded in an Office owner file ("" if unreadable)."""
+    try:
+        with open(owner_path, "rb") as f:
+            data = f.read(512)
+    except OSError:
+        return ""
+    if len(data) >= 56:
+        # UTF-16 copy of the name after the 54-byte ANSI field
+        length, = struct.unpack_from("<H", data, 54)
+        if 0 < length <= 100 and len(data) >= 56 + 2 * length:
+            try:
+                return data[56:56 + 2 * length].decode("utf-16-le").strip()
+            except UnicodeDecodeError:
+                pass
+    if data:
+        return data[1:1 + data[0]].decode("latin-1").strip()
+    return ""
+
+
+def _is_text(data: bytes) -> bool:
+    """Whether the first bytes of a file look like text rather than binary data (PDF counts as binary)."""
+    if data.startswith(_TEXT_BOMS):
+        return True
+    # Text has no control bytes other than tab, line breaks, form feed and escape
+    return not data.startswith(b"%PDF") and not any(
+        byte < 0x09 or (0x0E <= byte < 0x20 and byte != 0x1B) for byte in data
+    )
+
+
+def _describe(head: bytes) -> str:
+    """Short description of well-known non-Office signatures."""
+    if head.startswith(b"%PDF"):
+        return "PDF"
+    if head.lstrip().lower().startswith((b"<html", b"<!doc", b"<?xml")):
+        return "HTML/XML"
+    if head.startswith(b"MZ"):
+        return "executable"
+    if head.startswith(b"PK"):
+        return "zip archive"
+    return "unknown signature " + head[:4].hex()
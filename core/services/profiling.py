@@ -0,0 +1,365 @@
+"""
+Opt-in per-job profiling of conversions.
+
+A profiled conversion writes, to the profile folder:
+    <job_id>.prof   cProfile data (open with pstats or snakeviz)
+    <job_id>.json   summary: top functions, tracemalloc peak and top
+                    allocations, COM property gets/sets and method calls
+
+and logs one record with the job id pointing at them.
+
+Profiling is switched on per job with the "profile" job option, or for
+every matching job with the PDFCONVERTER_PROFILE environment variable:
+    PDFCONVERTER_PROFILE=1                     every job
+    PDFCONVERTER_PROFILE=ExcelAdapter,.xlsb    jobs for these converters / extensions
+PDFCONVERTER_PROFILE_DIR sets the folder (default: a "PdfConverter/profiles"
+folder in the temp directory).
+
+Nothing is patched (and cProfile, pstats and tracemalloc are not even
+imported) until the first profiled job, so unprofiled runs pay only a
+dict lookup per job.
+"""
+import contextvars
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+from core.models.conversion_job import ConversionJob, ConversionResult
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_ENV = "PDFCONVERTER_PROFILE"
+PROFILE_DIR_ENV = "PDFCONVERTER_PROFILE_DIR"
+
+# Job option that turns profiling on for a single job
+PROFILE_OPTION = "profile"
+
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+TOP_COM_MEMBERS = 30
+
+# Counter of the profiled conversion running on this thread (None = not profiled)
+_active_counter: contextvars.ContextVar = contextvars.ContextVar("com_counter", default=None)
+_hook_lock = threading.Lock()
+# cProfile can only be enabled by one thread at a time (Python 3.12+ raises
+# ValueError); overlapping profiled jobs run without it
+_cprofile_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+# Whether this module turned tracing on (and so may turn it off); tracing
+# started elsewhere, e.g. with -X tracemalloc, is left running
+_tracemalloc_started = False
+
+# Attributes passed through unwrapped and uncounted (besides dunders)
+_RAW_ATTRIBUTES = frozenset(("_oleobj_",))
+
+# Results that are plain data rather than COM objects
+_PLAIN_TYPES = (str, bytes, int, float, bool, type(None), tuple, list, dict)
+
+
+class ComCallCounter:
+    """Counts COM property gets, property sets and method calls."""
+
+    def __init__(self):
+        self.gets = 0
+        self.sets = 0
+        self.calls = 0
+        self.members: Counter = Counter()
+
+    def as_dict(self) -> Dict:
+        return {
+            "gets": self.gets,
+            "sets": self.sets,
+            "calls": self.calls,
+            "total": self.gets + self.sets + self.calls,
+            "by_member": dict(self.members.most_common(TOP_COM_MEMBERS)),
+        }
+
+
+class _CountingProxy:
+    """
+    Wraps a COM object and counts every access made through it.
+
+    Objects returned by properties and methods are wrapped as well, so
+    `app.Workbooks.Open(...).Worksheets` is counted all the way down.
+    """
+
+    __slots__ = ("_target", "_counter")
+
+    def __init__(self, target, counter: ComCallCounter):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_counter", counter)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name in _RAW_ATTRIBUTES or (name.startswith("__") and name.endswith("__")):
+            # pywin32 reads _oleobj_ to marshal an argument; it must get the real object
+            return value
+        counter = self._counter
+        if isinstance(value, types.MethodType):
+            return _counting_method(value, name, counter)
+        counter.gets += 1
+        counter.members["get " + name] += 1
+        return _wrap(value, counter)
+
+    def __setattr__(self, name, value):
+        counter = self._counter
+        counter.sets += 1
+        counter.members["set " + name] += 1
+        setattr(self._target, name, _unwrap(value))
+
+    def __call__(self, *args, **kwargs):
+        counter = self._counter
+        counter.calls += 1
+        counter.members["call <default>"] += 1
+        args, kwargs = _unwrap_arguments(args, kwargs)
+        return _wrap(self._target(*args, **kwargs), counter)
+
+    def __iter__(self):
+        counter = self._counter
+        for item in self._target:
+            yield _wrap(item, counter)
+
+    def __bool__(self):
+        return bool(self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __getitem__(self, key):
+        return _wrap(self._target[_unwrap(key)], self._counter)
+
+
+def _counting_method(method, name: str, counter: ComCallCounter):
+    def call(*args, **kwargs):
+        counter.calls += 1
+        counter.members["call " + name] += 1
+        args, kwargs = _unwrap_arguments(args, kwargs)
+        return _wrap(method(*args, **kwargs), counter)
+    return call
+
+
+def _unwrap(value):
+    """The COM object behind a proxy, so proxies never reach COM as arguments."""
+    if isinstance(value, _CountingProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)) and any(isinstance(item, _CountingProxy) for item in value):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+
+def _unwrap_arguments(args, kwargs):
+    return (
+        tuple(_unwrap(arg) for arg in args),
+        {key: _unwrap(value) for key, value in kwargs.items()}
+    )
+
+
+def _wrap(value, counter: ComCallCounter):
+    if isinstance(value, list):
+        return [_wrap(item, counter) for item in value]
+    if isinstance(value, _PLAIN_TYPES) or isinstance(value, _CountingProxy):
+        return value
+    return _CountingProxy(value, counter)
+
+
+def _install_dispatch_hook():
+    """
+    Wrap win32com.client.Dispatch so applications started by a profiled
+    conversion are counted. Installed on the first profiled job only.
+    """
+    client = sys.modules.get("win32com.client")
+    if client is None:
+        return
+    with _hook_lock:
+        for attr in ("Dispatch", "DispatchEx"):
+            original = getattr(client, attr, None)
+            if original is None or getattr(original, "_counting_hook", False):
+                continue
+
+            def hooked(*args, _original=original, **kwargs):
+                app = _original(*args, **kwargs)
+                counter = _active_counter.get()
+                if counter is None:
+                    return app
+                counter.calls += 1
+                counter.members["call Dispatch"] += 1
+                return _CountingProxy(app, counter)
+
+            hooked._counting_hook = True
+            setattr(client, attr, hooked)
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    import tracemalloc
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    import tracemalloc
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+class JobProfiler:
+    """
+    Runs selected conversions under cProfile, tracemalloc and COM call counting.
+
+    tracemalloc is process-wide: when several profiled jobs run at once,
+    their memory figures include each other's allocations. cProfile runs
+    for one job at a time; a job that overlaps it gets wall time, memory
+    and COM counts but no .prof file.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, selectors: Optional[Set[str]] = None):
+        """
+        Args:
+            output_dir: Folder for profile files, created on first use
+                        (default: PDFCONVERTER_PROFILE_DIR or <temp>/PdfConverter/profiles)
+            selectors: Lower-case converter names or extensions to profile; None profiles
+                       every job, an empty set only jobs with the "profile" option
+        """
+        self.output_dir = (
+            output_dir
+            or os.environ.get(PROFILE_DIR_ENV)
+            or os.path.join(tempfile.gettempdir(), "PdfConverter", "profiles")
+        )
+        self.selectors = selectors
+
+    @classmethod
+    def from_environment(cls) -> Optional["JobProfiler"]:
+        """
+        Build a profiler from PDFCONVERTER_PROFILE / PDFCONVERTER_PROFILE_DIR.
+
+        Returns:
+            JobProfiler, or None if profiling is not enabled by the environment
+        """
+        value = os.environ.get(PROFILE_ENV, "").strip()
+        if not value or value.lower() in ("0", "false", "no", "off"):
+            return None
+        selectors = None
+        if value.lower() not in ("1", "true", "yes", "on", "all"):
+            selectors = {item.strip().lower() for item in value.split(",") if item.strip()}
+        return cls(selectors=selectors)
+
+    def wants(self, job: ConversionJob, converter_name: str) -> bool:
+        """Whether this job should be profiled."""
+        if job.options.get(PROFILE_OPTION):
+            return True
+        if self.selectors is None:
+            return True
+        return (
+            converter_name.lower() in self.selectors
+            or Path(job.input_path).suffix.lower() in self.selectors
+        )
+
+    def run(self, job: ConversionJob, converter_name: str, convert: Callable[[], ConversionResult]) -> ConversionResult:
+        """
+        Run `convert` under the profilers and write the profile files.
+
+        Args:
+            job: Job being converted (its job_id names the files)
+            converter_name: Converter class name
+            convert: The conversion to run
+
+        Returns:
+            The conversion result
+        """
+        import cProfile
+        import tracemalloc
+        _install_dispatch_hook()
+        counter = ComCallCounter()
+        token = _active_counter.set(counter)
+        profile = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+        if profile is None:
+            logger.debug("cProfile busy with another job; profiling job %s without it", job.job_id)
+        _start_tracemalloc()
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError as e:  # another profiler (e.g. an outside sys.setprofile user) is active
+                    logger.debug("Cannot enable cProfile for job %s: %s", job.job_id, e)
+                    profile = None
+                    _cprofile_lock.release()
+            try:
+                result = convert()
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    _cprofile_lock.release()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            _stop_tracemalloc()
+            _active_counter.reset(token)
+
+        try:
+            self._write(job, converter_name, result, elapsed, profile, snapshot, peak, counter)
+        except OSError as e:
+            logger.warning("Failed to write profile for job %s: %s", job.job_id, e)
+        return result
+
+    def _write(self, job, converter_name, result, elapsed, profile, snapshot, peak, counter):
+        import pstats
+        os.makedirs(self.output_dir, exist_ok=True)
+        prof_path = os.path.join(self.output_dir, f"{job.job_id}.prof")
+        summary_path = os.path.join(self.output_dir, f"{job.job_id}.json")
+        top_functions = []
+        if profile is not None:
+            profile.dump_stats(prof_path)
+            stats_text = io.StringIO()
+            stats = pstats.Stats(profile, stream=stats_text)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+            top_functions = stats_text.getvalue().splitlines()
+
+        allocations = [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ]
+        summary = {
+            "job_id": job.job_id,
+            "input": job.input_path,
+            "converter": converter_name,
+            "success": result.success,
+            "wall_seconds": round(elapsed, 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in result.stage_timings.items()},
+            "com": counter.as_dict(),
+            "memory": {"peak_bytes": peak, "top_allocations": allocations},
+            "cprofile": os.path.basename(prof_path) if profile is not None else None,
+            "top_functions": top_functions,
+        }
+        tmp_path = summary_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+        os.replace(tmp_path, summary_path)
+        logger.info(
+            "Profile for job %s (%s): %.2fs, %d COM calls, peak %.1f MB -> %s",
+            job.job_id, converter_name, elapsed, counter.gets + counter.sets + counter.calls,
+            peak / (1024 * 1024), summary_path
+        )
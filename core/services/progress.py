@@ -0,0 +1,304 @@
+"""
+Progress reporting for conversion batches.
+
+The ProgressBus collects per-job events from the conversion pipeline and
+publishes throttled ProgressSnapshot updates to any number of subscribers
+(desktop UI, command line, logs).
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """
+    Immutable view of batch progress at a point in time.
+
+    Attributes:
+        total: Number of jobs in the batch
+        completed: Number of finished jobs (succeeded + failed)
+        succeeded: Number of successful jobs
+        failed: Number of failed jobs
+        bytes_total: Total input size of the batch in bytes (0 if unknown)
+        bytes_done: Input bytes of finished jobs
+        current_file: Input path of the most recently started job
+        elapsed: Seconds since the batch started
+        files_per_second: Moving-average throughput in jobs per second
+        bytes_per_second: Moving-average throughput in input bytes per second
+        eta_seconds: Estimated seconds until completion (None if unknown)
+        finished: Whether the batch has finished
+        worker_limit: Workers currently allowed to convert (0 = fixed worker count)
+        worker_limit_reason: Why the adaptive controller last set worker_limit
+    """
+    total: int
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    bytes_total: int = 0
+    bytes_done: int = 0
+    current_file: str = ""
+    elapsed: float = 0.0
+    files_per_second: float = 0.0
+    bytes_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
+    finished: bool = False
+    worker_limit: int = 0
+    worker_limit_reason: str = ""
+
+    @property
+    def fraction(self) -> float:
+        """Completed fraction between 0.0 and 1.0."""
+        return self.completed / self.total if self.total else 1.0
+
+
+ProgressSubscriber = Callable[[ProgressSnapshot], None]
+
+
+class ProgressBus:
+    """
+    Thread-safe progress aggregator with rate-limited publishing.
+
+    Any number of worker threads may report events; subscribers are called
+    at most `max_rate_hz` times per second (on the reporting thread), plus
+    once when the batch starts and once when it finishes.
+    """
+
+    def __init__(self, max_rate_hz: float = 10.0, window_seconds: float = 10.0):
+        """
+        Initialize the bus.
+
+        Args:
+            max_rate_hz: Maximum publish rate for intermediate updates (0 = unthrottled)
+            window_seconds: Time window for the moving-average throughput
+        """
+        self._min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self._window_seconds = window_seconds
+        self._subscribers: List[ProgressSubscriber] = []
+        self._lock = threading.Lock()
+        self._reset(0, 0)
+
+    def subscribe(self, callback: ProgressSubscriber):
+        """
+        Register a subscriber.
+
+        Args:
+            callback: Called with each published ProgressSnapshot
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: ProgressSubscriber):
+        """
+        Remove a previously registered subscriber.
+
+        Args:
+            callback: The callback passed to `subscribe`
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self, total: int, bytes_total: int = 0):
+        """
+        Begin a new batch.
+
+        Args:
+            total: Number of jobs in the batch
+            bytes_total: Total input size in bytes (0 if unknown)
+        """
+        with self._lock:
+            self._reset(total, bytes_total)
+            snapshot = self._snapshot(time.monotonic())
+        self._publish(snapshot)
+
+    def job_started(self, input_path: str):
+        """
+        Report that a job has started.
+
+        Args:
+            input_path: Input path of the job
+        """
+        with self._lock:
+            self._current_file = input_path
+            snapshot = self._maybe_snapshot(time.monotonic())
+        if snapshot:
+            self._publish(snapshot)
+
+    def job_finished(self, success: bool, input_bytes: int = 0):
+        """
+        Report that a job has finished.
+
+        Args:
+            success: Whether the job succeeded
+            input_bytes: Input size of the job in bytes
+        """
+        now = time.monotonic()
+        with self._lock:
+            if success:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+            self._bytes_done += max(0, input_bytes)
+            self._window.append((now, max(0, input_bytes)))
+            self._window_bytes += max(0, input_bytes)
+            snapshot = self._maybe_snapshot(now)
+        if snapshot:
+            self._publish(snapshot)
+
+    def worker_limit_changed(self, limit: int, reason: str):
+        """
+        Report a new worker limit set by the adaptive concurrency controller.
+
+        Args:
+            limit: Workers allowed to convert
+            reason: Why the limit was set (see core.services.concurrency)
+        """
+        with self._lock:
+            self._worker_limit = limit
+            self._worker_limit_reason = reason
+            snapshot = self._snapshot(time.monotonic())
+        self._publish(snapshot)
+
+    def finish(self):
+        """Mark the batch as finished and publish the final snapshot."""
+        with self._lock:
+            self._finished = True
+            snapshot = self._snapshot(time.monotonic())
+        self._publish(snapshot)
+
+    def snapshot(self) -> ProgressSnapshot:
+        """Get the current progress without publishing it."""
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _reset(self, total: int, bytes_total: int):
+        """Reset counters for a new batch (caller holds the lock)."""
+        self._total = total
+        self._bytes_total = bytes_total
+        self._succeeded = 0
+        self._failed = 0
+        self._bytes_done = 0
+        self._current_file = ""
+        self._finished = False
+        self._started_at = time.monotonic()
+        self._last_publish = 0.0
+        self._window = deque()
+        self._window_bytes = 0
+        self._worker_limit = 0
+        self._worker_limit_reason = ""
+
+    def _maybe_snapshot(self, now: float) -> Optional[ProgressSnapshot]:
+        """Build a snapshot if the throttle interval has elapsed (caller holds the lock)."""
+        if now - self._last_publish < self._min_interval:
+            return None
+        return self._snapshot(now)
+
+    def _snapshot(self, now: float) -> ProgressSnapshot:
+        """Build a snapshot from the current counters (caller holds the lock)."""
+        self._last_publish = now
+        elapsed = now - self._started_at
+
+        # Drop completions that fell out of the moving-average window
+        window_start = now - self._window_seconds
+        while self._window and self._window[0][0] < window_start:
+            self._window_bytes -= self._window.popleft()[1]
+
+        span = min(elapsed, self._window_seconds)
+        if self._window and span > 0:
+            files_per_second = len(self._window) / span
+            bytes_per_second = self._window_bytes / span
+        else:
+            files_per_second = bytes_per_second = 0.0
+
+        completed = self._succeeded + self._failed
+        eta = None
+        if self._finished or completed >= self._total:
+            eta = 0.0
+        elif self._bytes_total and bytes_per_second > 0:
+            eta = max(0.0, self._bytes_total - self._bytes_done) / bytes_per_second
+        elif files_per_second > 0:
+            eta = (self._total - completed) / files_per_second
+
+        return ProgressSnapshot(
+            total=self._total,
+            completed=completed,
+            succeeded=self._succeeded,
+            failed=self._failed,
+            bytes_total=self._bytes_total,
+            bytes_done=self._bytes_done,
+            current_file=self._current_file,
+            elapsed=elapsed,
+            files_per_second=files_per_second,
+            bytes_per_second=bytes_per_second,
+            eta_seconds=eta,
+            finished=self._finished,
+            worker_limit=self._worker_limit,
+            worker_limit_reason=self._worker_limit_reason
+        )
+
+    def _publish(self, snapshot: ProgressSnapshot):
+        """Deliver a snapshot to all subscribers (outside the lock)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Progress subscriber failed: {e}", exc_info=True)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    Format a duration for progress displays.
+
+    Args:
+        seconds: Duration in seconds (None = unknown)
+
+    Returns:
+        String like '1:05:09', '4:02' or '--:--'
+    """
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class LoggingProgressSubscriber:
+    """
+    Progress subscriber that writes periodic progress lines to the log.
+    """
+
+    def __init__(self, interval_seconds: float = 5.0, log=None):
+        """
+        Initialize the subscriber.
+
+        Args:
+            interval_seconds: Minimum time between log lines (the final snapshot is always logged)
+            log: Logger to write to (defaults to this module's logger)
+        """
+        self.interval_seconds = interval_seconds
+        self.log = log or logger
+        self._last = None
+
+    def __call__(self, snapshot: ProgressSnapshot):
+        """Log the snapshot if the interval has elapsed."""
+        now = time.monotonic()
+        if not snapshot.finished and self._last is not None and now - self._last < self.interval_seconds:
+            return
+        self._last = now
+        self.log.info(
+            f"Progress: {snapshot.completed}/{snapshot.total} "
+            f"({snapshot.failed} failed), {snapshot.files_per_second:.2f} files/s, "
+            f"ETA {format_duration(snapshot.eta_seconds)}"
+            + (f", {snapshot.worker_limit} worker(s)" if snapshot.worker_limit else "")
+        )
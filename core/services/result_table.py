@@ -0,0 +1,317 @@
+"""
+Compact, columnar storage of a batch's jobs and results.
+
+A ConversionJob / ConversionResult pair costs around a kilobyte (two
+instance dicts, full path strings, an options dict, and for failures a
+live exception whose traceback pins adapter frames and COM objects).
+For a million-file batch these tables keep the same information in
+packed arrays instead:
+
+    JobTable     ~30 bytes per job plus the UTF-8 file name (folders are
+                 stored once each, relative to the batch root)
+    ResultTable  ~20 bytes per result plus the text of failure messages
+
+Rows are materialized on access (ConversionJob / ResultRecord), so code
+that iterates a table only holds one row at a time.
+"""
+import os
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+from core.models.conversion_job import ConversionJob, ConversionResult
+
+STATUS_PENDING = 0
+STATUS_SUCCEEDED = 1
+STATUS_FAILED = 2
+
+
+class PathTable:
+    """
+    Interns paths as (folder index, file name) pairs.
+
+    Folders are stored once each, relative to the batch root when they
+    are inside it; file names are packed into one UTF-8 buffer.
+    """
+
+    def __init__(self, root: str = ""):
+        """
+        Args:
+            root: Batch root folder that stored folders are made relative to
+        """
+        self.root = os.path.abspath(root) if root else ""
+        self._folders: List[str] = []
+        self._folder_index: Dict[str, int] = {}
+        self._names = bytearray()
+        self._offsets = array("I", [0])
+        self._last_folder = (-1, "")
+
+    def _folder(self, folder: str) -> int:
+        index = self._folder_index.get(folder)
+        if index is None:
+            index = len(self._folders)
+            stored = folder
+            if self.root:
+                rel = os.path.relpath(folder, self.root) if os.path.isabs(folder) else folder
+                if not rel.startswith(os.pardir) and not os.path.isabs(rel):
+                    stored = rel
+            self._folders.append(stored)
+            self._folder_index[folder] = index
+        return index
+
+    def add(self, path: str) -> Tuple[int, int]:
+        """
+        Store a path.
+
+        Returns:
+            (folder index, name index)
+        """
+        folder, name = os.path.split(path)
+        self._names += name.encode("utf-8", "surrogatepass")
+        self._offsets.append(len(self._names))
+        return self._folder(folder), len(self._offsets) - 2
+
+    def folder(self, index: int) -> str:
+        last_index, last_folder = self._last_folder
+        if index == last_index:
+            # Jobs of a folder are usually adjacent
+            return last_folder
+        folder = self._folders[index]
+        if self.root and not os.path.isabs(folder):
+            folder = os.path.normpath(os.path.join(self.root, folder))
+        self._last_folder = (index, folder)
+        return folder
+
+    def name(self, index: int) -> str:
+        return self._names[self._offsets[index]:self._offsets[index + 1]].decode("utf-8", "surrogatepass")
+
+    def path(self, folder_index: int, name_index: int) -> str:
+        return os.path.join(self.folder(folder_index), self.name(name_index))
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the packed columns."""
+        return len(self._names) + self._offsets.itemsize * len(self._offsets)
+
+
+class JobTable:
+    """
+    Append-only columnar list of conversion jobs.
+
+    Output paths whose file name is the input stem + ".pdf" (the common
+    case) store no name at all. Options are kept only for jobs that have
+    any.
+    """
+
+    def __init__(self, root: str = ""):
+        """
+        Args:
+            root: Batch root folder (typically the scanned input folder)
+        """
+        self.paths = PathTable(root)
+        self._input_folder = array("I")
+        self._input_name = array("I")
+        self._output_folder = array("I")
+        self._output_name = array("i")  # -1 = input stem + ".pdf"
+        self._job_id = array("Q")
+        self._options: Dict[int, dict] = {}
+
+    def append(self, job: ConversionJob) -> int:
+        """
+        Store a job.
+
+        Returns:
+            Index of the job in the table
+        """
+        index = len(self._job_id)
+        paths = self.paths
+        folder, name = paths.add(job.input_path)
+        self._input_folder.append(folder)
+        self._input_name.append(name)
+
+        out_folder, out_name = os.path.split(job.output_path)
+        self._output_folder.append(paths._folder(out_folder))
+        input_name = os.path.basename(job.input_path)
+        if out_name == os.path.splitext(input_name)[0] + ".pdf":
+            self._output_name.append(-1)
+        else:
+            self._output_name.append(paths.add(job.output_path)[1])
+
+        try:
+            self._job_id.append(int(job.job_id, 16))
+        except ValueError:
+            raise ValueError(f"JobTable needs hexadecimal job ids, got {job.job_id!r}")
+        if job.options:
+            self._options[index] = job.options
+        return index
+
+    def extend(self, jobs: Iterable[ConversionJob]):
+        """Store several jobs (consumed lazily)."""
+        for job in jobs:
+            self.append(job)
+
+    def __len__(self) -> int:
+        return len(self._job_id)
+
+    def input_path(self, index: int) -> str:
+        return self.paths.path(self._input_folder[index], self._input_name[index])
+
+    def output_path(self, index: int) -> str:
+        folder = self.paths.folder(self._output_folder[index])
+        name_index = self._output_name[index]
+        if name_index < 0:
+            name = os.path.splitext(self.paths.name(self._input_name[index]))[0] + ".pdf"
+        else:
+            name = self.paths.name(name_index)
+        return os.path.join(folder, name)
+
+    def __getitem__(self, index: int) -> ConversionJob:
+        if index < 0:
+            index += len(self)
+        output_path = self.output_path(index)
+        return ConversionJob(
+            input_path=self.input_path(index),
+            output_path=output_path,
+            output_folder=os.path.dirname(output_path),
+            options=dict(self._options.get(index, {})),
+            job_id=format(self._job_id[index], "012x")
+        )
+
+    def __iter__(self) -> Iterator[ConversionJob]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the packed columns (options excluded)."""
+        columns = (self._input_folder, self._input_name, self._output_folder, self._output_name, self._job_id)
+        return self.paths.nbytes + sum(c.itemsize * len(c) for c in columns)
+
+
+class ResultRecord:
+    """One row of a ResultTable; mirrors the fields of ConversionResult that reports use."""
+
+    __slots__ = (
+        "success", "output_path", "message", "error_type",
+        "page_count", "converter", "duration", "output_bytes"
+    )
+
+    def __init__(self, success, output_path, message, error_type, page_count, converter, duration, output_bytes):
+        self.success = success
+        self.output_path = output_path
+        self.message = message
+        self.error_type = error_type
+        self.page_count = page_count
+        self.converter = converter
+        self.duration = duration
+        self.output_bytes = output_bytes
+
+    def __repr__(self):
+        return (
+            f"ResultRecord(success={self.success}, output_path={self.output_path!r}, "
+            f"error_type={self.error_type!r}, message={self.message!r})"
+        )
+
+
+class ResultTable:
+    """
+    Fixed-size columnar results for the jobs of a JobTable (same indexes).
+
+    Exceptions are reduced to their type name and message, so failed
+    conversions no longer keep tracebacks, frames or COM objects alive.
+    set() may be called from worker threads for different indexes.
+    """
+
+    def __init__(self, jobs: JobTable):
+        """
+        Args:
+            jobs: The batch's jobs; output paths default to the job's output path
+        """
+        size = len(jobs)
+        self.jobs = jobs
+        self._status = bytearray(size)
+        self._duration = array("f", bytes(4 * size))
+        self._page_count = array("i", [-1]) * size
+        self._output_bytes = array("q", [-1]) * size
+        self._converter = array("H", bytes(2 * size))
+        self._error_type = array("H", bytes(2 * size))
+        # Interned strings (converter and error type names); index 0 is "" (none)
+        self._strings: List[str] = [""]
+        self._string_index: Dict[str, int] = {"": 0}
+        self._messages: Dict[int, str] = {}
+        self._output_paths: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _intern(self, value: str) -> int:
+        index = self._string_index.get(value)
+        if index is None:
+            with self._lock:
+                index = self._string_index.get(value)
+                if index is None:
+                    index = len(self._strings)
+                    self._strings.append(value)
+                    self._string_index[value] = index
+        return index
+
+    def set(self, index: int, result: ConversionResult):
+        """Store the result of job `index` (drops the exception object)."""
+        self._status[index] = STATUS_SUCCEEDED if result.success else STATUS_FAILED
+        self._duration[index] = result.duration
+        if result.page_count is not None:
+            self._page_count[index] = result.page_count
+        if result.output_bytes is not None:
+            self._output_bytes[index] = result.output_bytes
+        if result.converter:
+            self._converter[index] = self._intern(result.converter)
+        if result.success:
+            if result.output_path and result.output_path != self.jobs.output_path(index):
+                self._output_paths[index] = result.output_path
+        else:
+            self._error_type[index] = self._intern(type(result.error).__name__ if result.error else "Unknown")
+            self._messages[index] = result.message
+
+    def __len__(self) -> int:
+        return len(self._status)
+
+    def __getitem__(self, index: int) -> ResultRecord:
+        status = self._status[index]
+        succeeded = status == STATUS_SUCCEEDED
+        page_count = self._page_count[index]
+        output_bytes = self._output_bytes[index]
+        return ResultRecord(
+            success=succeeded,
+            output_path=self._output_paths.get(index) or (self.jobs.output_path(index) if succeeded else None),
+            message=self._messages.get(index, "" if status == STATUS_PENDING else "Conversion successful"),
+            error_type=self._strings[self._error_type[index]] or None,
+            page_count=page_count if page_count >= 0 else None,
+            converter=self._strings[self._converter[index]],
+            duration=self._duration[index],
+            output_bytes=output_bytes if output_bytes >= 0 else None
+        )
+
+    def __iter__(self) -> Iterator[ResultRecord]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def count(self, status: int) -> int:
+        """Number of results with the given STATUS_* value."""
+        return self._status.count(status)
+
+    @property
+    def succeeded(self) -> int:
+        return self.count(STATUS_SUCCEEDED)
+
+    @property
+    def failed(self) -> int:
+        return self.count(STATUS_FAILED)
+
+    def failures(self) -> Iterator[Tuple[int, ResultRecord]]:
+        """(index, record) for every failed job, in job order."""
+        for index in sorted(self._messages):
+            if self._status[index] == STATUS_FAILED:
+                yield index, self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the packed columns (message text excluded)."""
+        columns = (self._duration, self._page_count, self._output_bytes, self._converter, self._error_type)
+        return len(self._status) + sum(c.itemsize * len(c) for c in columns)
@@ -0,0 +1,545 @@
+"""
+Shared-directory job queue for spreading one batch over several nodes.
+
+Nodes (converter processes on one or more machines) that can all reach
+the same folder, typically on a file share, take jobs from it without a
+broker or database:
+
+    pending/<entry>             queued job (written to tmp/, then renamed);
+                                <entry> is <stamp>-<job id>.<attempt>.json
+    claimed/<entry>@<node>      job leased by <node>; the file's mtime is the
+                                lease heartbeat
+    done/<stamp>-<job id>.json  outcome of a finished job
+    nodes/<node>.json           per-node counters, rewritten with each heartbeat
+
+A job is claimed by renaming it from pending/ to claimed/. A rename
+succeeds for exactly one node; the others get FileNotFoundError and move
+on to the next entry. A claim whose heartbeat is older than the lease
+(its node crashed or hung) is renamed back to pending/ by whichever node
+notices first, up to `max_attempts` claims per job.
+
+Lease expiry is judged by the local clock against file times written by
+other machines: the lease must be well above the clock skew between
+nodes. Input and output paths are stored as given, so every node must
+see the files under the same paths (use UNC paths for shares).
+"""
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.models.conversion_job import ConversionJob, ConversionResult
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120.0
+
+# Claims of a job (the first plus re-queues after expired leases) before it is failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+_PENDING = "pending"
+_CLAIMED = "claimed"
+_DONE = "done"
+_NODES = "nodes"
+_TMP = "tmp"
+
+_NODE_SEPARATOR = "@"
+
+
+@dataclass
+class NodeStats:
+    """
+    Throughput counters of one node, as published in nodes/<node>.json.
+
+    Attributes:
+        node: Node id
+        host: Host name
+        pid: Process id
+        started_at: Time the node joined the queue (POSIX timestamp)
+        heartbeat_at: Time of the node's last heartbeat
+        claimed: Jobs claimed
+        succeeded: Jobs converted successfully
+        failed: Jobs that failed
+        reclaimed: Expired claims of other nodes this node put back in the queue
+        lost: Claims that expired while this node still held them
+        busy_seconds: Seconds spent converting (summed over workers)
+        finished: Whether the node has left the queue
+    """
+    node: str
+    host: str
+    pid: int
+    started_at: float
+    heartbeat_at: float
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    reclaimed: int = 0
+    lost: int = 0
+    busy_seconds: float = 0.0
+    finished: bool = False
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def files_per_second(self) -> float:
+        """Completed jobs per second since the node joined."""
+        elapsed = self.heartbeat_at - self.started_at
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+
+class SharedJobQueue:
+    """
+    Job queue in a shared directory, with leased claims and heartbeats.
+
+    Usage:
+        with SharedJobQueue(r"\\\\server\\share\\queue") as queue:
+            queue.enqueue(jobs)                        # any node, once per batch
+            for job in queue.iter_jobs():              # every node
+                result = service.convert(job)
+                queue.complete(job, result)
+
+    complete() may be called from worker threads.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str,
+        node_id: Optional[str] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ):
+        """
+        Open (or create) a queue directory.
+
+        Args:
+            queue_dir: Shared queue directory
+            node_id: Name of this node in claims and statistics (default: host-pid)
+            lease_seconds: Seconds without heartbeat after which a claim expires
+            max_attempts: Claims per job before it is recorded as failed
+
+        Raises:
+            OSError: If the queue directories cannot be created
+            ValueError: If the node id is not usable in file names
+        """
+        self.queue_dir = os.path.abspath(queue_dir)
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        if _NODE_SEPARATOR in self.node_id or os.sep in self.node_id or "/" in self.node_id:
+            raise ValueError(f"Node id must not contain '{_NODE_SEPARATOR}' or path separators: {self.node_id!r}")
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = max(0.05, lease_seconds / 4)
+        self.max_attempts = max(1, max_attempts)
+        for name in (_PENDING, _CLAIMED, _DONE, _NODES, _TMP):
+            os.makedirs(os.path.join(self.queue_dir, name), exist_ok=True)
+
+        now = time.time()
+        self.stats = NodeStats(node=self.node_id, host=socket.gethostname(), pid=os.getpid(),
+                               started_at=now, heartbeat_at=now)
+        self._lock = threading.Lock()
+        # job_id -> (entry name, claimed path)
+        self._claims: Dict[str, Tuple[str, str]] = {}
+        self._candidates: List[str] = []
+        self._last_reclaim = 0.0
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _path(self, folder: str, name: str) -> str:
+        return os.path.join(self.queue_dir, folder, name)
+
+    # -- producer ---------------------------------------------------------
+
+    def enqueue(self, jobs) -> int:
+        """
+        Add jobs to the queue.
+
+        Entries are named by submission time, so nodes claim them roughly
+        in the order they were queued.
+
+        Args:
+            jobs: Jobs to queue (may be a lazy iterator)
+
+        Returns:
+            Number of jobs queued
+        """
+        count = 0
+        stamp = time.time_ns() // 1000
+        for job in jobs:
+            entry = _entry_name(stamp + count, job.job_id, 1)
+            tmp_path = self._path(_TMP, f"{entry}.{self.node_id}")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "job_id": job.job_id,
+                    "input_path": os.path.abspath(job.input_path),
+                    "output_path": os.path.abspath(job.output_path),
+                    "output_folder": os.path.abspath(job.output_folder) if job.output_folder else None,
+                    "options": job.options,
+                }, f)
+            os.replace(tmp_path, self._path(_PENDING, entry))
+            count += 1
+        return count
+
+    # -- consumer ---------------------------------------------------------
+
+    def start(self):
+        """Publish this node and start the heartbeat thread."""
+        if self._heartbeat is not None:
+            return
+        self._publish_stats()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="QueueHeartbeat", daemon=True)
+        self._heartbeat.start()
+        logger.info("Node %s joined queue %s (lease %.0fs)", self.node_id, self.queue_dir, self.lease_seconds)
+
+    def claim(self) -> Optional[ConversionJob]:
+        """
+        Claim the oldest job that no other node has claimed.
+
+        Returns:
+            The claimed job, or None if the queue has no pending job
+        """
+        # Entries come from a cached listing; the folder is listed again once it runs out
+        listed = False
+        while True:
+            if not self._candidates:
+                if listed:
+                    return None
+                self._candidates = sorted(_listdir(self._path(_PENDING, "")), reverse=True)
+                listed = True
+                continue
+            entry = self._candidates.pop()
+            pending_path = self._path(_PENDING, entry)
+            claimed_path = self._path(_CLAIMED, f"{entry}{_NODE_SEPARATOR}{self.node_id}")
+            try:
+                # A rename keeps the mtime: refresh it first, so the claim starts with a full lease
+                os.utime(pending_path, None)
+                os.rename(pending_path, claimed_path)
+            except (FileNotFoundError, PermissionError, FileExistsError):
+                # Claimed by another node first
+                continue
+            job = self._load_claim(entry, claimed_path)
+            if job is not None:
+                return job
+
+    def iter_jobs(self, poll_interval: Optional[float] = None) -> Iterator[ConversionJob]:
+        """
+        Claim and yield jobs until the queue is drained.
+
+        The queue is drained when nothing is pending and no other node
+        holds a claim (another node's claims may still expire and return
+        to the queue).
+
+        Args:
+            poll_interval: Seconds to wait between polls of an empty queue
+                           (default: the heartbeat interval)
+        """
+        poll_interval = poll_interval or self.heartbeat_interval
+        while not self._stop.is_set():
+            job = self.claim()
+            if job is not None:
+                yield job
+                continue
+            self.reclaim_expired()
+            if not self._foreign_claims() and not _listdir(self._path(_PENDING, "")):
+                return
+            self._stop.wait(poll_interval)
+
+    def complete(self, job: ConversionJob, result: ConversionResult, duration: float = 0.0):
+        """
+        Record the outcome of a claimed job and release the claim.
+
+        Args:
+            job: A job returned by claim() or iter_jobs()
+            result: Its conversion result
+            duration: Seconds spent converting it
+        """
+        with self._lock:
+            claim = self._claims.pop(job.job_id, None)
+            if result.success:
+                self.stats.succeeded += 1
+            else:
+                self.stats.failed += 1
+            self.stats.busy_seconds += duration
+        if claim is None:
+            logger.warning("Completed job %s that this node does not hold", job.job_id)
+            return
+        entry, claimed_path = claim
+        self._write_done(entry, {
+            "job_id": job.job_id,
+            "input_path": job.input_path,
+            "output_path": result.output_path or job.output_path,
+            "status": "succeeded" if result.success else "failed",
+            "message": result.message,
+            "error_type": type(result.error).__name__ if result.error else None,
+            "page_count": result.page_count,
+            "duration_seconds": round(duration, 3),
+            "node": self.node_id,
+            "finished_at": time.time(),
+        })
+        try:
+            os.remove(claimed_path)
+        except FileNotFoundError:
+            # The lease expired and another node re-queued the job; it may be converted twice
+            with self._lock:
+                self.stats.lost += 1
+            logger.warning("Lease of job %s expired before it finished (%s)", job.job_id, job.input_path)
+
+    def release(self):
+        """Put this node's unfinished claims back in the queue (on shutdown)."""
+        with self._lock:
+            claims = list(self._claims.values())
+            self._claims.clear()
+        for entry, claimed_path in claims:
+            try:
+                os.rename(claimed_path, self._path(_PENDING, entry))
+            except OSError:
+                pass
+        if claims:
+            logger.info("Returned %d unfinished job(s) to the queue", len(claims))
+
+    def reclaim_expired(self) -> int:
+        """
+        Return expired claims of other nodes to the queue.
+
+        A job whose outcome is already recorded only loses its claim file;
+        a job that has been claimed `max_attempts` times is recorded as failed.
+
+        Returns:
+            Number of claims this node took back
+        """
+        now = time.time()
+        if now - self._last_reclaim < self.heartbeat_interval:
+            return 0
+        self._last_reclaim = now
+        reclaimed = 0
+        for name in _listdir(self._path(_CLAIMED, "")):
+            entry, _, node = name.rpartition(_NODE_SEPARATOR)
+            if not entry or node == self.node_id:
+                continue
+            claimed_path = self._path(_CLAIMED, name)
+            try:
+                if now - os.path.getmtime(claimed_path) <= self.lease_seconds:
+                    continue
+            except OSError:
+                continue
+            if self._reclaim(entry, node, claimed_path):
+                reclaimed += 1
+        if reclaimed:
+            with self._lock:
+                self.stats.reclaimed += reclaimed
+        return reclaimed
+
+    def _reclaim(self, entry: str, node: str, claimed_path: str) -> bool:
+        if os.path.exists(self._path(_DONE, _done_name(entry))):
+            # The node finished the job but stopped before releasing the claim
+            try:
+                os.remove(claimed_path)
+            except OSError:
+                pass
+            return False
+        stamp, job_id, attempt = _parse_entry(entry)
+        if attempt >= self.max_attempts:
+            # Take the claim before recording the failure, so only one node does
+            own_path = self._path(_CLAIMED, f"{entry}{_NODE_SEPARATOR}{self.node_id}")
+            try:
+                os.rename(claimed_path, own_path)
+            except OSError:
+                return False
+            job = self._read_job(own_path)
+            self._write_done(entry, {
+                "job_id": job_id,
+                "input_path": job.get("input_path") if job else None,
+                "output_path": None,
+                "status": "failed",
+                "message": f"Abandoned after {attempt} attempt(s); last claimed by {node}",
+                "error_type": "LeaseExpired",
+                "page_count": None,
+                "duration_seconds": 0.0,
+                "node": self.node_id,
+                "finished_at": time.time(),
+            })
+            try:
+                os.remove(own_path)
+            except OSError:
+                pass
+            logger.error("Job %s abandoned after %d expired claim(s)", job_id, attempt)
+            return True
+        try:
+            os.rename(claimed_path, self._path(_PENDING, _entry_name(stamp, job_id, attempt + 1)))
+        except OSError:
+            # Re-queued by another node first
+            return False
+        logger.warning("Re-queued job %s: lease of node %s expired", job_id, node)
+        return True
+
+    def close(self):
+        """Release unfinished claims, stop the heartbeat and publish the final counters."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        self.release()
+        with self._lock:
+            self.stats.finished = True
+        self._publish_stats()
+
+    # -- status -----------------------------------------------------------
+
+    def counts(self) -> Dict[str, int]:
+        """Number of pending, claimed and finished jobs."""
+        return {
+            "pending": len(_listdir(self._path(_PENDING, ""))),
+            "claimed": len(_listdir(self._path(_CLAIMED, ""))),
+            "done": len(_listdir(self._path(_DONE, ""))),
+        }
+
+    def node_stats(self) -> List[NodeStats]:
+        """Published counters of every node that has joined the queue, by node id."""
+        nodes = []
+        for name in sorted(_listdir(self._path(_NODES, ""))):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(self._path(_NODES, name), encoding="utf-8") as f:
+                    nodes.append(NodeStats(**json.load(f)))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning("Ignoring unreadable node file %s: %s", name, e)
+        return nodes
+
+    # -- internals --------------------------------------------------------
+
+    def _load_claim(self, entry: str, claimed_path: str) -> Optional[ConversionJob]:
+        """Turn a freshly claimed entry into a job (an unreadable entry is recorded as failed)."""
+        data = self._read_job(claimed_path)
+        try:
+            job = ConversionJob(
+                input_path=data["input_path"],
+                output_path=data["output_path"],
+                output_folder=data.get("output_folder"),
+                options=data.get("options") or {},
+                job_id=data["job_id"]
+            )
+        except (TypeError, KeyError, ValueError) as e:
+            logger.error("Dropping unreadable queue entry %s: %s", entry, e)
+            self._write_done(entry, {"status": "failed", "message": f"Unreadable queue entry: {e}",
+                                     "error_type": "QueueEntryError", "node": self.node_id})
+            try:
+                os.remove(claimed_path)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            self._claims[job.job_id] = (entry, claimed_path)
+            self.stats.claimed += 1
+        return job
+
+    @staticmethod
+    def _read_job(path: str) -> Optional[dict]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_done(self, entry: str, record: dict):
+        name = _done_name(entry)
+        tmp_path = self._path(_TMP, f"{name}.{self.node_id}")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._path(_DONE, name))
+        except OSError as e:
+            logger.error("Failed to record outcome of %s: %s", entry, e)
+
+    def _foreign_claims(self) -> bool:
+        suffix = f"{_NODE_SEPARATOR}{self.node_id}"
+        return any(not name.endswith(suffix) for name in _listdir(self._path(_CLAIMED, "")))
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            with self._lock:
+                claims = list(self._claims.items())
+            for job_id, (entry, claimed_path) in claims:
+                try:
+                    os.utime(claimed_path, None)
+                except FileNotFoundError:
+                    # Completed in the meantime, or re-queued by another node after a stall
+                    pass
+                except OSError as e:
+                    logger.warning("Heartbeat for job %s failed: %s", job_id, e)
+            try:
+                self.reclaim_expired()
+            except OSError as e:
+                logger.warning("Checking for expired claims failed: %s", e)
+            self._publish_stats()
+
+    def _publish_stats(self):
+        with self._lock:
+            self.stats.heartbeat_at = time.time()
+            data = asdict(self.stats)
+        path = self._path(_NODES, f"{self.node_id}.json")
+        tmp_path = self._path(_TMP, f"{self.node_id}.node")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to publish node statistics: %s", e)
+
+
+def format_node_table(nodes: List[NodeStats], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> str:
+    """Render per-node throughput as a text table."""
+    now = time.time()
+    lines = [f"{'node':<28} {'state':<8} {'claimed':>8} {'ok':>8} {'failed':>7} {'lost':>5} {'files/s':>8} {'busy':>6}"]
+    for node in nodes:
+        if node.finished:
+            state = "finished"
+        elif now - node.heartbeat_at > lease_seconds:
+            state = "silent"
+        else:
+            state = "active"
+        elapsed = node.heartbeat_at - node.started_at
+        # Average number of workers converting
+        busy = f"{node.busy_seconds / elapsed:.1f}" if elapsed > 0 else "-"
+        lines.append(
+            f"{node.node:<28} {state:<8} {node.claimed:>8} {node.succeeded:>8} {node.failed:>7} "
+            f"{node.lost:>5} {node.files_per_second:>8.2f} {busy:>6}"
+        )
+    return "\n".join(lines)
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def _entry_name(stamp: int, job_id: str, attempt: int) -> str:
+    return f"{stamp:016d}-{job_id}.{attempt}.json"
+
+
+def _done_name(entry: str) -> str:
+    """Name of a job's outcome file (the same for every attempt)."""
+    stamp, job_id, _ = _parse_entry(entry)
+    return f"{stamp:016d}-{job_id}.json"
+
+
+def _parse_entry(entry: str) -> Tuple[int, str, int]:
+    """(stamp, job id, attempt) of an entry name."""
+    base = entry[:-len(".json")] if entry.endswith(".json") else entry
+    rest, _, attempt = base.rpartition(".")
+    stamp, _, job_id = rest.partition("-")
+    try:
+        return int(stamp), job_id, int(attempt)
+    except ValueError:
+        return 0, rest, 1
@@ -0,0 +1,210 @@
+"""
+Planning and merging of slide-range shards for large PowerPoint decks.
+
+A very large deck can be exported as several slide ranges, each by its
+own PowerPoint session, and the partial PDFs merged in slide order. The
+shard size comes from the slide count and the per-slide export cost
+measured so far, so small decks keep the single export call. The
+measured cost can be kept in a small JSON file, so a new process plans
+its first large deck with the cost measured by earlier runs. The merge
+drops the outline and structure tags, so only exports without them are
+sharded (see shardable).
+"""
+import json
+import math
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+from core.models.export_profile import ExportProfile
+from core.services.pdf_merger import PdfMerger
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Job option: how many PowerPoint sessions may export one deck (0 or 1 = single export call)
+SLIDE_SHARDS_OPTION = "slide_shards"
+
+# Shards aim at this much export time each; decks estimated below twice this stay whole
+TARGET_SHARD_SECONDS = 60.0
+
+# Never split off fewer slides than this (each shard pays a full open)
+MIN_SHARD_SLIDES = 25
+
+# Upper bound on shards per deck
+MAX_SHARDS = 16
+
+# Per-slide export cost assumed until the first deck has been measured
+DEFAULT_SECONDS_PER_SLIDE = 0.2
+
+
+class SlideCostModel:
+    """
+    Running estimate of export seconds per slide (exponentially weighted).
+
+    Safe to update from several threads. With a file (see persist_to) the
+    estimate survives the process.
+    """
+
+    def __init__(
+        self,
+        seconds_per_slide: float = DEFAULT_SECONDS_PER_SLIDE,
+        weight: float = 0.2,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            seconds_per_slide: Estimate used until the first observation
+            weight: Weight of each new observation (0-1)
+            path: Optional JSON file the estimate is loaded from and saved to
+        """
+        self._estimate = seconds_per_slide
+        self._weight = weight
+        self._observed = False
+        self._lock = threading.Lock()
+        self.path = None
+        if path:
+            self.persist_to(path)
+
+    @property
+    def seconds_per_slide(self) -> float:
+        return self._estimate
+
+    @property
+    def measured(self) -> bool:
+        """Whether the estimate comes from at least one timed export (in this or an earlier run)."""
+        return self._observed
+
+    def persist_to(self, path: str):
+        """
+        Load the estimate saved in a JSON file (if any) and save every update to it.
+
+        An unreadable or invalid file is ignored; it is replaced on the next
+        observation.
+        """
+        with self._lock:
+            self.path = path
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    estimate = json.load(f)["seconds_per_slide"]
+            except FileNotFoundError:
+                return
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning("Ignoring slide cost file %s: %s", path, e)
+                return
+            if isinstance(estimate, (int, float)) and estimate > 0:
+                self._estimate = float(estimate)
+                self._observed = True
+
+    def observe(self, slides: int, seconds: float):
+        """Record the export of `slides` slides in `seconds`."""
+        if slides <= 0 or seconds <= 0:
+            return
+        sample = seconds / slides
+        with self._lock:
+            if self._observed:
+                self._estimate += self._weight * (sample - self._estimate)
+            else:
+                # The first real measurement replaces the default outright
+                self._estimate = sample
+                self._observed = True
+            if self.path:
+                self._save()
+
+    def _save(self):
+        """Write the estimate to the file (lock held); failures are only logged."""
+        partial = self.path + ".tmp"
+        try:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump({"seconds_per_slide": self._estimate}, f)
+            os.replace(partial, self.path)
+        except OSError as e:
+            logger.warning("Cannot save slide cost file %s: %s", self.path, e)
+
+
+# Per-slide export cost shared by all PowerPoint adapter instances (feeds shard planning)
+SLIDE_COSTS = SlideCostModel()
+
+
+def shardable(profile: ExportProfile) -> bool:
+    """Whether exports with this profile may be sharded (the merge keeps no tags and is not PDF/A)."""
+    return not profile.structure_tags and not profile.pdfa
+
+
+def plan_slide_shards(
+    slide_count: int,
+    seconds_per_slide: float,
+    max_shards: int = MAX_SHARDS,
+    target_seconds: float = TARGET_SHARD_SECONDS,
+    min_slides: int = MIN_SHARD_SLIDES
+) -> List[Tuple[int, int]]:
+    """
+    Split a deck into contiguous slide ranges.
+
+    Args:
+        slide_count: Slides in the deck
+        seconds_per_slide: Expected export cost per slide
+        max_shards: Upper bound on the number of shards
+        target_seconds: Export time each shard should take
+        min_slides: Smallest shard
+
+    Returns:
+        Inclusive 1-based (first, last) slide ranges in order; a single
+        range covering the deck means "export in one call"
+    """
+    whole = [(1, max(1, slide_count))]
+    if slide_count < 2 * min_slides or max_shards < 2:
+        return whole
+    estimated = slide_count * max(seconds_per_slide, 0.0)
+    if estimated < 2 * target_seconds:
+        return whole
+
+    count = min(
+        max_shards,
+        MAX_SHARDS,
+        math.ceil(estimated / target_seconds),
+        slide_count // min_slides
+    )
+    if count < 2:
+        return whole
+    # Even split; the first `extra` shards take one slide more
+    size, extra = divmod(slide_count, count)
+    ranges = []
+    first = 1
+    for index in range(count):
+        last = first + size - 1 + (1 if index < extra else 0)
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+def shard_paths(output_path: str, count: int) -> List[str]:
+    """Paths for the partial PDFs of a sharded export (next to the output)."""
+    return [f"{output_path}.part{index + 1:03d}.pdf" for index in range(count)]
+
+
+def merge_shards(paths: Sequence[str], output_path: str) -> int:
+    """
+    Merge partial PDFs in order into `output_path` and delete them.
+
+    The merged file has no outline; the partial PDFs are removed whether
+    or not the merge succeeds.
+
+    Returns:
+        Page count of the merged PDF
+
+    Raises:
+        MergeError: If a partial PDF is missing or damaged
+    """
+    try:
+        with PdfMerger(output_path, with_outline=False) as merger:
+            for path in paths:
+                merger.append(path)
+        return merger.page_count
+    finally:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
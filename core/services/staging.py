@@ -0,0 +1,325 @@
+"""
+Local scratch staging for conversions from and to slow (network) storage.
+
+Office opens and saves documents on an SMB share several times slower
+than on a local disk. The staging area copies upcoming inputs to a local
+scratch directory while earlier files convert, lets the adapters work on
+the local copies, and moves finished PDFs to their destination on a
+background uploader thread. Inputs can be screened (normally by the
+preflight check) where they live before they are copied, so a rejected
+file is never staged and checks that look next to the document, like the
+"~$" owner file of a document open elsewhere, see the original folder.
+"""
+import dataclasses
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from core.models.conversion_job import ConversionJob, ConversionResult
+from utils.exceptions import ConversionError
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SCRATCH_LIMIT = 2 * 1024 ** 3
+
+_STOP = object()
+
+
+class StagingArea:
+    """
+    Bounded local scratch directory with input prefetch and output upload.
+
+    Usage:
+        with StagingArea(prefetch=4) as staging:
+            staging.prefetch(job)                      # as soon as the job is queued
+            result = staging.convert(job, service.convert)
+            staging.upload(job, result, on_done)       # result delivered after the move
+    """
+
+    def __init__(
+        self,
+        scratch_root: Optional[str] = None,
+        prefetch: int = 4,
+        max_scratch_bytes: int = DEFAULT_SCRATCH_LIMIT,
+        copy_threads: int = 2,
+        screen: Optional[Callable[[ConversionJob], Optional[ConversionResult]]] = None
+    ):
+        """
+        Create the scratch directory and start the uploader.
+
+        Args:
+            scratch_root: Parent of the scratch directory (defaults to the system temp folder)
+            prefetch: Number of inputs to copy ahead of the conversions
+            max_scratch_bytes: Soft limit on staged inputs plus pending outputs; a
+                               file larger than the limit is still staged when the
+                               scratch directory is otherwise empty
+            copy_threads: Parallel input copies
+            screen: Optional check run on the original input before it is copied
+                    (normally ConversionService.screen); a result it returns is
+                    the job's result and the input is not staged
+        """
+        if scratch_root:
+            os.makedirs(scratch_root, exist_ok=True)
+        self.scratch_dir = tempfile.mkdtemp(prefix="pdfconverter_", dir=scratch_root)
+        self.prefetch_count = max(0, prefetch)
+        self.max_scratch_bytes = max_scratch_bytes
+        self.screen = screen
+
+        self._lock = threading.Condition()
+        self._used_bytes = 0
+        self._next_id = 0
+        # Scratch room is reserved in prefetch order: a later input cannot take
+        # the room an earlier one (which a worker may be waiting for) needs
+        self._next_ticket = 0
+        self._serving = 0
+        self._staged: Dict[Tuple[str, str], Future] = {}
+        self._closed = False
+
+        self._copier = ThreadPoolExecutor(max_workers=max(1, copy_threads), thread_name_prefix="StagingCopy")
+        self._uploads: queue.Queue = queue.Queue()
+        self._uploader = threading.Thread(target=self._upload_loop, name="StagingUpload", daemon=True)
+        self._uploader.start()
+        logger.info("Staging conversions in %s", self.scratch_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes currently held in the scratch directory."""
+        with self._lock:
+            return self._used_bytes
+
+    def prefetch(self, job: ConversionJob):
+        """
+        Start copying a job's input to scratch in the background.
+
+        Args:
+            job: A job that will be converted soon
+        """
+        key = _job_key(job)
+        with self._lock:
+            if self._closed or key in self._staged:
+                return
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._staged[key] = self._copier.submit(self._stage_input, job, ticket)
+
+    def convert(self, job: ConversionJob, convert: Callable[[ConversionJob], ConversionResult]) -> ConversionResult:
+        """
+        Convert a job from its local copy into scratch.
+
+        The returned result points at the scratch output; pass it to
+        `upload` to move the PDF to the job's real output path.
+
+        Args:
+            job: The original job
+            convert: Conversion function (normally ConversionService.convert)
+
+        Returns:
+            The conversion result
+        """
+        key = _job_key(job)
+        with self._lock:
+            future = self._staged.get(key)
+        if future is None:
+            self.prefetch(job)
+            with self._lock:
+                future = self._staged.get(key)
+
+        local_input = None
+        rejected = None
+        try:
+            local_input, input_bytes, rejected = future.result() if future else (None, 0, None)
+        except Exception as e:
+            logger.warning("Staging failed for %s, converting in place: %s", job.input_path, e)
+            input_bytes = 0
+
+        if local_input is None:
+            with self._lock:
+                self._staged.pop(key, None)
+            return rejected if rejected is not None else convert(job)
+
+        local_output = os.path.join(os.path.dirname(local_input), "out", os.path.basename(job.output_path))
+        os.makedirs(os.path.dirname(local_output), exist_ok=True)
+        local_job = dataclasses.replace(
+            job,
+            input_path=local_input,
+            output_path=local_output,
+            output_folder=os.path.dirname(local_output)
+        )
+        try:
+            result = convert(local_job)
+        finally:
+            self._remove(local_input, input_bytes)
+            with self._lock:
+                self._staged.pop(key, None)
+
+        if result.success:
+            with self._lock:
+                self._used_bytes += _size(result.output_path or local_output)
+        else:
+            self._remove_job_dir(local_input)
+        return result
+
+    def upload(self, job: ConversionJob, result: ConversionResult, on_done: Callable[[ConversionResult], None]):
+        """
+        Queue a converted PDF for the move to its destination.
+
+        Args:
+            job: The original job (its output_path is the destination)
+            result: Result returned by `convert`
+            on_done: Called on the uploader thread with the final result
+        """
+        if not result.success or not result.output_path or result.output_path == job.output_path:
+            on_done(result)
+            return
+        self._uploads.put((job, result, on_done))
+
+    def wait_for_uploads(self):
+        """Block until every queued upload has finished."""
+        self._uploads.join()
+
+    def close(self):
+        """Finish pending uploads, stop background threads and delete the scratch directory."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+            pending = list(self._staged.values())
+        # Drop copies that have not started (shutdown's cancel_futures needs Python 3.9)
+        for future in pending:
+            future.cancel()
+        self._copier.shutdown(wait=True)
+        self._uploads.put(_STOP)
+        self._uploader.join()
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    def _stage_input(
+        self,
+        job: ConversionJob,
+        ticket: int
+    ) -> Tuple[Optional[str], int, Optional[ConversionResult]]:
+        """
+        Copy one input into its own scratch folder (copy thread).
+
+        Returns:
+            (local copy, bytes reserved, None), or (None, 0, result) for an
+            input rejected by the screen
+        """
+        rejected = None
+        if self.screen is not None:
+            try:
+                rejected = self.screen(job)
+            except Exception as e:
+                # The ticket must still be served; the conversion checks the input again
+                logger.warning("Screening failed for %s: %s", job.input_path, e)
+        size = _size(job.input_path) if rejected is None else 0
+        with self._lock:
+            # Wait for this input's turn, then for room unless nothing is staged at all
+            while not self._closed and (
+                ticket != self._serving
+                or (rejected is None and self._used_bytes and self._used_bytes + size > self.max_scratch_bytes)
+            ):
+                self._lock.wait()
+            if self._closed:
+                return None, 0, rejected
+            self._serving += 1
+            self._lock.notify_all()
+            if rejected is not None:
+                return None, 0, rejected
+            self._used_bytes += size
+            self._next_id += 1
+            job_dir = os.path.join(self.scratch_dir, str(self._next_id))
+
+        local_input = os.path.join(job_dir, os.path.basename(job.input_path))
+        try:
+            os.makedirs(job_dir)
+            shutil.copyfile(job.input_path, local_input)
+        except OSError:
+            self._remove(local_input, size)
+            self._remove_job_dir(local_input)
+            raise
+        return local_input, size, None
+
+    def _upload_loop(self):
+        """Move finished outputs to their destinations (uploader thread)."""
+        while True:
+            item = self._uploads.get()
+            try:
+                if item is _STOP:
+                    return
+                job, result, on_done = item
+                local_output = result.output_path
+                size = _size(local_output)
+                try:
+                    _move_into_place(local_output, job.output_path)
+                    result.output_path = job.output_path
+                except OSError as e:
+                    logger.error("Failed to move %s to %s: %s", local_output, job.output_path, e)
+                    error = ConversionError(f"Cannot write output {job.output_path}: {e}")
+                    result = ConversionResult.failure_result(error=error, message=str(error))
+                finally:
+                    self._remove(local_output, size)
+                    self._remove_job_dir(local_output)
+                try:
+                    on_done(result)
+                except Exception as e:
+                    logger.error("Upload callback failed for %s: %s", job.input_path, e, exc_info=True)
+            finally:
+                self._uploads.task_done()
+
+    def _remove(self, path: str, size: int):
+        """Delete a scratch file and release its bytes."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._used_bytes = max(0, self._used_bytes - size)
+            self._lock.notify_all()
+
+    def _remove_job_dir(self, path: str):
+        """Delete a job's scratch folder once it is no longer needed."""
+        job_dir = os.path.dirname(path)
+        if os.path.basename(job_dir) == "out":
+            job_dir = os.path.dirname(job_dir)
+        if os.path.dirname(job_dir) == self.scratch_dir:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def _job_key(job: ConversionJob) -> Tuple[str, str]:
+    """Identify a job across prefetch and convert calls."""
+    return job.input_path, job.output_path
+
+
+def _size(path: str) -> int:
+    """File size in bytes (0 if unavailable)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _move_into_place(source: str, destination: str):
+    """Copy to a temporary name next to the destination, then rename over it."""
+    folder = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(folder, exist_ok=True)
+    partial = destination + ".part"
+    try:
+        shutil.copyfile(source, partial)
+        os.replace(partial, destination)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
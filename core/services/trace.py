@@ -0,0 +1,165 @@
+"""
+Workload traces: one compact record per conversion, for capacity planning.
+
+A trace file is JSON Lines (gzip-compressed when the name ends in .gz).
+The first line is a header, every further line one conversion:
+
+    {"trace": 1, "started": 1768310100.5}
+    {"t": 0.0, "x": ".docx", "c": "WordAdapter", "b": 48213, "p": 3, "d": 0.812,
+     "s": {"dispatch": 0.41, "open": 0.12, ...}, "ok": 1}
+
+Keys: t = start offset from the header (s), x = input extension,
+c = converter, b = input bytes, p = pages (if verified), d = duration (s),
+s = stage timings (s), ok = 1/0, e = error type (failures only).
+File names are not recorded.
+"""
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, IO, List, Optional
+from core.models.conversion_job import ConversionJob, ConversionResult
+
+TRACE_VERSION = 1
+
+# Timings are rounded to 0.1 ms, which keeps a line around 150 bytes
+_DIGITS = 4
+
+
+@dataclass
+class TraceRecord:
+    """
+    One recorded conversion.
+
+    Attributes:
+        start: Seconds from the start of the trace to the start of the conversion
+        extension: Input file extension (e.g. '.docx')
+        converter: Converter class name
+        input_bytes: Input file size
+        page_count: Pages of the generated PDF (None if not verified)
+        duration: Seconds spent in ConversionService.convert
+        stages: Seconds per stage (dispatch, open, export, ...)
+        success: Whether the conversion succeeded
+        error_type: Exception class name for failures
+    """
+    start: float
+    extension: str
+    converter: str
+    input_bytes: int
+    page_count: Optional[int]
+    duration: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    success: bool = True
+    error_type: str = ""
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceRecorder:
+    """
+    Appends a record for every conversion to a trace file.
+
+    Safe to call from worker threads; records are written in completion order.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Trace file to create (overwritten; gzip-compressed if it ends in .gz)
+
+        Raises:
+            OSError: If the file cannot be created
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._clock_start = time.perf_counter()
+        self._file = _open(path, "w")
+        self._file.write(json.dumps({"trace": TRACE_VERSION, "started": self._started}) + "\n")
+        self.count = 0
+
+    def record(self, job: ConversionJob, result: ConversionResult):
+        """
+        Record a finished conversion.
+
+        Args:
+            job: The converted job
+            result: Its result from ConversionService.convert (duration already set)
+        """
+        start = time.perf_counter() - self._clock_start - result.duration
+        line = {
+            "t": round(max(0.0, start), _DIGITS),
+            "x": Path(job.input_path).suffix.lower(),
+            "c": result.converter,
+            "b": result.input_bytes or 0,
+            "p": result.page_count,
+            "d": round(result.duration, _DIGITS),
+            "s": {stage: round(seconds, _DIGITS) for stage, seconds in result.stage_timings.items()},
+            "ok": 1 if result.success else 0,
+        }
+        if not result.success:
+            line["e"] = type(result.error).__name__ if result.error else "Unknown"
+        data = json.dumps(line, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self.count += 1
+
+    def close(self):
+        """Flush and close the trace file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_trace(path: str) -> List[TraceRecord]:
+    """
+    Load a trace file.
+
+    Args:
+        path: File written by TraceRecorder
+
+    Returns:
+        Records ordered by start offset
+
+    Raises:
+        ValueError: If the file is not a trace or has an unsupported version
+        OSError: If the file cannot be read
+    """
+    records = []
+    with _open(path, "r") as f:
+        header = f.readline()
+        try:
+            version = json.loads(header).get("trace")
+        except (ValueError, AttributeError):
+            version = None
+        if version != TRACE_VERSION:
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} trace file")
+        for line_number, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                records.append(TraceRecord(
+                    start=float(item["t"]),
+                    extension=item["x"],
+                    converter=item.get("c", ""),
+                    input_bytes=int(item.get("b", 0)),
+                    page_count=item.get("p"),
+                    duration=float(item["d"]),
+                    stages=item.get("s", {}),
+                    success=bool(item.get("ok", 1)),
+                    error_type=item.get("e", ""),
+                ))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid trace record: {e}")
+    records.sort(key=lambda r: r.start)
+    return records
@@ -0,0 +1,180 @@
+"""
+Replay of workload traces on the real batch scheduler and worker pool.
+
+Each recorded conversion becomes a job whose "conversion" sleeps for its
+recorded duration divided by a speedup factor, so a trace of a night's
+batch replays in seconds while still going through BatchRunner,
+ConversionWorker and ConversionService.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from core.interfaces.converter import IConverter
+from core.models.conversion_job import ConversionJob, ConversionResult
+from core.services.batch_runner import BatchRunner
+from core.services.conversion_service import ConversionService
+from core.services.stage_stats import percentile
+from core.services.trace import TraceRecord
+from utils.exceptions import ConversionError
+
+ORDER_RECORDED = "recorded"
+ORDER_LARGEST = "largest-first"
+ORDER_SMALLEST = "smallest-first"
+ORDER_LONGEST = "longest-first"
+ORDER_SHORTEST = "shortest-first"
+ORDERS = (ORDER_RECORDED, ORDER_LARGEST, ORDER_SMALLEST, ORDER_LONGEST, ORDER_SHORTEST)
+
+# Job option carrying the TraceRecord a replayed job stands for
+REPLAY_OPTION = "replay_record"
+
+
+@dataclass
+class ReplayReport:
+    """
+    Outcome of one replay, in recorded (not replayed) seconds.
+
+    Attributes:
+        workers: Worker threads used
+        order: Submission order policy
+        jobs: Jobs replayed
+        failed: Jobs that failed in the recording
+        makespan: Time from the first submission to the last completion
+        utilization: Busy worker time / (workers * makespan)
+        latency_p50: Median time from batch start to job completion
+        latency_p90: 90th percentile of the same
+        latency_p99: 99th percentile of the same
+        latency_max: Completion time of the slowest job
+    """
+    workers: int
+    order: str
+    jobs: int
+    failed: int
+    makespan: float
+    utilization: float
+    latency_p50: float
+    latency_p90: float
+    latency_p99: float
+    latency_max: float
+
+
+class ReplayConverter(IConverter):
+    """Converter that sleeps for a job's recorded duration instead of converting."""
+
+    def __init__(self, extensions: Sequence[str], speedup: float = 100.0):
+        """
+        Args:
+            extensions: Extensions to register for
+            speedup: Recorded seconds per replayed second
+        """
+        self._extensions = list(extensions)
+        self.speedup = speedup
+
+    def supported_extensions(self) -> List[str]:
+        return self._extensions
+
+    def convert(self, job: ConversionJob) -> ConversionResult:
+        record: TraceRecord = job.options[REPLAY_OPTION]
+        time.sleep(record.duration / self.speedup)
+        if record.success:
+            result = ConversionResult.success_result(output_path=job.output_path)
+        else:
+            result = ConversionResult.failure_result(
+                error=ConversionError(f"Replayed failure ({record.error_type})"),
+                message=record.error_type
+            )
+        result.stage_timings = dict(record.stages)
+        return result
+
+
+def order_records(records: Sequence[TraceRecord], order: str = ORDER_RECORDED) -> List[TraceRecord]:
+    """
+    Arrange records in a submission order.
+
+    Args:
+        records: Trace records (in recorded order)
+        order: One of ORDERS; 'longest-first'/'shortest-first' use the recorded
+               durations, i.e. a scheduler with perfect knowledge of job cost
+
+    Returns:
+        Reordered list
+    """
+    if order == ORDER_RECORDED:
+        return list(records)
+    if order == ORDER_LARGEST:
+        return sorted(records, key=lambda r: r.input_bytes, reverse=True)
+    if order == ORDER_SMALLEST:
+        return sorted(records, key=lambda r: r.input_bytes)
+    if order == ORDER_LONGEST:
+        return sorted(records, key=lambda r: r.duration, reverse=True)
+    if order == ORDER_SHORTEST:
+        return sorted(records, key=lambda r: r.duration)
+    raise ValueError(f"Unknown replay order: {order}. Supported: {', '.join(ORDERS)}")
+
+
+def replay(
+    records: Sequence[TraceRecord],
+    workers: int,
+    order: str = ORDER_RECORDED,
+    speedup: float = 100.0,
+    service: Optional[ConversionService] = None
+) -> ReplayReport:
+    """
+    Run a trace through BatchRunner with simulated conversions.
+
+    All jobs are available at the start, as in a CLI batch.
+
+    Args:
+        records: Trace records to replay
+        workers: Number of worker threads
+        order: Submission order (see order_records)
+        speedup: Recorded seconds per replayed second
+        service: Service to run the jobs through (defaults to one with a ReplayConverter
+                 for every recorded extension)
+
+    Returns:
+        ReplayReport with times scaled back to recorded seconds
+    """
+    if service is None:
+        service = ConversionService()
+        service.register_converter(ReplayConverter({r.extension for r in records}, speedup))
+
+    ordered = order_records(records, order)
+    jobs = [
+        ConversionJob(
+            input_path=f"replay_{i}{record.extension}",
+            output_path=f"replay_{i}.pdf",
+            options={REPLAY_OPTION: record}
+        )
+        for i, record in enumerate(ordered)
+    ]
+
+    completions: List[float] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def on_outcome(outcome):
+        finished = time.perf_counter() - start
+        with lock:
+            completions.append(finished)
+
+    summary = BatchRunner(service, num_workers=workers).run(jobs, on_outcome=on_outcome)
+    makespan = (max(completions) if completions else 0.0) * speedup
+    busy = sum(r.duration for r in ordered)
+    completions = sorted(c * speedup for c in completions)
+
+    def pct(value: float) -> float:
+        return percentile(completions, value) if completions else 0.0
+
+    return ReplayReport(
+        workers=max(1, workers),
+        order=order,
+        jobs=summary.total,
+        failed=sum(1 for r in ordered if not r.success),
+        makespan=makespan,
+        utilization=busy / (max(1, workers) * makespan) if makespan else 0.0,
+        latency_p50=pct(50),
+        latency_p90=pct(90),
+        latency_p99=pct(99),
+        latency_max=completions[-1] if completions else 0.0,
+    )
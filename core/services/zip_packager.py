@@ -0,0 +1,296 @@
+"""
+Streaming ZIP packaging of finished PDFs.
+
+Each PDF is appended to the archive as soon as its conversion finishes,
+so packaging overlaps with conversion and needs no second pass over the
+output folder. The central directory is rewritten at regular checkpoints;
+if the process dies in between, `recover_archive` rebuilds the directory
+from the local file headers of every entry that was completely written.
+"""
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from typing import List, Optional, Set, Tuple
+from utils.exceptions import PdfConverterException
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Supported compression modes
+COMPRESSION_STORED = "stored"
+COMPRESSION_DEFLATE = "deflate"
+COMPRESSION_MODES = {
+    COMPRESSION_STORED: zipfile.ZIP_STORED,
+    COMPRESSION_DEFLATE: zipfile.ZIP_DEFLATED,
+}
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIG = b"PK\x03\x04"
+_ZIP64_EXTRA_ID = 0x0001
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+
+class PackagingError(PdfConverterException):
+    """Raised when the output archive cannot be written or recovered."""
+    pass
+
+
+class ZipPackager:
+    """
+    Thread-safe writer that appends PDFs to a ZIP archive as they complete.
+
+    Usage:
+        with ZipPackager(archive_path) as packager:
+            packager.add(pdf_path, "reports/q1.pdf")
+    """
+
+    def __init__(
+        self,
+        archive_path: str,
+        compression: str = COMPRESSION_DEFLATE,
+        compresslevel: Optional[int] = None,
+        checkpoint_interval: Optional[float] = 30.0,
+        resume: bool = False
+    ):
+        """
+        Open the archive for writing.
+
+        Args:
+            archive_path: Path of the ZIP file
+            compression: 'stored' or 'deflate'
+            compresslevel: Deflate level (None for the zlib default)
+            checkpoint_interval: Seconds between central directory rewrites
+                                 (None to write it only on close)
+            resume: Append to an existing (possibly interrupted) archive instead
+                    of replacing it
+
+        Raises:
+            PackagingError: If the archive cannot be created or recovered
+        """
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown compression: {compression}. Supported: {', '.join(COMPRESSION_MODES)}")
+        self.archive_path = archive_path
+        self.compression = COMPRESSION_MODES[compression]
+        self.compresslevel = compresslevel
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._names: Set[str] = set()
+        self._added = 0
+        self._last_checkpoint = time.monotonic()
+
+        mode = "w"
+        if resume and os.path.exists(archive_path):
+            recover_archive(archive_path)
+            mode = "a"
+        try:
+            self._zip = self._open(mode)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise PackagingError(f"Cannot open archive {archive_path}: {e}")
+        self._names.update(self._zip.namelist())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def entry_count(self) -> int:
+        """Number of entries added in this session."""
+        return self._added
+
+    def add(self, file_path: str, arcname: Optional[str] = None) -> str:
+        """
+        Append a file to the archive (safe to call from worker threads).
+
+        Args:
+            file_path: File to add
+            arcname: Name inside the archive (defaults to the file name)
+
+        Returns:
+            The name the file was stored under (names already present in a
+            resumed archive are replaced by the new entry on extraction)
+
+        Raises:
+            PackagingError: If the archive has been closed or the write fails
+        """
+        arcname = (arcname or os.path.basename(file_path)).replace(os.sep, "/")
+        with self._lock:
+            if self._zip is None:
+                raise PackagingError("Archive is closed")
+            try:
+                self._zip.write(file_path, arcname)
+            except OSError as e:
+                raise PackagingError(f"Cannot add {file_path} to {self.archive_path}: {e}")
+            self._names.add(arcname)
+            self._added += 1
+            if (self.checkpoint_interval is not None
+                    and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+                self._checkpoint()
+        return arcname
+
+    def contains(self, arcname: str) -> bool:
+        """Whether an entry with this name is already in the archive."""
+        with self._lock:
+            return arcname.replace(os.sep, "/") in self._names
+
+    def close(self):
+        """Write the final central directory and close the archive."""
+        with self._lock:
+            if self._zip is None:
+                return
+            self._zip.close()
+            self._zip = None
+        logger.info(f"Packaged {self._added} file(s) into {self.archive_path}")
+
+    def _open(self, mode: str) -> zipfile.ZipFile:
+        """Open the underlying ZipFile."""
+        return zipfile.ZipFile(
+            self.archive_path, mode,
+            compression=self.compression,
+            compresslevel=self.compresslevel,
+            allowZip64=True
+        )
+
+    def _checkpoint(self):
+        """Make the archive readable as-is by writing the central directory (lock held)."""
+        self._zip.close()
+        self._zip = self._open("a")
+        self._last_checkpoint = time.monotonic()
+        logger.debug(f"Checkpointed {self.archive_path} ({len(self._names)} entries)")
+
+
+def recover_archive(archive_path: str) -> int:
+    """
+    Make an interrupted archive readable again.
+
+    Entries are located by walking the local file headers from the start
+    of the file. A partially written last entry is cut off, and a new
+    central directory is written for everything before it.
+
+    Args:
+        archive_path: Path of the ZIP file
+
+    Returns:
+        Number of entries in the recovered archive
+
+    Raises:
+        PackagingError: If the file does not start with a ZIP entry
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            return len(zf.infolist())
+    except zipfile.BadZipFile:
+        pass
+
+    with open(archive_path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size and not _is_entry_boundary(f, 0):
+            raise PackagingError(f"{archive_path} is not a ZIP archive")
+        entries, end = _scan_local_headers(f)
+        f.truncate(end)
+
+    # 'a' mode on a file without a central directory appends after the
+    # existing data; registering the recovered entries makes close() write
+    # a directory that covers them
+    with zipfile.ZipFile(archive_path, "a", allowZip64=True) as zf:
+        for info in entries:
+            zf.filelist.append(info)
+            zf.NameToInfo[info.filename] = info
+    logger.warning(f"Recovered {len(entries)} entries in interrupted archive {archive_path}")
+    return len(entries)
+
+
+def _scan_local_headers(f) -> Tuple[List[zipfile.ZipInfo], int]:
+    """Walk complete entries from the start of the file; return them and the end offset."""
+    size = os.fstat(f.fileno()).st_size
+    entries: List[zipfile.ZipInfo] = []
+    last_data_start = 0
+    pos = 0
+    while pos + _LOCAL_HEADER.size <= size:
+        f.seek(pos)
+        header = f.read(_LOCAL_HEADER.size)
+        (sig, _version, flags, method, mod_time, mod_date, crc,
+         compress_size, file_size, name_len, extra_len) = _LOCAL_HEADER.unpack(header)
+        if sig != _LOCAL_HEADER_SIG or flags & _FLAG_DATA_DESCRIPTOR:
+            break
+        name = f.read(name_len)
+        extra = f.read(extra_len)
+        if len(name) < name_len or len(extra) < extra_len:
+            break
+        if compress_size == 0xFFFFFFFF or file_size == 0xFFFFFFFF:
+            file_size, compress_size = _zip64_sizes(extra, file_size, compress_size)
+
+        data_start = pos + _LOCAL_HEADER.size + name_len + extra_len
+        data_end = data_start + compress_size
+        if data_end > size:
+            break
+        # Sizes are patched into the header only after the data is written;
+        # an unfinished entry still has zero sizes followed by data
+        if compress_size == 0 and data_end < size and not _is_entry_boundary(f, data_end):
+            break
+
+        info = zipfile.ZipInfo(name.decode("utf-8" if flags & 0x800 else "cp437"))
+        info.date_time = (
+            (mod_date >> 9) + 1980, (mod_date >> 5) & 0xF, mod_date & 0x1F,
+            mod_time >> 11, (mod_time >> 5) & 0x3F, (mod_time & 0x1F) * 2
+        )
+        info.flag_bits = flags
+        info.compress_type = method
+        info.CRC = crc
+        info.compress_size = compress_size
+        info.file_size = file_size
+        info.header_offset = pos
+        info.extra = extra
+        entries.append(info)
+        last_data_start = data_start
+        pos = data_end
+
+    # The last entry is the one most likely to be damaged; check its data
+    if entries and not _crc_matches(f, entries[-1], last_data_start):
+        pos = entries.pop().header_offset
+    return entries, pos
+
+
+def _is_entry_boundary(f, pos: int) -> bool:
+    """Whether a local header or the central directory starts at `pos`."""
+    f.seek(pos)
+    return f.read(4) in (_LOCAL_HEADER_SIG, b"PK\x01\x02")
+
+
+def _zip64_sizes(extra: bytes, file_size: int, compress_size: int):
+    """Read the real sizes from a Zip64 extra field."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, length = struct.unpack_from("<HH", extra, pos)
+        if field_id == _ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from("<%dQ" % (length // 8), extra, pos + 4))
+            if file_size == 0xFFFFFFFF and values:
+                file_size = values.pop(0)
+            if compress_size == 0xFFFFFFFF and values:
+                compress_size = values.pop(0)
+            break
+        pos += 4 + length
+    return file_size, compress_size
+
+
+def _crc_matches(f, info: zipfile.ZipInfo, data_start: int) -> bool:
+    """Decompress one entry and compare its CRC-32."""
+    f.seek(data_start)
+    remaining = info.compress_size
+    decompressor = zlib.decompressobj(-15) if info.compress_type == zipfile.ZIP_DEFLATED else None
+    crc = 0
+    try:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                return False
+            remaining -= len(chunk)
+            crc = zlib.crc32(decompressor.decompress(chunk) if decompressor else chunk, crc)
+        if decompressor:
+            crc = zlib.crc32(decompressor.flush(), crc)
+    except zlib.error:
+        return False
+    return crc == info.CRC
@@ -0,0 +1,150 @@
+"""Tests for the command-line converter."""
+import json
+import os
+import tempfile
+import time
+import unittest
+from benchmarks.simcom import minimal_pdf
+from app.cli import EXIT_USAGE, run
+from core.interfaces.converter import IConverter
+from core.models.conversion_job import ConversionResult
+from core.services.conversion_service import ConversionService
+from utils.pdf.objects import Name
+from utils.pdf.reader import PdfReader
+
+
+def _pdf(width: int) -> bytes:
+    """One-page PDF whose page width (600-609) identifies its source."""
+    return minimal_pdf(1).replace(b"612 792", b"%d 792" % width)
+
+
+class _WordConverter(IConverter):
+    """Writes a PDF whose page width encodes the input's digit, e.g. doc3.docx -> 603."""
+
+    def supported_extensions(self):
+        return [".docx"]
+
+    def convert(self, job):
+        digit = int(os.path.splitext(os.path.basename(job.input_path))[0][-1])
+        with open(job.output_path, "wb") as f:
+            f.write(_pdf(600 + digit))
+        return ConversionResult.success_result(job.output_path)
+
+
+class IncrementalMergeTest(unittest.TestCase):
+
+    def test_skipped_outputs_are_merged_in_job_order(self):
+        with tempfile.TemporaryDirectory() as folder:
+            inputs, output = os.path.join(folder, "in"), os.path.join(folder, "out")
+            os.makedirs(inputs)
+            os.makedirs(output)
+            for digit in range(1, 6):
+                with open(os.path.join(inputs, f"doc{digit}.docx"), "wb") as f:
+                    f.write(b"PK\x03\x04")
+            # doc2 and doc3 already have up-to-date PDFs
+            past = time.time() - 60
+            for digit in (2, 3):
+                os.utime(os.path.join(inputs, f"doc{digit}.docx"), (past, past))
+                with open(os.path.join(output, f"doc{digit}.pdf"), "wb") as f:
+                    f.write(_pdf(600 + digit))
+
+            order = [4, 2, 5, 3, 1]
+            manifest = os.path.join(folder, "jobs.jsonl")
+            with open(manifest, "w", encoding="utf-8") as f:
+                for digit in order:
+                    f.write('{"input": "in/doc%d.docx"}\n' % digit)
+
+            service = ConversionService()
+            service.register_converter(_WordConverter())
+            merged = os.path.join(folder, "merged.pdf")
+            code = run(
+                ["--manifest", manifest, "-o", output, "--incremental", "--merge", merged, "--workers", "2"],
+                service=service
+            )
+
+            self.assertEqual(code, 0)
+            reader = PdfReader(merged)
+            try:
+                widths = [page[Name("MediaBox")][2] for _, page in reader.iter_pages()]
+            finally:
+                reader.close()
+            self.assertEqual(widths, [600 + digit for digit in order])
+
+
+class ManifestOutputTest(unittest.TestCase):
+
+    def test_manifest_outputs_do_not_collide(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for sub in ("a", "b", "scanned"):
+                os.makedirs(os.path.join(folder, sub))
+            for rel in ("a/doc1.docx", "b/doc1.docx", "b/doc2.docx", "scanned/doc3.docx"):
+                with open(os.path.join(folder, rel), "wb") as f:
+                    f.write(b"PK\x03\x04")
+            manifest = os.path.join(folder, "jobs.jsonl")
+            with open(manifest, "w", encoding="utf-8") as f:
+                f.write('{"input": "a/doc1.docx"}\n')
+                f.write('{"input": "b/doc1.docx"}\n')
+                # Explicit name taken by the scanned doc3.docx
+                f.write('{"input": "b/doc2.docx", "output_name": "doc3"}\n')
+            output = os.path.join(folder, "out")
+            report = os.path.join(folder, "report.jsonl")
+
+            service = ConversionService()
+            service.register_converter(_WordConverter())
+            code = run(
+                [os.path.join(folder, "scanned"), "--manifest", manifest, "-o", output, "--report", report],
+                service=service
+            )
+
+            with open(report, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            outputs = sorted(
+                os.path.basename(r["output"]) for r in records if r.get("status") == "converted"
+            )
+            self.assertEqual(outputs, ["doc1 (2).pdf", "doc1.pdf", "doc3.pdf"])
+            self.assertEqual(sorted(os.listdir(output)), outputs)
+            rejected = [r for r in records if r.get("status") == "failed"]
+            self.assertEqual(len(rejected), 1)
+            self.assertIn("already used", rejected[0]["message"])
+            self.assertNotEqual(code, 0)
+
+    def test_filtered_manifest_rows_are_reported_as_skipped(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ("doc1.docx", "doc2.rtf"):
+                with open(os.path.join(folder, name), "wb") as f:
+                    f.write(b"PK\x03\x04")
+            manifest = os.path.join(folder, "jobs.jsonl")
+            with open(manifest, "w", encoding="utf-8") as f:
+                f.write('{"input": "doc1.docx"}\n{"input": "doc2.rtf"}\n')
+            report = os.path.join(folder, "report.json")
+
+            converter = _WordConverter()
+            converter.supported_extensions = lambda: [".docx", ".rtf"]
+            service = ConversionService()
+            service.register_converter(converter)
+            code = run(
+                ["--manifest", manifest, "-o", os.path.join(folder, "out"), "--exclude", "rtf", "--report", report],
+                service=service
+            )
+
+            self.assertEqual(code, 0)
+            with open(report, encoding="utf-8") as f:
+                data = json.load(f)
+            self.assertEqual(data["summary"]["inputs"], 2)
+            self.assertEqual(data["summary"]["skipped"], 1)
+            skipped = [r for r in data["files"] if r["status"] == "skipped"]
+            self.assertEqual([os.path.basename(r["input"]) for r in skipped], ["doc2.rtf"])
+
+    def test_unreadable_manifest_is_a_usage_error(self):
+        with tempfile.TemporaryDirectory() as folder:
+            service = ConversionService()
+            service.register_converter(_WordConverter())
+            code = run(
+                ["--manifest", os.path.join(folder, "missing.jsonl"), "-o", os.path.join(folder, "out")],
+                service=service
+            )
+            self.assertEqual(code, EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
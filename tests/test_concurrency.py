@@ -0,0 +1,44 @@
+"""Tests for the adaptive concurrency controller."""
+import unittest
+from core.services.concurrency import REASON_FAILURES, ConcurrencyController, ConcurrencyPolicy
+from utils.system import SystemLoad
+
+
+class _Worker:
+    """Stand-in for ConversionWorker's limit interface."""
+
+    def __init__(self):
+        self.active_count = 0
+        self.queue_size = 0
+
+    def set_active_limit(self, limit):
+        return limit
+
+
+class ConcurrencyControllerTest(unittest.TestCase):
+
+    def test_counts_held_back_during_cooldown_are_judged_later(self):
+        """Pressure while the last decrease is still draining is not forgotten."""
+        worker = _Worker()
+        policy = ConcurrencyPolicy(min_workers=1, max_workers=8, min_samples=8, probe=SystemLoad)
+        controller = ConcurrencyController(worker, policy, initial=8)
+
+        for _ in range(8):
+            controller.record(False)
+        self.assertEqual(controller.tick().limit, 4)
+
+        # Eight workers are still finishing: the failures of this window wait
+        worker.active_count = 8
+        for _ in range(8):
+            controller.record(False)
+        self.assertIsNone(controller.tick())
+
+        worker.active_count = 4
+        decision = controller.tick()
+        self.assertEqual(decision.reason, REASON_FAILURES)
+        self.assertEqual(decision.limit, 2)
+        self.assertEqual(decision.failure_rate, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
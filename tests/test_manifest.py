@@ -0,0 +1,70 @@
+"""Tests for manifest parsing."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from core.interfaces.converter import IConverter
+from core.services.conversion_service import ConversionService
+from core.services.manifest import ManifestEntry, ManifestError, ManifestJobSource, iter_manifest
+
+
+class IterManifestTest(unittest.TestCase):
+
+    def _read(self, text):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "jobs.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            return list(iter_manifest(path))
+
+    def test_non_string_fields_are_rejected(self):
+        entries = self._read(
+            '{"input": 42}\n'
+            '{"input": "a.docx", "output_name": ["b.pdf"]}\n'
+            '{"input": "c.docx", "output_folder": {"path": "out"}}\n'
+            '{"input": "d.docx", "output_name": null}\n'
+        )
+        self.assertEqual([type(entry) for entry in entries], [ManifestError] * 3 + [ManifestEntry])
+        self.assertEqual([entry.line for entry in entries[:3]], [1, 2, 3])
+        self.assertIn("'input' must be a string", entries[0].reason)
+        self.assertEqual(entries[0].input_path, "")
+        self.assertIn("'output_name' must be a string", entries[1].reason)
+        self.assertEqual(entries[1].input_path, "a.docx")
+        self.assertIn("'output_folder' must be a string", entries[2].reason)
+        self.assertIsNone(entries[3].output_name)
+
+
+class _DocxConverter(IConverter):
+
+    def supported_extensions(self):
+        return [".docx"]
+
+    def convert(self, job):
+        raise NotImplementedError
+
+
+class ManifestJobSourceTest(unittest.TestCase):
+
+    def test_each_folder_is_listed_once_per_chunk(self):
+        """A chunk spanning more folders than the listing cache holds still lists each folder once."""
+        with tempfile.TemporaryDirectory() as root:
+            entries = []
+            for index in range(3):
+                folder = os.path.join(root, str(index))
+                os.makedirs(folder)
+                for name in ("a.docx", "b.docx"):
+                    open(os.path.join(folder, name), "wb").close()
+                    entries.append(ManifestEntry(len(entries) + 1, os.path.join(folder, name)))
+            service = ConversionService()
+            service.register_converter(_DocxConverter())
+            source = ManifestJobSource(service, default_output_folder=os.path.join(root, "out"), max_cached_dirs=1)
+
+            with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+                jobs = list(source.iter_jobs(entries))
+
+            self.assertEqual(len(jobs), 6)
+            self.assertEqual(scandir.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
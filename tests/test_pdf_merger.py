@@ -0,0 +1,124 @@
+"""Tests for the streaming PDF merger and the PDF reader it is built on."""
+import os
+import shutil
+import tempfile
+import unittest
+from benchmarks.simcom import minimal_pdf
+from core.services.pdf_merger import MergeError, PdfMerger, merge_pdfs
+from utils.pdf.objects import Name, Ref, Stream
+from utils.pdf.reader import PdfReader
+
+
+def _build_pdf(objects) -> bytes:
+    """PDF whose objects 1, 2, ... are the given bodies (object 1 is the catalog)."""
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _deck_with_shared_font() -> bytes:
+    """Two pages with their own content streams and one shared font."""
+    return _build_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 /Resources << /Font << /F1 7 0 R >> >> >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 5 0 R >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 6 0 R >>",
+        b"<< /Length 11 >>\nstream\nBT (one) ET\nendstream",
+        b"<< /Length 11 >>\nstream\nBT (two) ET\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ])
+
+
+class PdfMergerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_objects_are_renumbered_without_collisions(self):
+        """Both sources use objects 1-7; each page keeps its own content and the font stays shared."""
+        first = self._write("first.pdf", _deck_with_shared_font())
+        second = self._write("second.pdf", _deck_with_shared_font())
+        merged = os.path.join(self.folder, "merged.pdf")
+        with PdfMerger(merged) as merger:
+            self.assertEqual(merger.append(first), 2)
+            self.assertEqual(merger.append(second), 2)
+
+        with PdfReader(merged) as reader:
+            self.assertEqual(reader.page_count(), 4)
+            pages = list(reader.iter_pages())
+            contents = [reader.resolve(page[Name("Contents")]) for _, page in pages]
+            self.assertTrue(all(isinstance(stream, Stream) for stream in contents))
+            self.assertEqual(
+                [reader.decode_stream(stream) for stream in contents],
+                [b"BT (one) ET", b"BT (two) ET"] * 2
+            )
+            page_nums = [ref.num for ref, _ in pages]
+            content_nums = [page[Name("Contents")].num for _, page in pages]
+            self.assertEqual(len(set(page_nums + content_nums)), 8)
+            # The inherited font resolves to one copy per source document
+            fonts = [page[Name("Resources")][Name("Font")][Name("F1")] for _, page in pages]
+            self.assertTrue(all(isinstance(font, Ref) for font in fonts))
+            self.assertEqual(fonts[0], fonts[1])
+            self.assertEqual(fonts[2], fonts[3])
+            self.assertNotEqual(fonts[0], fonts[2])
+            self.assertEqual(reader.resolve(fonts[2])[Name("BaseFont")], "Helvetica")
+
+    def test_outline_has_one_entry_per_document(self):
+        sources = [
+            ("report.docx", self._write("report.pdf", minimal_pdf(2))),
+            ("budget.xlsx", self._write("budget.pdf", minimal_pdf(3))),
+        ]
+        merged = os.path.join(self.folder, "merged.pdf")
+        pages, skipped = merge_pdfs(sources, merged)
+        self.assertEqual((pages, skipped), (5, []))
+
+        with PdfReader(merged) as reader:
+            page_refs = [ref for ref, _ in reader.iter_pages()]
+            outlines = reader.resolve(reader.root[Name("Outlines")])
+            self.assertEqual(outlines[Name("Count")], 2)
+            first = reader.resolve(outlines[Name("First")])
+            second = reader.resolve(first[Name("Next")])
+            self.assertEqual(outlines[Name("Last")], first[Name("Next")])
+            self.assertEqual([first[Name("Title")], second[Name("Title")]], [b"report.docx", b"budget.xlsx"])
+            self.assertEqual(first[Name("Dest")][0], page_refs[0])
+            self.assertEqual(second[Name("Dest")][0], page_refs[2])
+
+    def test_unreadable_sources_are_skipped(self):
+        good = self._write("good.pdf", minimal_pdf(1))
+        damaged = self._write("damaged.pdf", b"%PDF-1.7\nnot really a pdf\n")
+        missing = os.path.join(self.folder, "missing.pdf")
+        merged = os.path.join(self.folder, "merged.pdf")
+
+        pages, skipped = merge_pdfs([("a", damaged), ("b", good), ("c", missing)], merged)
+
+        self.assertEqual(pages, 1)
+        self.assertEqual([path for path, _ in skipped], [damaged, missing])
+        with PdfReader(merged) as reader:
+            self.assertEqual(reader.page_count(), 1)
+
+    def test_nothing_to_merge_leaves_no_output(self):
+        merged = os.path.join(self.folder, "merged.pdf")
+        with self.assertRaises(MergeError):
+            merge_pdfs([("a", os.path.join(self.folder, "missing.pdf"))], merged)
+        self.assertFalse(os.path.exists(merged))
+        with self.assertRaises(MergeError):
+            merge_pdfs([("b", self._write("bad.pdf", b"garbage"))], merged, skip_unreadable=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for the pre-flight input check."""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from core.services.preflight import APP_EXCEL, APP_WORD, CONTAINER_TEXT, Preflight
+from utils.exceptions import FileLockedError, UnrecognizedFormatError
+
+
+class PreflightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_markup_is_left_to_the_application(self):
+        """HTML and XML saved with an Office extension are opened by that extension's application."""
+        spreadsheet_ml = self._write(
+            "report.xls",
+            b'<?xml version="1.0"?>\r\n<?mso-application progid="Excel.Sheet"?>\r\n<Workbook/>'
+        )
+        html_table = self._write("export.xls", b"<html><body><table><tr><td>1</td></tr></table></body></html>")
+        word_xml = self._write("letter.doc", "\ufeff<?xml version=\"1.0\"?><w:wordDocument/>".encode("utf-8"))
+        for path, application in ((spreadsheet_ml, APP_EXCEL), (html_table, APP_EXCEL), (word_xml, APP_WORD)):
+            report = Preflight().check(path)
+            self.assertEqual(report.container, CONTAINER_TEXT)
+            self.assertEqual(report.application, application)
+            self.assertTrue(report.matches(os.path.splitext(path)[1]))
+
+    def test_binary_content_is_rejected(self):
+        for name, data in (("scan.docx", b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"), ("tool.xls", b"MZ\x90\x00\x03\x00\x00\x00")):
+            with self.assertRaises(UnrecognizedFormatError):
+                Preflight().check(self._write(name, data))
+
+    def test_read_only_file_with_stale_owner_file_is_not_locked(self):
+        path = self._write("budget.xls", b"<table></table>")
+        self._write("~$budget.xls", b"\x05alice")
+        real_open = open
+
+        def deny_write(file, mode="r", *args, **kwargs):
+            if "+" in mode:
+                raise PermissionError(13, "Permission denied")
+            return real_open(file, mode, *args, **kwargs)
+
+        with mock.patch("builtins.open", deny_write):
+            with mock.patch("os.access", return_value=False):
+                self.assertEqual(Preflight().check(path).application, APP_EXCEL)
+            with mock.patch("os.access", return_value=True):
+                with self.assertRaisesRegex(FileLockedError, "alice"):
+                    Preflight().check(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
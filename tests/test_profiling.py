@@ -0,0 +1,113 @@
+"""Tests for per-job profiling."""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from core.models.conversion_job import ConversionJob, ConversionResult
+from core.services.profiling import ComCallCounter, JobProfiler, _CountingProxy
+
+
+class _Ranges:
+    def Add(self, start, end):
+        return _Range(start, end)
+
+
+class _Range:
+    def __init__(self, start, end):
+        self.start, self.end = start, end
+
+
+class _Presentation:
+    def __init__(self):
+        self.Ranges = _Ranges()
+        self._oleobj_ = object()
+        self.exported_with = None
+
+    def ExportAsFixedFormat(self, path, PrintRange=None):
+        self.exported_with = PrintRange
+
+
+class JobProfilerTest(unittest.TestCase):
+
+    def test_parallel_profiled_jobs(self):
+        """Overlapping profiled jobs both succeed; one of them runs without cProfile."""
+        with tempfile.TemporaryDirectory() as folder:
+            profiler = JobProfiler(output_dir=folder)
+            both_running = threading.Barrier(2, timeout=10)
+            results, errors = {}, []
+
+            def convert():
+                both_running.wait()
+                sum(range(10000))
+                return ConversionResult.success_result(os.path.join(folder, "out.pdf"))
+
+            def run(name):
+                job = ConversionJob(os.path.join(folder, name + ".docx"), os.path.join(folder, name + ".pdf"), job_id=name)
+                try:
+                    results[name] = profiler.run(job, "FakeAdapter", convert)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=run, args=(name,)) for name in ("first", "second")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertTrue(all(result.success for result in results.values()))
+            summaries = []
+            for name in ("first", "second"):
+                with open(os.path.join(folder, name + ".json"), encoding="utf-8") as f:
+                    summaries.append(json.load(f))
+            self.assertTrue(all(summary["wall_seconds"] > 0 for summary in summaries))
+            self.assertEqual(sorted(summary["cprofile"] is None for summary in summaries), [False, True])
+
+            # cProfile is free again once both jobs are done
+            job = ConversionJob(os.path.join(folder, "third.docx"), os.path.join(folder, "third.pdf"), job_id="third")
+            profiler.run(job, "FakeAdapter", lambda: ConversionResult.success_result(job.output_path))
+            self.assertTrue(os.path.exists(os.path.join(folder, "third.prof")))
+
+    def test_tracing_started_elsewhere_is_left_running(self):
+        """A profiled job does not turn off tracing it did not turn on (e.g. -X tracemalloc)."""
+        import tracemalloc
+        was_tracing = tracemalloc.is_tracing()
+        tracemalloc.start()
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                job = ConversionJob(os.path.join(folder, "a.docx"), os.path.join(folder, "a.pdf"), job_id="a")
+                JobProfiler(output_dir=folder).run(
+                    job, "FakeAdapter", lambda: ConversionResult.success_result(job.output_path)
+                )
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+
+class CountingProxyTest(unittest.TestCase):
+
+    def test_proxies_are_unwrapped_before_com_calls(self):
+        counter = ComCallCounter()
+        target = _Presentation()
+        presentation = _CountingProxy(target, counter)
+        print_range = presentation.Ranges.Add(1, 5)
+        self.assertIsInstance(print_range, _CountingProxy)
+
+        presentation.ExportAsFixedFormat("out.pdf", PrintRange=print_range)
+
+        self.assertIsInstance(target.exported_with, _Range)
+        self.assertEqual(counter.members["call ExportAsFixedFormat"], 1)
+
+    def test_oleobj_and_dunders_are_not_wrapped(self):
+        counter = ComCallCounter()
+        target = _Presentation()
+        presentation = _CountingProxy(target, counter)
+        self.assertIs(presentation._oleobj_, target._oleobj_)
+        self.assertIs(presentation.__dict__, target.__dict__)
+        self.assertEqual(counter.gets, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
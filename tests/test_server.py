@@ -0,0 +1,130 @@
+"""Tests for the local HTTP conversion service."""
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from urllib.parse import quote
+from benchmarks.simcom import minimal_pdf
+from app.server import ConversionServer
+from core.interfaces.converter import IConverter
+from core.models.conversion_job import ConversionResult
+from core.services.conversion_service import ConversionService
+
+
+class _StandInConverter(IConverter):
+    """Writes a fixed one-page PDF for every .docx input."""
+
+    def supported_extensions(self):
+        return [".docx"]
+
+    def convert(self, job):
+        with open(job.output_path, "wb") as f:
+            f.write(minimal_pdf(1))
+        return ConversionResult.success_result(job.output_path)
+
+
+class ConversionServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        self.allowed = os.path.join(self.folder, "allowed")
+        os.makedirs(self.allowed)
+        service = ConversionService()
+        service.register_converter(_StandInConverter())
+        self.server = ConversionServer(
+            service,
+            data_dir=os.path.join(self.folder, "data"),
+            port=0,
+            allowed_roots=[self.allowed]
+        )
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def _request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection(*self.server.address, timeout=10)
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+    def _wait(self, job_id):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            _, _, body = self._request("GET", f"/jobs/{job_id}")
+            job = json.loads(body)
+            if job["state"] in ("succeeded", "failed"):
+                return job
+            time.sleep(0.02)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_upload_is_converted_and_downloaded(self):
+        status, _, body = self._request(
+            "POST", "/jobs?filename=" + quote("report.docx"), body=b"PK\x03\x04 document",
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        self.assertEqual(status, 202)
+        job = self._wait(json.loads(body)["id"])
+        self.assertEqual(job["state"], "succeeded")
+
+        status, headers, pdf = self._request("GET", job["result_url"])
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/pdf")
+        self.assertEqual(pdf, minimal_pdf(1))
+
+    def test_unsupported_upload_is_rejected(self):
+        status, _, body = self._request("POST", "/jobs?filename=notes.txt", body=b"text")
+        self.assertEqual(status, 415)
+        self.assertIn("Unsupported", json.loads(body)["error"])
+
+    def test_path_jobs_are_limited_to_allowed_roots(self):
+        inside = os.path.join(self.allowed, "inside.docx")
+        outside = os.path.join(self.folder, "outside.docx")
+        for path in (inside, outside):
+            with open(path, "wb") as f:
+                f.write(b"PK\x03\x04")
+        headers = {"Content-Type": "application/json"}
+
+        status, _, _ = self._request("POST", "/jobs", json.dumps({"path": outside}), headers)
+        self.assertEqual(status, 403)
+        status, _, body = self._request("POST", "/jobs", json.dumps({"path": inside}), headers)
+        self.assertEqual(status, 202)
+        self.assertEqual(self._wait(json.loads(body)["id"])["state"], "succeeded")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symbolic links")
+    def test_links_out_of_allowed_roots_are_refused(self):
+        outside = os.path.join(self.folder, "outside")
+        os.makedirs(outside)
+        with open(os.path.join(outside, "secret.docx"), "wb") as f:
+            f.write(b"PK\x03\x04")
+        try:
+            os.symlink(outside, os.path.join(self.allowed, "link"), target_is_directory=True)
+        except OSError as e:
+            self.skipTest(f"cannot create symbolic links: {e}")
+
+        status, _, _ = self._request(
+            "POST", "/jobs", json.dumps({"path": os.path.join(self.allowed, "link", "secret.docx")}),
+            {"Content-Type": "application/json"}
+        )
+        self.assertEqual(status, 403)
+
+    def test_download_name_is_escaped(self):
+        filename = 'q"uote\u00e9.docx'
+        status, _, body = self._request("POST", "/jobs?filename=" + quote(filename), body=b"PK\x03\x04")
+        self.assertEqual(status, 202)
+        job = self._wait(json.loads(body)["id"])
+
+        _, headers, _ = self._request("GET", job["result_url"])
+        self.assertEqual(
+            headers["Content-Disposition"],
+            "attachment; filename=\"q_uote_.pdf\"; filename*=UTF-8''q%22uote%C3%A9.pdf"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Tests for slide-range shard planning."""
+import os
+import tempfile
+import unittest
+from core.services.slide_shards import SlideCostModel
+
+
+class SlideCostModelTest(unittest.TestCase):
+
+    def test_estimate_is_kept_across_processes(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "logs", "slide_costs.json")
+            first_run = SlideCostModel(path=path)
+            self.assertFalse(first_run.measured)
+            first_run.observe(100, 50.0)
+
+            next_run = SlideCostModel(path=path)
+            self.assertTrue(next_run.measured)
+            self.assertAlmostEqual(next_run.seconds_per_slide, 0.5)
+
+    def test_invalid_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "slide_costs.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"seconds_per_slide": -1}')
+            model = SlideCostModel(path=path)
+            self.assertFalse(model.measured)
+            model.observe(10, 2.0)
+            self.assertAlmostEqual(SlideCostModel(path=path).seconds_per_slide, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
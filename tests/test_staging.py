@@ -0,0 +1,84 @@
+"""Tests for local scratch staging."""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from core.models.conversion_job import ConversionJob, ConversionResult
+from core.services.staging import StagingArea
+
+
+class StagingAreaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def _jobs(self, sizes):
+        jobs = []
+        for index, size in enumerate(sizes):
+            path = os.path.join(self.folder, f"doc{index}.docx")
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+            jobs.append(ConversionJob(path, os.path.join(self.folder, "out", f"doc{index}.pdf")))
+        return jobs
+
+    def test_room_is_reserved_in_prefetch_order(self):
+        """A later prefetch cannot take the room the job being converted needs."""
+        jobs = self._jobs([5, 6, 5])
+        staging = StagingArea(os.path.join(self.folder, "scratch"), max_scratch_bytes=10)
+        converted = []
+
+        def convert(job):
+            with open(job.output_path, "wb") as f:
+                f.write(b"%PDF")
+            return ConversionResult.success_result(job.output_path)
+
+        def run():
+            for job in jobs:
+                staging.prefetch(job)
+            # Let the copy threads reserve what they can before the first conversion
+            time.sleep(0.2)
+            for job in jobs:
+                done = threading.Event()
+                staging.upload(job, staging.convert(job, convert), lambda result: done.set())
+                done.wait()
+                converted.append(job)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        stuck, finished = thread.is_alive(), len(converted)
+        staging.close()  # also releases copy threads of a hung run
+        self.assertFalse(stuck, f"staging hung after {finished} of {len(jobs)} jobs")
+        self.assertTrue(all(os.path.exists(job.output_path) for job in jobs))
+
+    def test_screened_out_input_is_not_staged(self):
+        """A job rejected by the screen returns its result without a copy or a conversion."""
+        jobs = self._jobs([5, 5])
+        rejection = ConversionResult.failure_result(error=ValueError("locked"), message="locked")
+        copies = []
+
+        def screen(job):
+            return rejection if job is jobs[0] else None
+
+        def convert(job):
+            copies.append(job.input_path)
+            with open(job.output_path, "wb") as f:
+                f.write(b"%PDF")
+            return ConversionResult.success_result(job.output_path)
+
+        with StagingArea(os.path.join(self.folder, "scratch"), screen=screen) as staging:
+            for job in jobs:
+                staging.prefetch(job)
+            self.assertIs(staging.convert(jobs[0], convert), rejection)
+            result = staging.convert(jobs[1], convert)
+            self.assertTrue(result.success)
+            self.assertEqual(staging.used_bytes, os.path.getsize(result.output_path))
+        self.assertEqual(len(copies), 1)
+        self.assertNotEqual(copies[0], jobs[1].input_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+"""
+Virtualized file list for very large folders.
+
+The Treeview only ever holds as many rows as fit on screen; scrolling
+rewrites the values of those rows from an in-memory model instead of
+inserting one Treeview item per file.
+"""
+import heapq
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Iterable, List, Optional, Set
+from core.models.file_entry import FileEntry
+
+
+def format_size(size_bytes: int) -> str:
+    """
+    Format a byte count for display.
+
+    Args:
+        size_bytes: Size in bytes (negative = unknown)
+
+    Returns:
+        Human-readable size string
+    """
+    if size_bytes < 0:
+        return "N/A"
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+class FileListModel:
+    """
+    In-memory model of scanned files with incremental type filtering.
+
+    Entries are kept in scan order and indexed per extension, so changing
+    the selected types merges or drops whole extension buckets instead of
+    re-examining every file.
+    """
+
+    def __init__(self, selected_types: Iterable[str] = ()):
+        """
+        Initialize an empty model.
+
+        Args:
+            selected_types: Extensions that are initially visible
+        """
+        self._entries: List[FileEntry] = []
+        self._by_ext: Dict[str, List[int]] = {}
+        self._selected: Set[str] = set(selected_types)
+        self._visible: List[int] = []
+
+    def __len__(self) -> int:
+        """Number of entries passing the current filter."""
+        return len(self._visible)
+
+    def __getitem__(self, index: int) -> FileEntry:
+        """Get the visible entry at `index`."""
+        return self._entries[self._visible[index]]
+
+    @property
+    def total_count(self) -> int:
+        """Number of entries regardless of the filter."""
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries = []
+        self._by_ext = {}
+        self._visible = []
+
+    def set_entries(self, entries: Iterable[FileEntry]):
+        """
+        Replace the model contents.
+
+        Args:
+            entries: Scanned file entries in display order
+        """
+        self.clear()
+        self.append_entries(entries)
+
+    def append_entries(self, entries: Iterable[FileEntry]):
+        """
+        Append entries after the existing ones (used while a scan is streaming in).
+
+        Args:
+            entries: Newly scanned file entries
+        """
+        for entry in entries:
+            index = len(self._entries)
+            self._entries.append(entry)
+            self._by_ext.setdefault(entry.ext, []).append(index)
+            if entry.ext in self._selected:
+                self._visible.append(index)
+
+    def set_selected_types(self, selected_types: Iterable[str]) -> bool:
+        """
+        Update the visible extensions incrementally.
+
+        Args:
+            selected_types: Extensions that should be visible
+
+        Returns:
+            True if the visible rows changed
+        """
+        new_selected = set(selected_types)
+        added = new_selected - self._selected
+        removed = self._selected - new_selected
+        self._selected = new_selected
+
+        added_buckets = [self._by_ext[ext] for ext in added if ext in self._by_ext]
+        removed_any = any(ext in self._by_ext for ext in removed)
+
+        if removed_any:
+            # Rebuild from the remaining buckets only; files are never re-examined
+            buckets = [self._by_ext[ext] for ext in new_selected if ext in self._by_ext]
+            self._visible = list(heapq.merge(*buckets))
+        elif added_buckets:
+            self._visible = list(heapq.merge(self._visible, *added_buckets))
+        else:
+            return False
+        return True
+
+    def visible_entries(self) -> List[FileEntry]:
+        """Get all entries passing the current filter, in scan order."""
+        entries = self._entries
+        return [entries[i] for i in self._visible]
+
+    def visible_paths(self) -> List[str]:
+        """Get the paths of all entries passing the current filter."""
+        entries = self._entries
+        return [entries[i].path for i in self._visible]
+
+
+class VirtualFileList(tk.Frame):
+    """
+    A Treeview-based list that renders only the visible window of a FileListModel.
+    """
+
+    COLUMNS = ("Filename", "Type", "Size")
+    DEFAULT_ROW_HEIGHT = 20
+    HEADER_HEIGHT = 25
+
+    def __init__(self, parent, model: FileListModel, type_names: Optional[Dict[str, str]] = None, height: int = 8):
+        """
+        Create the list widget.
+
+        Args:
+            parent: Parent Tk widget
+            model: Model providing the rows
+            type_names: Mapping of extension to display type name (e.g. '.docx' -> 'Word')
+            height: Initial number of visible rows
+        """
+        super().__init__(parent)
+        self.model = model
+        self.type_names = type_names or {}
+        self._offset = 0
+        self._rows: List[str] = []
+
+        self._scrollbar = ttk.Scrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=self.COLUMNS,
+            show="headings",
+            height=height,
+            selectmode="none"
+        )
+
+        # Column headers
+        self.tree.heading("Filename", text="Filename")
+        self.tree.heading("Type", text="Type")
+        self.tree.heading("Size", text="Size")
+
+        # Column widths
+        self.tree.column("Filename", width=350)
+        self.tree.column("Type", width=100)
+        self.tree.column("Size", width=80)
+
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        self._row_height = int(row_height) if row_height else self.DEFAULT_ROW_HEIGHT
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+
+        self._set_row_count(height)
+        self.refresh()
+
+    @property
+    def visible_rows(self) -> int:
+        """Number of rows currently rendered."""
+        return len(self._rows)
+
+    def refresh(self):
+        """Re-render the visible window from the model."""
+        total = len(self.model)
+        max_offset = max(0, total - len(self._rows))
+        self._offset = min(self._offset, max_offset)
+
+        for i, iid in enumerate(self._rows):
+            index = self._offset + i
+            if index < total:
+                entry = self.model[index]
+                values = (entry.name, self.type_names.get(entry.ext, entry.ext.upper()), format_size(entry.size))
+            else:
+                values = ("", "", "")
+            self.tree.item(iid, values=values)
+
+        if total:
+            first = self._offset / total
+            last = min(1.0, (self._offset + len(self._rows)) / total)
+        else:
+            first, last = 0.0, 1.0
+        self._scrollbar.set(first, last)
+
+    def scroll_to(self, offset: int):
+        """
+        Scroll so that the row at `offset` is the first visible row.
+
+        Args:
+            offset: Index into the filtered model
+        """
+        max_offset = max(0, len(self.model) - len(self._rows))
+        offset = max(0, min(int(offset), max_offset))
+        if offset != self._offset:
+            self._offset = offset
+            self.refresh()
+
+    def _scroll_by(self, rows: int):
+        """Scroll by a number of rows (negative = up)."""
+        self.scroll_to(self._offset + rows)
+        return "break"
+
+    def _set_row_count(self, count: int):
+        """Create or delete Treeview items so exactly `count` rows exist."""
+        count = max(1, count)
+        while len(self._rows) < count:
+            self._rows.append(self.tree.insert("", "end", values=("", "", "")))
+        while len(self._rows) > count:
+            self.tree.delete(self._rows.pop())
+
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar drag ('moveto') and arrow/page clicks ('scroll')."""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.model))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, len(self._rows) - 1)
+            self._scroll_by(step)
+
+    def _on_mousewheel(self, event):
+        """Handle mouse wheel scrolling (Windows/macOS)."""
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        """Adjust the number of rendered rows to the widget height."""
+        rows = max(1, (event.height - self.HEADER_HEIGHT) // self._row_height)
+        if rows != len(self._rows):
+            self._set_row_count(rows)
+            self.refresh()
@@ -0,0 +1,124 @@
+"""
+Background folder scanning for the desktop UI.
+
+Scanning a large (network) folder can take a long time, so it runs in an
+executor thread. Discovered files are buffered and handed to the Tk main
+thread in batches by a single coalesced `after` callback.
+"""
+import threading
+from concurrent.futures import Executor
+from typing import Callable, List
+from core.models.file_entry import FileEntry
+from core.services.file_scanner import FileScanner
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class BackgroundFolderScan:
+    """
+    A cancellable folder scan whose results stream into the UI.
+
+    Callbacks are always invoked on the Tk main thread. Once cancelled,
+    a scan never invokes its callbacks again, so starting a new scan
+    cannot be polluted by batches from the previous one.
+    """
+
+    def __init__(
+        self,
+        root,
+        executor: Executor,
+        scanner: FileScanner,
+        on_batch: Callable[[List[FileEntry], int], None],
+        on_done: Callable[[int, bool], None],
+        flush_interval_ms: int = 100
+    ):
+        """
+        Initialize the scan (call `start` to begin).
+
+        Args:
+            root: Tk root used to schedule callbacks on the main thread
+            executor: Executor that runs the scan
+            scanner: FileScanner to use
+            on_batch: Called with (new entries, total found so far)
+            on_done: Called with (total found, failed) when the scan finishes
+            flush_interval_ms: Minimum delay between batch deliveries
+        """
+        self.root = root
+        self.executor = executor
+        self.scanner = scanner
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.flush_interval_ms = flush_interval_ms
+
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: List[FileEntry] = []
+        self._found = 0
+        self._finished = False
+        self._failed = False
+        self._flush_scheduled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the scan has been cancelled."""
+        return self._cancel_event.is_set()
+
+    def start(self, folder_path: str):
+        """
+        Start scanning in the executor.
+
+        Args:
+            folder_path: Folder to scan
+        """
+        logger.info(f"Scanning folder in background: {folder_path}")
+        self.executor.submit(self._run, folder_path)
+
+    def cancel(self):
+        """Cancel the scan; no further callbacks will be delivered."""
+        if not self._cancel_event.is_set():
+            self._cancel_event.set()
+            logger.info("Folder scan cancelled")
+
+    def _run(self, folder_path: str):
+        """Scan loop (runs in the executor thread)."""
+        try:
+            for entry in self.scanner.iter_entries(folder_path, cancel_event=self._cancel_event):
+                with self._lock:
+                    self._pending.append(entry)
+                    self._found += 1
+                self._schedule_flush()
+        except Exception as e:
+            logger.error(f"Error scanning folder {folder_path}: {e}")
+            self._failed = True
+
+        with self._lock:
+            self._finished = True
+            found = self._found
+        if not self.cancelled:
+            logger.info(f"Found {found} convertible file(s) in {folder_path}")
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Schedule one flush on the main thread unless one is already pending."""
+        with self._lock:
+            if self._flush_scheduled or self.cancelled:
+                return
+            self._flush_scheduled = True
+        self.root.after(self.flush_interval_ms, self._flush)
+
+    def _flush(self):
+        """Deliver buffered entries to the UI (runs on the Tk main thread)."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            found = self._found
+            finished = self._finished
+            self._flush_scheduled = False
+
+        if self.cancelled:
+            return
+
+        if batch:
+            self.on_batch(batch, found)
+        if finished:
+            self.on_done(found, self._failed)
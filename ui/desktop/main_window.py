@@ -3,12 +3,19 @@ Desktop GUI for PdfConverter v2.1.
 """
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from typing import List, Set, Dict
+from itertools import islice
+from typing import Set
 import os
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from core.services.conversion_service import ConversionService
 from core.services.file_scanner import FileScanner
-from core.models.conversion_job import ConversionJob, ConversionResult
+from core.services.output_layout import OutputPlanner
+from core.services.pdf_merger import merge_pdfs
+from core.services.progress import ProgressBus, ProgressSnapshot, LoggingProgressSubscriber, format_duration
+from core.services.result_table import JobTable, ResultTable
+from ui.desktop.file_list import FileListModel, VirtualFileList
+from ui.desktop.folder_scan import BackgroundFolderScan
 from utils.threading import ConversionWorker
 from utils.path_utils import create_output_folder, open_folder_in_explorer
 from utils.logging import get_logger
@@ -36,14 +43,24 @@ class MainWindow:
         """
         self.service = conversion_service
         self.worker = ConversionWorker()
+        self.scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FolderScan")
+        self.current_scan: BackgroundFolderScan = None
+        
+        # Progress updates are throttled by the bus and coalesced onto the Tk thread
+        self.progress_bus = ProgressBus(max_rate_hz=10)
+        self.progress_bus.subscribe(self._on_progress)
+        self.progress_bus.subscribe(LoggingProgressSubscriber())
+        self._latest_progress: ProgressSnapshot = None
+        self._progress_update_pending = False
+        self._progress_lock = threading.Lock()
         
         # State
         self.selected_folder = ""
         self.selected_types: Set[str] = set(self.service.get_supported_extensions())
-        self.scanned_files: List[str] = []
-        self.filtered_files: List[str] = []
-        self.jobs: List[ConversionJob] = []
+        self.file_model = FileListModel(self.selected_types)
+        self.jobs = JobTable()
         self.output_folder_path = ""
+        self.merge_message = ""
         
         # Create main window
         self.root = tk.Tk()
@@ -94,6 +111,15 @@ class MainWindow:
         )
         select_btn.pack(side=tk.RIGHT, padx=5)
         
+        self.cancel_scan_btn = tk.Button(
+            folder_frame,
+            text="Cancel Scan",
+            command=self._cancel_scan,
+            state=tk.DISABLED,
+            width=12
+        )
+        self.cancel_scan_btn.pack(side=tk.RIGHT, padx=5)
+        
         # File List Frame
         self._create_file_list()
         
@@ -175,34 +201,19 @@ class MainWindow:
             cb.grid(row=i // 2, column=i % 2, sticky="w", padx=10, pady=3)
         
     def _create_file_list(self):
-        """Create file list Treeview."""
+        """Create the virtualized file list."""
         list_frame = tk.LabelFrame(self.root, text="Files to Convert", font=("Arial", 10, "bold"))
         list_frame.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
         
-        # Treeview with scrollbar
-        tree_scroll = ttk.Scrollbar(list_frame)
-        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        # Map extensions to display type names (e.g. '.docx' -> 'Word')
+        type_names = {
+            ext: type_name
+            for type_name, (var, extensions) in self.type_vars.items()
+            for ext in extensions
+        }
         
-        self.file_tree = ttk.Treeview(
-            list_frame,
-            columns=("Filename", "Type", "Size"),
-            show="headings",
-            yscrollcommand=tree_scroll.set,
-            height=8
-        )
-        tree_scroll.config(command=self.file_tree.yview)
-        
-        # Column headers
-        self.file_tree.heading("Filename", text="Filename")
-        self.file_tree.heading("Type", text="Type")
-        self.file_tree.heading("Size", text="Size")
-        
-        # Column widths
-        self.file_tree.column("Filename", width=350)
-        self.file_tree.column("Type", width=100)
-        self.file_tree.column("Size", width=80)
-        
-        self.file_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.file_list = VirtualFileList(list_frame, self.file_model, type_names=type_names, height=8)
+        self.file_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
     def _create_output_folder_panel(self):
         """Create output folder configuration panel."""
@@ -220,6 +231,15 @@ class MainWindow:
         )
         self.output_folder_label.pack(side=tk.LEFT, padx=10)
         
+        self.merge_var = tk.BooleanVar(value=False)
+        merge_cb = tk.Checkbutton(
+            panel,
+            text="Also merge into one PDF",
+            variable=self.merge_var,
+            font=("Arial", 9)
+        )
+        merge_cb.pack(side=tk.RIGHT)
+        
     def _on_type_selection_change(self):
         """Handle file type checkbox changes."""
         # Update selected types
@@ -237,68 +257,77 @@ class MainWindow:
         folder = filedialog.askdirectory()
         if not folder:
             return
+        
+        # A new selection supersedes any scan still running
+        self._cancel_scan()
             
         self.selected_folder = folder
         self.path_label.config(text=f"Selected: {folder}", fg="black")
         
-        # Scan for all files
+        # Reset the list; results stream in from the background scan
+        self.file_model.clear()
+        self.file_list.scroll_to(0)
+        self._filter_and_display_files()
+        
         scanner = FileScanner(set(self.service.get_supported_extensions()))
-        self.scanned_files = scanner.scan_folder(folder)
+        self.current_scan = BackgroundFolderScan(
+            self.root,
+            self.scan_executor,
+            scanner,
+            on_batch=self._on_scan_batch,
+            on_done=self._on_scan_done
+        )
+        self.cancel_scan_btn.config(state=tk.NORMAL)
+        self.status_label.config(text="Scanning... found 0 files", fg="orange")
+        self.current_scan.start(folder)
         
-        # Filter and display
+    def _cancel_scan(self):
+        """Cancel the running folder scan, keeping the files found so far."""
+        if self.current_scan is None:
+            return
+        self.current_scan.cancel()
+        self.current_scan = None
+        self.cancel_scan_btn.config(state=tk.DISABLED)
+        self.status_label.config(
+            text=f"Scan cancelled - found {self.file_model.total_count} files",
+            fg="orange"
+        )
         self._filter_and_display_files()
         
-    def _filter_and_display_files(self):
-        """Filter scanned files based on selected types and update display."""
-        # Filter files
-        self.filtered_files = [
-            f for f in self.scanned_files
-            if Path(f).suffix.lower() in self.selected_types
-        ]
-        
-        # Clear tree
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
+    def _on_scan_batch(self, entries, found: int):
+        """Append a batch of scanned files (runs on the main thread)."""
+        self.file_model.append_entries(entries)
+        self.file_list.refresh()
+        self.status_label.config(text=f"Scanning... found {found} files", fg="orange")
+        
+    def _on_scan_done(self, found: int, failed: bool):
+        """Handle scan completion (runs on the main thread)."""
+        self.current_scan = None
+        self.cancel_scan_btn.config(state=tk.DISABLED)
+        if failed:
+            self.status_label.config(text=f"Scan failed - found {found} files", fg="red")
+        else:
+            self.status_label.config(text=f"Found {found} files", fg="green")
+        self._filter_and_display_files()
         
-        # Populate tree
-        for file_path in self.filtered_files:
-            path_obj = Path(file_path)
-            filename = path_obj.name
-            ext = path_obj.suffix.lower()
-            
-            # Determine type name
-            type_name = ext.upper()
-            for name, (var, extensions) in self.type_vars.items():
-                if ext in extensions:
-                    type_name = name
-                    break
-            
-            # Get file size
-            try:
-                size_bytes = path_obj.stat().st_size
-                if size_bytes < 1024:
-                    size_str = f"{size_bytes} B"
-                elif size_bytes < 1024 * 1024:
-                    size_str = f"{size_bytes / 1024:.1f} KB"
-                else:
-                    size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
-            except:
-                size_str = "N/A"
-            
-            self.file_tree.insert("", "end", values=(filename, type_name, size_str))
+    def _filter_and_display_files(self):
+        """Apply the selected types to the file model and update display."""
+        self.file_model.set_selected_types(self.selected_types)
+        self.file_list.refresh()
         
-        # Update UI state
-        count = len(self.filtered_files)
-        if count > 0:
+        # Update UI state (conversion waits until the scan has finished)
+        count = len(self.file_model)
+        if count > 0 and self.current_scan is None:
             self.convert_btn.config(state=tk.NORMAL)
         else:
             self.convert_btn.config(state=tk.DISABLED)
         
-        logger.info(f"Filtered {count} files from {len(self.scanned_files)} total")
+        logger.info(f"Filtered {count} files from {self.file_model.total_count} total")
         
     def _start_conversion(self):
         """Start the conversion process in background thread."""
-        if not self.filtered_files:
+        filtered_files = self.file_model.visible_paths()
+        if not filtered_files:
             return
         
         # Create output folder
@@ -318,10 +347,9 @@ class MainWindow:
         
         # Create jobs
         try:
-            self.jobs = [
-                self.service.create_job(f, output_folder=self.output_folder_path)
-                for f in self.filtered_files
-            ]
+            planner = OutputPlanner(self.output_folder_path)
+            self.jobs = JobTable(self.selected_folder)
+            self.jobs.extend(planner.iter_jobs(self.service, filtered_files))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create conversion jobs: {e}")
             return
@@ -332,17 +360,21 @@ class MainWindow:
         self.progress['value'] = 0
         self.status_label.config(text="Converting...", fg="orange")
         
+        # Read Tk state here; the task below runs on the worker thread
+        merge_path = None
+        if self.merge_var.get():
+            folder_name = os.path.basename(os.path.normpath(self.selected_folder)) or "Combined"
+            merge_path = os.path.join(self.output_folder_path, f"{folder_name}_merged.pdf")
+        self.merge_message = ""
+        
         # Submit conversion task to worker
         def conversion_task():
             """Task that runs in worker thread."""
-            results = []
-            for i, job in enumerate(self.jobs):
-                result = self.service.convert(job)
-                results.append(result)
-                
-                # Update progress (thread-safe UI update)
-                self.root.after(0, lambda v=i+1: self._update_progress(v))
-                
+            results = self.service.convert_batch(
+                self.jobs, progress=self.progress_bus, results=ResultTable(self.jobs)
+            )
+            if merge_path:
+                self.merge_message = self._merge_results(results, merge_path)
             return results
             
         def on_complete(results):
@@ -351,26 +383,71 @@ class MainWindow:
             
         self.worker.submit(conversion_task, on_complete)
         
-    def _update_progress(self, value: int):
-        """Update progress bar (must be called from main thread)."""
-        self.progress['value'] = value
-        self.status_label.config(text=f"Converting... ({value}/{len(self.jobs)})")
+    def _on_progress(self, snapshot: ProgressSnapshot):
+        """Receive a progress snapshot (worker thread) and schedule one UI update."""
+        with self._progress_lock:
+            self._latest_progress = snapshot
+            if self._progress_update_pending:
+                return
+            self._progress_update_pending = True
+        self.root.after(0, self._update_progress)
+        
+    def _update_progress(self):
+        """Update progress bar from the latest snapshot (must be called from main thread)."""
+        with self._progress_lock:
+            snapshot = self._latest_progress
+            self._progress_update_pending = False
+        if snapshot is None or snapshot.finished:
+            return
+        
+        self.progress['maximum'] = max(1, snapshot.total)
+        self.progress['value'] = snapshot.completed
+        current = os.path.basename(snapshot.current_file)
+        self.status_label.config(
+            text=(
+                f"Converting... ({snapshot.completed}/{snapshot.total}) "
+                f"{snapshot.files_per_second:.1f} files/s, "
+                f"ETA {format_duration(snapshot.eta_seconds)} - {current}"
+            )
+        )
         
-    def _on_conversion_complete(self, results: List[ConversionResult]):
+    def _merge_results(self, results: ResultTable, merge_path: str) -> str:
+        """Merge successful outputs in batch order (runs on the worker thread)."""
+        sources = [
+            (self.jobs.input_path(index), result.output_path)
+            for index, result in enumerate(results)
+            if result.success and result.output_path
+        ]
+        if not sources:
+            return ""
+        try:
+            pages, skipped = merge_pdfs(sources, merge_path)
+        except Exception as e:
+            logger.error(f"Merge failed: {e}")
+            return f"Merge failed: {e}"
+        message = f"Merged PDF: {os.path.basename(merge_path)} ({pages} pages)"
+        if skipped:
+            message += f", {len(skipped)} file(s) skipped"
+        return message
+        
+    def _on_conversion_complete(self, results: ResultTable):
         """Handle conversion completion."""
         if isinstance(results, Exception):
             messagebox.showerror("Error", f"Conversion failed: {results}")
             self.status_label.config(text="Conversion failed", fg="red")
         else:
-            success_count = sum(1 for r in results if r.success)
-            failed_count = len(results) - success_count
+            success_count = results.succeeded
+            failed_count = results.failed
             
             message = f"Conversion complete!\n\nSuccessful: {success_count}\nFailed: {failed_count}"
             
             if failed_count > 0:
                 # Show details of failures
-                failures = [r.message for r in results if not r.success]
-                message += "\n\nErrors:\n" + "\n".join(failures[:5])
+                failures = [r.message for _, r in islice(results.failures(), 5)]
+                message += "\n\nErrors:\n" + "\n".join(failures)
+            
+            if self.merge_message:
+                message += f"\n\n{self.merge_message}"
                 
             messagebox.showinfo("Complete", message)
             self.status_label.config(
@@ -395,6 +472,9 @@ class MainWindow:
     def _on_close(self):
         """Handle window close event."""
         logger.info("Shutting down application")
+        if self.current_scan is not None:
+            self.current_scan.cancel()
+        self.scan_executor.shutdown(wait=False)
         self.worker.stop()
         self.root.destroy()
         
@@ -13,6 +13,11 @@ class ConversionError(PdfConverterException):
     pass
 
 
+class OutputVerificationError(ConversionError):
+    """Raised when a converter reports success but the PDF it wrote is incomplete."""
+    pass
+
+
 class UnsupportedFileTypeError(PdfConverterException):
     """Raised when attempting to convert an unsupported file type."""
     pass
@@ -26,3 +31,48 @@ class OfficeApplicationError(PdfConverterException):
 class ValidationError(PdfConverterException):
     """Raised when job validation fails."""
     pass
+
+
+class PreflightError(ValidationError):
+    """
+    Raised when an input is rejected before Office is started.
+
+    Attributes:
+        code: Short machine-readable reason, distinct for every subclass
+    """
+    code = "preflight"
+
+
+class EmptyFileError(PreflightError):
+    """Raised when an input file is zero bytes long."""
+    code = "empty"
+
+
+class CorruptFileError(PreflightError):
+    """Raised when an input file is truncated or its container structure is damaged."""
+    code = "corrupt"
+
+
+class EncryptedFileError(PreflightError):
+    """Raised when an input file is password-protected (Office would prompt for the password)."""
+    code = "encrypted"
+
+
+class FileLockedError(PreflightError):
+    """Raised when an input file is locked by another user or process."""
+    code = "locked"
+
+
+class OfficeLockFileError(PreflightError):
+    """Raised for Office owner files ("~$name"), which are not documents."""
+    code = "lock_file"
+
+
+class UnrecognizedFormatError(PreflightError):
+    """Raised when the content of an input file is not an Office document."""
+    code = "unrecognized_format"
+
+
+class UnreadableFileError(PreflightError):
+    """Raised when an input file cannot be read."""
+    code = "unreadable"
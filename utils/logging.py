@@ -1,57 +1,214 @@
 """
 Logging configuration for the PdfConverter application.
+
+Log calls only put records on an in-memory queue; a single listener
+thread does the console and file I/O, so a slow console or a log file on
+a network share never stalls a conversion. Records carry the job id,
+converter and stage of the conversion that emitted them (see log_context).
 """
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List, Optional
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+LOG_FORMATS = (LOG_FORMAT_TEXT, LOG_FORMAT_JSON)
+
+# Conversion context attached to every record emitted while it is set
+job_id_var: contextvars.ContextVar = contextvars.ContextVar("job_id", default=None)
+converter_var: contextvars.ContextVar = contextvars.ContextVar("converter", default=None)
+stage_var: contextvars.ContextVar = contextvars.ContextVar("stage", default=None)
+
+_CONTEXT_FIELDS = (("job_id", job_id_var), ("converter", converter_var), ("stage", stage_var))
+
+# State of the last setup_logging call (replaced, not stacked, on the next call)
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_installed: List[tuple] = []
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the conversion context onto records in the emitting thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in _CONTEXT_FIELDS:
+            if not hasattr(record, name):
+                setattr(record, name, var.get())
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only merges the message arguments before enqueueing.
+
+    The stock handler renders the full text line in the emitting thread;
+    here formatting is left to the listener, which also lets the JSON
+    formatter see the original record fields.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # Tracebacks reference frames of the emitting thread; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
 
-def setup_logging(log_level: str = "INFO", log_file: str = None) -> logging.Logger:
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for name, _ in _CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_level: str = "INFO", log_file: str = None, log_format: str = LOG_FORMAT_TEXT) -> logging.Logger:
     """
     Configure application-wide logging.
-    
+
+    Safe to call more than once: handlers from an earlier call are removed
+    (and their listener stopped) before the new ones are installed.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional path to log file
-        
+        log_format: 'text' (human-readable) or 'json' (one object per line)
+
     Returns:
         Configured logger instance
     """
-    logger = logging.getLogger("PdfConverter")
-    logger.setLevel(getattr(logging, log_level.upper()))
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
-    
-    # File handler (optional)
-    if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-        )
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
-    
-    return logger
+    global _listener
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}. Supported: {', '.join(LOG_FORMATS)}")
+
+    with _setup_lock:
+        _teardown()
+
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+        if log_format == LOG_FORMAT_JSON:
+            console_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+        handlers = [console_handler]
+
+        # File handler (optional)
+        if log_file:
+            log_path = Path(log_file)
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler.setLevel(logging.DEBUG)
+            if log_format == LOG_FORMAT_JSON:
+                file_handler.setFormatter(JsonFormatter())
+            else:
+                file_handler.setFormatter(logging.Formatter(
+                    '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+                ))
+            handlers.append(file_handler)
+
+        queue_handler = _QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(_ContextFilter())
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+        # Modules log under their own names (get_logger(__name__)), so the
+        # handler goes on the root logger; "PdfConverter" propagates to it.
+        level = getattr(logging, log_level.upper())
+        root = logging.getLogger()
+        app_logger = logging.getLogger("PdfConverter")
+        for target in (root, app_logger):
+            _installed.append((target, target.level))
+            target.setLevel(level)
+        root.addHandler(queue_handler)
+        _installed.append((root, queue_handler))
+
+    return app_logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread (also runs at exit)."""
+    with _setup_lock:
+        _teardown()
+
+
+def _teardown():
+    global _listener
+    for target, item in reversed(_installed):
+        if isinstance(item, logging.Handler):
+            target.removeHandler(item)
+        else:
+            target.setLevel(item)
+    _installed.clear()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+@contextmanager
+def log_context(job_id: str = None, converter: str = None, stage: str = None):
+    """
+    Attach conversion context to records logged in the block (this thread only).
+
+    Args:
+        job_id: Id of the job being converted
+        converter: Converter class name
+        stage: Conversion stage (dispatch, open, export, ...)
+    """
+    tokens = []
+    for var, value in ((job_id_var, job_id), (converter_var, converter), (stage_var, stage)):
+        if value is not None:
+            tokens.append((var, var.set(value)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
 
 
 def get_logger(name: str = None) -> logging.Logger:
     """
     Get a logger instance.
-    
+
     Args:
         name: Optional logger name (defaults to 'PdfConverter')
-        
+
     Returns:
         Logger instance
     """
@@ -0,0 +1,379 @@
+"""
+PDF object model, parser and serializer.
+
+Only the subset of PDF syntax needed to read document structure and copy
+objects between files is implemented: no content-stream interpretation,
+no encryption. Stream data is never parsed; streams keep a reference to
+their location in the source buffer so it can be copied verbatim.
+"""
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class PdfError(Exception):
+    """Raised when a PDF cannot be parsed."""
+    pass
+
+
+class Name(str):
+    """A PDF name object, stored without the leading slash (escapes are kept raw)."""
+    __slots__ = ()
+
+
+class Ref(NamedTuple):
+    """An indirect object reference (num gen R)."""
+    num: int
+    gen: int = 0
+
+
+class Stream:
+    """
+    A stream object.
+
+    Attributes:
+        dict: The stream dictionary
+        start: Offset of the first data byte in the source buffer
+        length: Number of raw (encoded) data bytes
+        data: Raw data for streams created in memory (None for source streams)
+    """
+    __slots__ = ("dict", "start", "length", "data")
+
+    def __init__(self, stream_dict: Dict[Name, Any], start: int = 0, length: int = 0, data: Optional[bytes] = None):
+        self.dict = stream_dict
+        self.start = start
+        self.length = length if data is None else len(data)
+        self.data = data
+
+    def __repr__(self):
+        return f"Stream({self.dict!r}, start={self.start}, length={self.length})"
+
+
+class Keyword(str):
+    """A bare keyword token (obj, endobj, stream, R, ...)."""
+    __slots__ = ()
+
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+DELIMITERS = b"()<>[]{}/%"
+
+_WS_RE = re.compile(rb"(?:[\x00\t\n\x0c\r ]+|%[^\r\n]*)+")
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REGULAR_RE = re.compile(rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]+")
+_INT_RE = re.compile(rb"\d+")
+_HEX_CLEAN_RE = re.compile(rb"[^0-9A-Fa-f]")
+
+_ESCAPES = {
+    ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t",
+    ord("b"): b"\b", ord("f"): b"\f", ord("("): b"(",
+    ord(")"): b")", ord("\\"): b"\\",
+}
+
+# Sentinels returned by the tokenizer for structural delimiters
+_ARRAY_END = Keyword("]")
+_DICT_END = Keyword(">>")
+
+
+def skip_whitespace(buf, pos: int) -> int:
+    """Skip whitespace and comments starting at `pos`."""
+    m = _WS_RE.match(buf, pos)
+    return m.end() if m else pos
+
+
+class Parser:
+    """
+    Recursive-descent parser over a bytes-like buffer (bytes, mmap, memoryview).
+    """
+
+    def __init__(self, buf):
+        """
+        Args:
+            buf: Buffer containing PDF syntax
+        """
+        self.buf = buf
+        self.size = len(buf)
+
+    def parse_object(self, pos: int) -> Tuple[Any, int]:
+        """
+        Parse one direct object.
+
+        Args:
+            pos: Offset to start parsing at (leading whitespace is skipped)
+
+        Returns:
+            (object, offset just past the object)
+
+        Raises:
+            PdfError: On malformed syntax
+        """
+        obj, pos = self._token(pos)
+        if isinstance(obj, Keyword) and obj in ("]", ">>", "obj", "endobj", "stream", "endstream", "R"):
+            raise PdfError(f"Unexpected keyword '{obj}' at offset {pos}")
+        return obj, pos
+
+    def parse_indirect(self, pos: int) -> Tuple[int, int, Any, int]:
+        """
+        Parse the header and body of an indirect object ('n g obj ...').
+
+        Streams are returned as Stream objects whose data location is known
+        but whose length still needs to be resolved by the caller if the
+        /Length entry is an indirect reference (stream.length is -1 then).
+
+        Args:
+            pos: Offset of the object number
+
+        Returns:
+            (object number, generation, object, offset after the body)
+        """
+        pos = skip_whitespace(self.buf, pos)
+        m = _INT_RE.match(self.buf, pos)
+        if not m:
+            raise PdfError(f"Expected object number at offset {pos}")
+        num = int(m.group())
+        pos = skip_whitespace(self.buf, m.end())
+        m = _INT_RE.match(self.buf, pos)
+        if not m:
+            raise PdfError(f"Expected generation number at offset {pos}")
+        gen = int(m.group())
+        pos = skip_whitespace(self.buf, m.end())
+        if self.buf[pos:pos + 3] != b"obj":
+            raise PdfError(f"Expected 'obj' at offset {pos}")
+        obj, pos = self.parse_object(pos + 3)
+
+        after = skip_whitespace(self.buf, pos)
+        if isinstance(obj, dict) and self.buf[after:after + 6] == b"stream":
+            start = after + 6
+            # The keyword is followed by CRLF or LF (tolerate a lone CR)
+            if self.buf[start:start + 2] == b"\r\n":
+                start += 2
+            elif self.buf[start:start + 1] in (b"\n", b"\r"):
+                start += 1
+            length = obj.get("Length")
+            obj = Stream(obj, start=start, length=length if isinstance(length, int) else -1)
+            pos = start
+        return num, gen, obj, pos
+
+    def _token(self, pos: int) -> Tuple[Any, int]:
+        """Read the next object or structural token."""
+        buf = self.buf
+        pos = skip_whitespace(buf, pos)
+        if pos >= self.size:
+            raise PdfError("Unexpected end of data")
+        c = buf[pos:pos + 1]
+
+        if c == b"/":
+            m = _REGULAR_RE.match(buf, pos + 1)
+            end = m.end() if m else pos + 1
+            return Name(bytes(buf[pos + 1:end]).decode("latin-1")), end
+
+        if c == b"<":
+            if buf[pos + 1:pos + 2] == b"<":
+                return self._dict(pos + 2)
+            end = buf.find(b">", pos + 1)
+            if end < 0:
+                raise PdfError(f"Unterminated hex string at offset {pos}")
+            digits = _HEX_CLEAN_RE.sub(b"", bytes(buf[pos + 1:end]))
+            if len(digits) % 2:
+                digits += b"0"
+            return bytes.fromhex(digits.decode("ascii")), end + 1
+
+        if c == b">":
+            if buf[pos + 1:pos + 2] == b">":
+                return _DICT_END, pos + 2
+            raise PdfError(f"Unexpected '>' at offset {pos}")
+
+        if c == b"[":
+            return self._array(pos + 1)
+
+        if c == b"]":
+            return _ARRAY_END, pos + 1
+
+        if c == b"(":
+            return self._literal_string(pos + 1)
+
+        m = _NUMBER_RE.match(buf, pos)
+        if m:
+            text = m.group()
+            end = m.end()
+            if b"." in text:
+                return float(text), end
+            value = int(text)
+            # Look ahead for 'gen R' to form a reference
+            if text[:1] not in b"+-":
+                ref = self._try_reference(value, end)
+                if ref is not None:
+                    return ref
+            return value, end
+
+        m = _REGULAR_RE.match(buf, pos)
+        if not m:
+            raise PdfError(f"Unexpected character {c!r} at offset {pos}")
+        word = bytes(m.group())
+        if word == b"true":
+            return True, m.end()
+        if word == b"false":
+            return False, m.end()
+        if word == b"null":
+            return None, m.end()
+        return Keyword(word.decode("latin-1")), m.end()
+
+    def _try_reference(self, num: int, pos: int) -> Optional[Tuple[Ref, int]]:
+        """If 'gen R' follows, return the reference and new offset."""
+        buf = self.buf
+        p = skip_whitespace(buf, pos)
+        m = _INT_RE.match(buf, p)
+        if not m:
+            return None
+        p2 = skip_whitespace(buf, m.end())
+        if buf[p2:p2 + 1] == b"R":
+            nxt = buf[p2 + 1:p2 + 2]
+            if not nxt or nxt in WHITESPACE or nxt in DELIMITERS:
+                return Ref(num, int(m.group())), p2 + 1
+        return None
+
+    def _array(self, pos: int) -> Tuple[List[Any], int]:
+        """Parse array items up to the closing bracket."""
+        items = []
+        while True:
+            obj, pos = self._token(pos)
+            if obj is _ARRAY_END:
+                return items, pos
+            if isinstance(obj, Keyword):
+                raise PdfError(f"Unexpected keyword '{obj}' in array at offset {pos}")
+            items.append(obj)
+
+    def _dict(self, pos: int) -> Tuple[Dict[Name, Any], int]:
+        """Parse dictionary entries up to '>>'."""
+        result = {}
+        while True:
+            key, pos = self._token(pos)
+            if key is _DICT_END:
+                return result, pos
+            if not isinstance(key, Name):
+                raise PdfError(f"Expected name key in dictionary at offset {pos}")
+            value, pos = self._token(pos)
+            if value is _DICT_END:
+                # Missing value: treat as null and close the dictionary
+                result[key] = None
+                return result, pos
+            if isinstance(value, Keyword):
+                raise PdfError(f"Unexpected keyword '{value}' in dictionary at offset {pos}")
+            result[key] = value
+
+    def _literal_string(self, pos: int) -> Tuple[bytes, int]:
+        """Parse a (literal) string with nesting and escapes."""
+        buf = self.buf
+        out = bytearray()
+        depth = 1
+        while pos < self.size:
+            c = buf[pos]
+            if c == 0x5C:  # backslash
+                pos += 1
+                if pos >= self.size:
+                    break
+                e = buf[pos]
+                if e in _ESCAPES:
+                    out += _ESCAPES[e]
+                    pos += 1
+                elif 0x30 <= e <= 0x37:
+                    end = pos
+                    while end < pos + 3 and end < self.size and 0x30 <= buf[end] <= 0x37:
+                        end += 1
+                    out.append(int(bytes(buf[pos:end]), 8) & 0xFF)
+                    pos = end
+                elif e == 0x0D:  # line continuation
+                    pos += 2 if buf[pos + 1:pos + 2] == b"\n" else 1
+                elif e == 0x0A:
+                    pos += 1
+                else:
+                    out.append(e)
+                    pos += 1
+                continue
+            if c == 0x28:
+                depth += 1
+            elif c == 0x29:
+                depth -= 1
+                if depth == 0:
+                    return bytes(out), pos + 1
+            out.append(c)
+            pos += 1
+        raise PdfError("Unterminated literal string")
+
+
+def _format_real(value: float) -> bytes:
+    """Format a real number without exponent notation."""
+    text = repr(value)
+    if "e" in text or "E" in text or "inf" in text or "nan" in text:
+        text = format(value, ".10f").rstrip("0").rstrip(".") or "0"
+    elif text.endswith(".0"):
+        text = text[:-2]
+    return text.encode("ascii")
+
+
+def serialize(obj: Any, remap: Optional[Callable[[Ref], Ref]] = None) -> bytes:
+    """
+    Serialize a direct object to PDF syntax.
+
+    Args:
+        obj: Object to serialize (Streams are not allowed here)
+        remap: Optional function applied to every Ref (used when copying
+               objects into another file)
+
+    Returns:
+        Serialized bytes
+    """
+    out = bytearray()
+    _serialize_into(obj, out, remap)
+    return bytes(out)
+
+
+def _serialize_into(obj: Any, out: bytearray, remap):
+    """Append the serialization of `obj` to `out`."""
+    if isinstance(obj, Name):
+        out += b"/" + obj.encode("latin-1")
+    elif isinstance(obj, Ref):
+        if remap is not None:
+            obj = remap(obj)
+        out += b"%d %d R" % (obj.num, obj.gen)
+    elif obj is True:
+        out += b"true"
+    elif obj is False:
+        out += b"false"
+    elif obj is None:
+        out += b"null"
+    elif isinstance(obj, int):
+        out += b"%d" % obj
+    elif isinstance(obj, float):
+        out += _format_real(obj)
+    elif isinstance(obj, (bytes, bytearray)):
+        out += b"<" + bytes(obj).hex().encode("ascii") + b">"
+    elif isinstance(obj, str):
+        out += b"<" + encode_text_string(obj).hex().encode("ascii") + b">"
+    elif isinstance(obj, list):
+        out += b"["
+        for i, item in enumerate(obj):
+            if i:
+                out += b" "
+            _serialize_into(item, out, remap)
+        out += b"]"
+    elif isinstance(obj, dict):
+        out += b"<<"
+        for key, value in obj.items():
+            out += b"/" + key.encode("latin-1") + b" "
+            _serialize_into(value, out, remap)
+        out += b">>"
+    elif isinstance(obj, Stream):
+        raise PdfError("Streams must be written as indirect objects")
+    else:
+        raise PdfError(f"Cannot serialize {type(obj).__name__}")
+
+
+def encode_text_string(text: str) -> bytes:
+    """
+    Encode a Python string as a PDF text string.
+
+    ASCII text is stored as-is; anything else as UTF-16BE with a BOM.
+    """
+    try:
+        return text.encode("ascii")
+    except UnicodeEncodeError:
+        return b"\xfe\xff" + text.encode("utf-16-be")
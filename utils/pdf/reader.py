@@ -0,0 +1,575 @@
+"""
+Memory-mapped PDF reader.
+
+Reads the cross-reference data (classic tables, cross-reference streams
+and hybrid files, following /Prev chains) and fetches individual objects
+on demand. Classic xref tables are not parsed up front: their fixed
+20-byte entries are looked up by arithmetic when an object is first
+requested, so opening a file only touches the tail, the trailer and the
+objects actually used.
+"""
+import mmap
+import os
+import re
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.pdf.objects import Parser, PdfError, Name, Ref, Stream, skip_whitespace
+
+# Attributes a page inherits from its ancestors in the page tree
+INHERITABLE_PAGE_KEYS = ("Resources", "MediaBox", "CropBox", "Rotate")
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_XREF_SUBSECTION_RE = re.compile(rb"(\d+)\s+(\d+)\s*[\r\n]")
+_XREF_ENTRY_RE = re.compile(rb"(\d{10})\s(\d{5})\s([nf])")
+_OBJ_HEADER_RE = re.compile(rb"(?<![0-9])(\d+)\s+(\d+)\s+obj\b")
+
+# How far from the end of the file to look for 'startxref'
+TAIL_SIZE = 1024
+
+# Size of one classic xref entry ('nnnnnnnnnn ggggg n' plus a 2-byte EOL)
+XREF_ENTRY_SIZE = 20
+
+_FREE_ENTRY = (0, 0, 0)
+
+
+class PdfReader:
+    """
+    Random-access reader for a single PDF file.
+
+    Use as a context manager, or call `close` when done.
+    """
+
+    def __init__(self, path: str, object_stream_cache: int = 4, repair: bool = True):
+        """
+        Open a PDF and load its cross-reference index.
+
+        Args:
+            path: Path to the PDF file
+            object_stream_cache: Number of decoded object streams kept in memory
+            repair: Rebuild a damaged xref index by scanning the file; if False,
+                    damaged cross-reference data raises PdfError instead
+
+        Raises:
+            PdfError: If the file is empty, not a PDF, or its structure is unreadable
+            OSError: If the file cannot be opened
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            if self.size == 0:
+                raise PdfError("File is empty")
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        self._parser = Parser(self.buf)
+        # Newest first: dicts of entries (xref streams, repaired or irregular
+        # tables) or (first number, count, offset) for regular table subsections
+        self._xref_sections: List[Any] = []
+        self._xref_cache: Dict[int, Tuple[int, int, int]] = {}
+        self.repair = repair
+        self._objstm_cache: "OrderedDict[int, Tuple[List[Tuple[int, int]], int, bytes]]" = OrderedDict()
+        self._objstm_cache_size = max(1, object_stream_cache)
+        self.trailer: Dict[Name, Any] = {}
+        self.xref_rebuilt = False
+
+        try:
+            self.version = self._read_header()
+            self._load_xref()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the memory map and file handle."""
+        if getattr(self, "buf", None) is not None:
+            self.buf.close()
+            self.buf = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    @property
+    def is_encrypted(self) -> bool:
+        """Whether the document uses PDF encryption."""
+        return "Encrypt" in self.trailer
+
+    @property
+    def object_count(self) -> int:
+        """Highest object number in the cross-reference index plus one."""
+        highest = 0
+        for section in self._xref_sections:
+            if isinstance(section, dict):
+                highest = max(highest, max(section, default=-1) + 1)
+            else:
+                highest = max(highest, section[0] + section[1])
+        return highest
+
+    # Object access
+
+    def get_object(self, ref) -> Any:
+        """
+        Fetch an indirect object.
+
+        Args:
+            ref: Ref or object number
+
+        Returns:
+            The object (a Stream for stream objects), or None if it does not exist
+        """
+        num = ref.num if isinstance(ref, Ref) else ref
+        kind, a, b = self._xref_entry(num)
+        if kind == 1:
+            return self._object_at(a, num)
+        if kind == 2:
+            return self._object_in_stream(a, b)
+        return None
+
+    def resolve(self, obj: Any) -> Any:
+        """Follow a reference (if `obj` is one) to its object."""
+        seen = 0
+        while isinstance(obj, Ref) and seen < 32:
+            obj = self.get_object(obj)
+            seen += 1
+        return obj
+
+    def raw_stream_chunks(self, stream: Stream, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """
+        Yield the encoded data of a stream in chunks.
+
+        Args:
+            stream: Stream returned by get_object
+            chunk_size: Maximum chunk size in bytes
+        """
+        if stream.data is not None:
+            yield stream.data
+            return
+        end = stream.start + stream.length
+        for pos in range(stream.start, end, chunk_size):
+            yield self.buf[pos:min(end, pos + chunk_size)]
+
+    def decode_stream(self, stream: Stream) -> bytes:
+        """
+        Decode a stream's data (FlateDecode with optional PNG predictors only).
+
+        Args:
+            stream: Stream returned by get_object
+
+        Returns:
+            Decoded bytes
+
+        Raises:
+            PdfError: If the stream uses an unsupported filter
+        """
+        data = stream.data if stream.data is not None else self.buf[stream.start:stream.start + stream.length]
+        filters = self.resolve(stream.dict.get("Filter"))
+        params = self.resolve(stream.dict.get("DecodeParms"))
+        if filters is None:
+            return bytes(data)
+        if not isinstance(filters, list):
+            filters, params = [filters], [params]
+        elif not isinstance(params, list):
+            params = [params] * len(filters)
+
+        for name, param in zip(filters, params):
+            if name != "FlateDecode":
+                raise PdfError(f"Unsupported stream filter: {name}")
+            try:
+                data = zlib.decompress(data)
+            except zlib.error:
+                # Tolerate truncated or trailing-garbage streams
+                data = zlib.decompressobj().decompress(data)
+            param = self.resolve(param) or {}
+            predictor = param.get("Predictor", 1)
+            if predictor >= 10:
+                data = _png_unpredict(data, param.get("Columns", 1), param.get("Colors", 1), param.get("BitsPerComponent", 8))
+            elif predictor != 1:
+                raise PdfError(f"Unsupported predictor: {predictor}")
+        return bytes(data)
+
+    # Document structure
+
+    @property
+    def root(self) -> Dict[Name, Any]:
+        """The document catalog."""
+        root = self.resolve(self.trailer.get("Root"))
+        if not isinstance(root, dict):
+            raise PdfError("Document catalog is missing")
+        return root
+
+    def page_count(self) -> int:
+        """Page count from the page tree root's /Count entry."""
+        pages = self.resolve(self.root.get("Pages"))
+        if not isinstance(pages, dict):
+            raise PdfError("Page tree is missing")
+        count = self.resolve(pages.get("Count"))
+        if not isinstance(count, int) or count < 0:
+            raise PdfError("Page tree has no valid /Count")
+        return count
+
+    def iter_pages(self) -> Iterator[Tuple[Ref, Dict[Name, Any]]]:
+        """
+        Walk the page tree in order.
+
+        Yields:
+            (page reference, page dictionary with inherited attributes filled in)
+        """
+        pages_ref = self.root.get("Pages")
+        if not isinstance(pages_ref, Ref):
+            raise PdfError("Page tree root must be an indirect object")
+
+        visited = set()
+        # Stack of (node reference, inherited attributes)
+        stack: List[Tuple[Any, Dict[Name, Any]]] = [(pages_ref, {})]
+        while stack:
+            node_ref, inherited = stack.pop()
+            if isinstance(node_ref, Ref):
+                if node_ref.num in visited:
+                    continue
+                visited.add(node_ref.num)
+            node = self.resolve(node_ref)
+            if not isinstance(node, dict):
+                continue
+
+            node_type = node.get("Type")
+            kids = self.resolve(node.get("Kids"))
+            if node_type == "Pages" or (node_type is None and isinstance(kids, list)):
+                attrs = dict(inherited)
+                for key in INHERITABLE_PAGE_KEYS:
+                    if key in node:
+                        attrs[key] = node[key]
+                for kid in reversed(kids or []):
+                    stack.append((kid, attrs))
+            else:
+                page = dict(node)
+                for key, value in inherited.items():
+                    page.setdefault(key, value)
+                yield node_ref, page
+
+    def page_tree_nodes(self) -> List[Ref]:
+        """References of all intermediate (/Pages) nodes in the page tree."""
+        result = []
+        stack = [self.root.get("Pages")]
+        seen = set()
+        while stack:
+            ref = stack.pop()
+            if not isinstance(ref, Ref) or ref.num in seen:
+                continue
+            seen.add(ref.num)
+            node = self.resolve(ref)
+            if isinstance(node, dict) and isinstance(self.resolve(node.get("Kids")), list):
+                result.append(ref)
+                stack.extend(self.resolve(node.get("Kids")))
+        return result
+
+    # Internals
+
+    def _read_header(self) -> str:
+        """Validate the %PDF- header and return the version string."""
+        head = self.buf[:1024]
+        pos = head.find(b"%PDF-")
+        if pos < 0:
+            raise PdfError("Missing %PDF header")
+        return head[pos + 5:pos + 8].decode("latin-1", "replace")
+
+    def _load_xref(self):
+        """Load the xref chain starting at startxref, rebuilding it if broken."""
+        try:
+            offset = self.find_startxref()
+            self._read_xref_chain(offset)
+            if "Root" not in self.trailer:
+                raise PdfError("Trailer has no /Root")
+        except PdfError:
+            if not self.repair:
+                raise
+            self._rebuild_xref()
+
+    def find_startxref(self) -> int:
+        """
+        Locate the offset recorded after the last 'startxref' keyword.
+
+        Raises:
+            PdfError: If the keyword is missing or the offset is out of range
+        """
+        tail_start = max(0, self.size - TAIL_SIZE)
+        tail = self.buf[tail_start:]
+        matches = list(_STARTXREF_RE.finditer(tail))
+        if not matches:
+            raise PdfError("startxref not found")
+        offset = int(matches[-1].group(1))
+        if offset <= 0 or offset >= self.size:
+            raise PdfError(f"startxref offset {offset} is out of range")
+        return offset
+
+    def _read_xref_chain(self, offset: int):
+        """Follow /Prev links from the newest xref section to the oldest."""
+        seen = set()
+        first = True
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            pos = skip_whitespace(self.buf, offset)
+            if self.buf[pos:pos + 4] == b"xref":
+                trailer = self._read_xref_table(pos + 4)
+                stm = trailer.get("XRefStm")
+                if isinstance(stm, int):
+                    self._read_xref_stream(stm)
+            else:
+                trailer = self._read_xref_stream(pos)
+            if first:
+                self.trailer = {k: v for k, v in trailer.items() if k not in ("Prev", "XRefStm", "W", "Index", "Filter", "DecodeParms", "Length", "Type")}
+                first = False
+            prev = trailer.get("Prev")
+            offset = prev if isinstance(prev, int) else None
+
+    def _read_xref_table(self, pos: int) -> Dict[Name, Any]:
+        """Parse a classic xref table and its trailer dictionary."""
+        buf = self.buf
+        while True:
+            pos = skip_whitespace(buf, pos)
+            if buf[pos:pos + 7] == b"trailer":
+                trailer, _ = self._parser.parse_object(pos + 7)
+                if not isinstance(trailer, dict):
+                    raise PdfError("Invalid trailer")
+                return trailer
+            m = _XREF_SUBSECTION_RE.match(buf, pos)
+            if not m:
+                raise PdfError(f"Invalid xref subsection at offset {pos}")
+            start, count = int(m.group(1)), int(m.group(2))
+            pos = m.end()
+            if count == 0:
+                continue
+            last = pos + XREF_ENTRY_SIZE * (count - 1)
+            if _XREF_ENTRY_RE.match(buf, pos) and _XREF_ENTRY_RE.match(buf, last):
+                # Regular layout: entries are read on demand
+                self._xref_sections.append((start, count, pos))
+                pos += XREF_ENTRY_SIZE * count
+                continue
+
+            # Non-conforming line endings: parse the subsection now
+            entries = {}
+            for i in range(count):
+                pos = skip_whitespace(buf, pos)
+                e = _XREF_ENTRY_RE.match(buf, pos)
+                if not e:
+                    raise PdfError(f"Invalid xref entry at offset {pos}")
+                pos = e.end()
+                if e.group(3) == b"n":
+                    entries[start + i] = (1, int(e.group(1)), int(e.group(2)))
+                else:
+                    entries[start + i] = _FREE_ENTRY
+            self._xref_sections.append(entries)
+
+    def _read_xref_stream(self, pos: int) -> Dict[Name, Any]:
+        """Parse a cross-reference stream at `pos` and return its dictionary."""
+        _, _, stream, _ = self._parser.parse_indirect(pos)
+        if not isinstance(stream, Stream) or stream.dict.get("Type") != "XRef":
+            raise PdfError(f"No xref stream at offset {pos}")
+        if stream.length < 0:
+            raise PdfError("Xref stream length must be direct")
+
+        data = self.decode_stream(stream)
+        widths = stream.dict.get("W")
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise PdfError("Invalid /W in xref stream")
+        w0, w1, w2 = widths
+        index = stream.dict.get("Index") or [0, stream.dict.get("Size", 0)]
+        row = w0 + w1 + w2
+
+        entries = {}
+        p = 0
+        for section in range(0, len(index) - 1, 2):
+            start, count = index[section], index[section + 1]
+            for i in range(count):
+                if p + row > len(data):
+                    break
+                kind = _be_int(data, p, w0) if w0 else 1
+                a = _be_int(data, p + w0, w1)
+                b = _be_int(data, p + w0 + w1, w2) if w2 else 0
+                p += row
+                entries[start + i] = (kind, a, b) if kind in (1, 2) else _FREE_ENTRY
+        self._xref_sections.append(entries)
+        return stream.dict
+
+    def _rebuild_xref(self):
+        """Reconstruct the xref index by scanning the whole file for 'n g obj'."""
+        index: Dict[int, Tuple[int, int, int]] = {}
+        self._xref_sections = [index]
+        self._xref_cache = {}
+        self.trailer = {}
+        for m in _OBJ_HEADER_RE.finditer(self.buf):
+            index[int(m.group(1))] = (1, m.start(), int(m.group(2)))
+
+        # Index objects packed into object streams
+        for num, (_, offset, _) in list(index.items()):
+            if b"/ObjStm" not in self.buf[offset:offset + 256]:
+                continue
+            try:
+                objstm = self.get_object(num)
+                if isinstance(objstm, Stream) and objstm.dict.get("Type") == "ObjStm":
+                    offsets = self._object_stream_index(num)[0]
+                    for position, (inner_num, _) in enumerate(offsets):
+                        index.setdefault(inner_num, (2, num, position))
+            except (PdfError, ValueError, zlib.error):
+                continue
+
+        # Prefer the last trailer dictionary; fall back to xref streams or a catalog scan
+        pos = self.buf.rfind(b"trailer")
+        while pos >= 0 and not self.trailer:
+            try:
+                trailer, _ = self._parser.parse_object(pos + 7)
+                if isinstance(trailer, dict) and "Root" in trailer:
+                    self.trailer = trailer
+            except PdfError:
+                pass
+            pos = self.buf.rfind(b"trailer", 0, pos)
+
+        if not self.trailer:
+            for num in sorted(index, reverse=True):
+                try:
+                    obj = self.get_object(num)
+                except PdfError:
+                    continue
+                if isinstance(obj, Stream) and obj.dict.get("Type") == "XRef" and "Root" in obj.dict:
+                    self.trailer = dict(obj.dict)
+                    break
+                if isinstance(obj, dict) and obj.get("Type") == "Catalog":
+                    self.trailer = {Name("Root"): Ref(num, 0)}
+                    break
+
+        if not self.trailer:
+            raise PdfError("Cross-reference data is damaged and no catalog was found")
+        # Lookups made while indexing may have cached entries found later
+        self._xref_cache = {}
+        self.xref_rebuilt = True
+
+    def _xref_entry(self, num: int) -> Tuple[int, int, int]:
+        """Look up (kind, field 2, field 3) for an object number."""
+        entry = self._xref_cache.get(num)
+        if entry is not None:
+            return entry
+        entry = _FREE_ENTRY
+        for section in self._xref_sections:
+            if isinstance(section, dict):
+                found = section.get(num)
+                if found is not None:
+                    entry = found
+                    break
+            elif section[0] <= num < section[0] + section[1]:
+                pos = section[2] + XREF_ENTRY_SIZE * (num - section[0])
+                e = _XREF_ENTRY_RE.match(self.buf, pos)
+                if not e:
+                    raise PdfError(f"Invalid xref entry at offset {pos}")
+                if e.group(3) == b"n":
+                    entry = (1, int(e.group(1)), int(e.group(2)))
+                break
+        self._xref_cache[num] = entry
+        return entry
+
+    def _object_at(self, offset: int, expected_num: int) -> Any:
+        """Parse the indirect object stored at a file offset."""
+        if offset >= self.size:
+            raise PdfError(f"Object {expected_num} offset {offset} is beyond end of file")
+        num, _, obj, _ = self._parser.parse_indirect(offset)
+        if num != expected_num:
+            raise PdfError(f"Expected object {expected_num} at offset {offset}, found {num}")
+        if isinstance(obj, Stream):
+            self._resolve_stream_extent(obj)
+        return obj
+
+    def _resolve_stream_extent(self, stream: Stream):
+        """Determine a stream's data length, repairing a wrong /Length if needed."""
+        length = stream.length
+        if length < 0:
+            length = self.resolve(stream.dict.get("Length"))
+        if isinstance(length, int) and length >= 0:
+            end = stream.start + length
+            tail = self.buf[end:end + 32].lstrip(b"\r\n \t\x00")
+            if tail.startswith(b"endstream"):
+                stream.length = length
+                return
+
+        # /Length is missing or wrong: search for the endstream keyword
+        end = self.buf.find(b"endstream", stream.start)
+        if end < 0:
+            raise PdfError("Stream is truncated (no endstream)")
+        if self.buf[end - 2:end] == b"\r\n":
+            end -= 2
+        elif self.buf[end - 1:end] in (b"\n", b"\r"):
+            end -= 1
+        stream.length = end - stream.start
+
+    def _object_in_stream(self, stream_num: int, index: int) -> Any:
+        """Parse an object stored inside an object stream."""
+        offsets, first, data = self._object_stream_index(stream_num)
+        if index >= len(offsets):
+            raise PdfError(f"Object index {index} out of range in object stream {stream_num}")
+        obj, _ = Parser(data).parse_object(first + offsets[index][1])
+        return obj
+
+    def _object_stream_index(self, stream_num: int) -> Tuple[List[Tuple[int, int]], int, bytes]:
+        """Decode (or fetch from cache) an object stream's offset table and data."""
+        cached = self._objstm_cache.get(stream_num)
+        if cached is None:
+            objstm = self.get_object(stream_num)
+            if not isinstance(objstm, Stream) or objstm.dict.get("Type") != "ObjStm":
+                raise PdfError(f"Object {stream_num} is not an object stream")
+            data = self.decode_stream(objstm)
+            count = objstm.dict.get("N", 0)
+            first = objstm.dict.get("First", 0)
+            header = data[:first].split()
+            offsets = [(int(header[i]), int(header[i + 1])) for i in range(0, min(len(header), 2 * count) - 1, 2)]
+            cached = (offsets, first, data)
+            self._objstm_cache[stream_num] = cached
+            if len(self._objstm_cache) > self._objstm_cache_size:
+                self._objstm_cache.popitem(last=False)
+        else:
+            self._objstm_cache.move_to_end(stream_num)
+        return cached
+
+
+def _be_int(data: bytes, pos: int, width: int) -> int:
+    """Read a big-endian unsigned integer of `width` bytes."""
+    return int.from_bytes(data[pos:pos + width], "big")
+
+
+def _png_unpredict(data: bytes, columns: int, colors: int, bits: int) -> bytes:
+    """Undo PNG row predictors (used by xref and object streams)."""
+    bpp = max(1, colors * bits // 8)
+    row_len = (columns * colors * bits + 7) // 8
+    out = bytearray()
+    prev = bytearray(row_len)
+    for p in range(0, len(data), row_len + 1):
+        filter_type = data[p]
+        row = bytearray(data[p + 1:p + 1 + row_len])
+        if len(row) < row_len:
+            row.extend(bytes(row_len - len(row)))
+        if filter_type == 1:  # Sub
+            for i in range(bpp, row_len):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif filter_type == 2:  # Up
+            for i in range(row_len):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif filter_type == 3:  # Average
+            for i in range(row_len):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif filter_type == 4:  # Paeth
+            for i in range(row_len):
+                a = row[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+                pred = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                row[i] = (row[i] + pred) & 0xFF
+        out += row
+        prev = row
+    return bytes(out)
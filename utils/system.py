@@ -0,0 +1,132 @@
+"""
+System-wide CPU and memory load, read without third-party packages.
+
+Windows uses GetSystemTimes / GlobalMemoryStatusEx, Linux /proc; on other
+platforms (or if a query fails) the values are None.
+"""
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SystemLoad:
+    """
+    System load at one point in time.
+
+    Attributes:
+        cpu: Busy fraction of all CPUs since the previous sample (None if unknown)
+        memory: Fraction of physical memory in use (None if unknown)
+    """
+    cpu: Optional[float] = None
+    memory: Optional[float] = None
+
+
+class SystemLoadProbe:
+    """
+    Samples system load; CPU load is measured between consecutive calls.
+
+    Usage:
+        probe = SystemLoadProbe()
+        load = probe()        # first call: CPU since boot
+    """
+
+    def __init__(self):
+        self._last_cpu: Optional[Tuple[int, int]] = None
+
+    def __call__(self) -> SystemLoad:
+        return SystemLoad(cpu=self._cpu(), memory=self._memory())
+
+    def _cpu(self) -> Optional[float]:
+        try:
+            times = _cpu_times()
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug("Cannot read CPU times: %s", e)
+            return None
+        if times is None:
+            return None
+        idle, total = times
+        last, self._last_cpu = self._last_cpu, times
+        if last is not None:
+            idle -= last[0]
+            total -= last[1]
+        if total <= 0:
+            return None
+        return min(1.0, max(0.0, 1.0 - idle / total))
+
+    @staticmethod
+    def _memory() -> Optional[float]:
+        try:
+            return _memory_load()
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug("Cannot read memory load: %s", e)
+            return None
+
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class _MemoryStatusEx(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", wintypes.DWORD),
+            ("dwMemoryLoad", wintypes.DWORD),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    def _filetime(value: wintypes.FILETIME) -> int:
+        return (value.dwHighDateTime << 32) | value.dwLowDateTime
+
+    def _cpu_times() -> Optional[Tuple[int, int]]:
+        """(idle, total) CPU time in 100 ns units, summed over all CPUs."""
+        idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+        if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+            raise OSError("GetSystemTimes failed")
+        # Kernel time includes idle time
+        return _filetime(idle), _filetime(kernel) + _filetime(user)
+
+    def _memory_load() -> Optional[float]:
+        status = _MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(_MemoryStatusEx)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            raise OSError("GlobalMemoryStatusEx failed")
+        return 1.0 - status.ullAvailPhys / status.ullTotalPhys
+
+elif sys.platform.startswith("linux"):
+
+    def _cpu_times() -> Optional[Tuple[int, int]]:
+        """(idle, total) CPU time in clock ticks from /proc/stat."""
+        with open("/proc/stat", encoding="ascii") as f:
+            fields = f.readline().split()
+        # cpu user nice system idle iowait irq softirq steal ...
+        values = [int(v) for v in fields[1:9]]
+        return values[3] + values[4], sum(values)
+
+    def _memory_load() -> Optional[float]:
+        info = {}
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                info[name] = int(value.split()[0])
+        total = info.get("MemTotal")
+        available = info.get("MemAvailable")
+        if not total or available is None:
+            return None
+        return 1.0 - available / total
+
+else:
+
+    def _cpu_times() -> Optional[Tuple[int, int]]:
+        return None
+
+    def _memory_load() -> Optional[float]:
+        return None
@@ -2,93 +2,354 @@
 COM-safe threading utilities for Office automation.
 
 CRITICAL: COM objects MUST be created and used within the same thread.
-This module provides a worker thread pattern that ensures COM safety.
+This module provides a worker pool pattern that ensures COM safety:
+every worker thread initializes its own COM apartment and all Office
+objects for a task are created and released on that thread.
 """
 import threading
 import queue
-from typing import Callable, Any, Optional
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Callable, Any, List, Optional
 from utils.logging import get_logger
 
+# pywin32's pythoncom, imported by the first worker thread rather than at
+# startup (None if pywin32 is not installed, e.g. non-Windows development machine)
+pythoncom = None
+_pythoncom_loaded = False
+_pythoncom_lock = threading.Lock()
+
 logger = get_logger(__name__)
 
+# Sentinel placed on the queue to wake a worker and tell it to exit
+_STOP = object()
+
+
+@dataclass
+class WorkerStats:
+    """
+    Runtime statistics for a single worker thread.
+
+    Attributes:
+        name: Worker thread name
+        jobs_done: Number of tasks that completed without raising
+        jobs_failed: Number of tasks that raised an exception
+        busy_time: Total seconds spent executing tasks (including callbacks)
+        queue_wait: Total seconds tasks waited in the queue before this worker picked them up
+    """
+    name: str
+    jobs_done: int = 0
+    jobs_failed: int = 0
+    busy_time: float = 0.0
+    queue_wait: float = 0.0
+
+    @property
+    def jobs_total(self) -> int:
+        """Total number of tasks processed by this worker."""
+        return self.jobs_done + self.jobs_failed
+
+    @property
+    def avg_queue_wait(self) -> float:
+        """Average queue wait per task in seconds."""
+        return self.queue_wait / self.jobs_total if self.jobs_total else 0.0
+
+
+def _load_pythoncom():
+    """Import pythoncom on first use."""
+    global pythoncom, _pythoncom_loaded
+    if not _pythoncom_loaded:
+        with _pythoncom_lock:
+            if not _pythoncom_loaded:
+                if pythoncom is None:
+                    try:
+                        import pythoncom as module
+                        pythoncom = module
+                    except ImportError:
+                        pass
+                _pythoncom_loaded = True
+    return pythoncom
+
+
+def _com_initialize():
+    """Initialize a single-threaded COM apartment for the calling thread."""
+    com = _load_pythoncom()
+    if com is not None:
+        com.CoInitialize()
+
+
+def _com_uninitialize():
+    """Release the calling thread's COM apartment."""
+    if pythoncom is not None:
+        try:
+            pythoncom.CoUninitialize()
+        except Exception as e:
+            logger.debug("CoUninitialize failed: %s", e)
+
+
+@contextmanager
+def com_apartment():
+    """Run a block in a COM apartment of its own (for helper threads outside ConversionWorker)."""
+    _com_initialize()
+    try:
+        yield
+    finally:
+        _com_uninitialize()
+
 
 class ConversionWorker:
     """
-    A worker thread that processes conversion jobs in a COM-safe manner.
-    
-    The worker thread creates COM objects internally and processes jobs
-    from a queue, ensuring thread safety for Office automation.
+    A pool of worker threads that process conversion jobs in a COM-safe manner.
+
+    Each worker thread initializes its own COM apartment and processes tasks
+    from a shared queue, ensuring thread safety for Office automation.
+
+    The queue can be bounded: when it is full, `submit` blocks until a worker
+    frees a slot (backpressure), so producers cannot run ahead of Office.
+
+    `set_active_limit` caps how many threads execute tasks at once; the
+    other threads stay alive (with their COM apartments) and wait, so the
+    limit can be raised again at any time.
     """
-    
-    def __init__(self):
-        self._queue: queue.Queue = queue.Queue()
-        self._thread: Optional[threading.Thread] = None
+
+    def __init__(self, num_threads: int = 1, max_queue_size: int = 0, name: str = "ConversionWorker"):
+        """
+        Initialize the worker pool.
+
+        Args:
+            num_threads: Number of worker threads (each gets its own COM apartment)
+            max_queue_size: Maximum number of pending tasks (0 = unbounded)
+            name: Base name for the worker threads
+        """
+        if num_threads < 1:
+            raise ValueError("num_threads must be at least 1")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size cannot be negative")
+
+        self.num_threads = num_threads
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._threads: List[threading.Thread] = []
+        self._stats: List[WorkerStats] = []
         self._stop_event = threading.Event()
         self._running = False
-        
+        self._active = 0
+        self._active_lock = threading.Lock()
+        self._active_limit = num_threads
+        # Threads allowed to execute (at most _active_limit)
+        self._slots = 0
+        self._gate = threading.Condition()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker threads have been started and not stopped."""
+        return self._running
+
+    @property
+    def queue_size(self) -> int:
+        """Approximate number of tasks waiting in the queue."""
+        return self._queue.qsize()
+
+    @property
+    def active_count(self) -> int:
+        """Number of workers currently executing a task."""
+        return self._active
+
+    @property
+    def active_limit(self) -> int:
+        """Number of workers allowed to execute tasks at once."""
+        return self._active_limit
+
+    def set_active_limit(self, limit: int) -> int:
+        """
+        Change how many workers may execute tasks at once.
+
+        Workers over a lowered limit finish their current task first; one
+        already waiting for work runs the next task before it gives up its slot.
+
+        Args:
+            limit: New limit (clamped to 1..num_threads)
+
+        Returns:
+            The applied limit
+        """
+        limit = max(1, min(self.num_threads, int(limit)))
+        with self._gate:
+            self._active_limit = limit
+            self._gate.notify_all()
+        return limit
+
     def start(self):
-        """Start the worker thread."""
+        """Start the worker threads."""
         if self._running:
             logger.warning("Worker already running")
             return
-            
+
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self._thread.start()
+        self._slots = 0
+        self._threads = []
+        self._stats = []
+        for i in range(self.num_threads):
+            stats = WorkerStats(name=f"{self.name}-{i + 1}")
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(stats,),
+                name=stats.name,
+                daemon=True
+            )
+            self._stats.append(stats)
+            self._threads.append(thread)
+            thread.start()
         self._running = True
-        logger.info("Conversion worker started")
-        
+        logger.info("Conversion worker started (%s thread(s))", self.num_threads)
+
     def stop(self, timeout: float = 5.0):
         """
-        Stop the worker thread gracefully.
-        
+        Stop the worker threads gracefully.
+
+        Pending tasks that have not been picked up yet are discarded;
+        tasks already executing are allowed to finish.
+
         Args:
-            timeout: Maximum time to wait for thread to finish
+            timeout: Maximum time to wait for threads to finish
         """
         if not self._running:
             return
-            
+
         self._stop_event.set()
-        if self._thread:
-            self._thread.join(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        with self._gate:
+            # Release workers waiting for a slot
+            self._gate.notify_all()
+
+        # Discard pending work so the stop sentinels are seen promptly
+        discarded = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if item is not _STOP:
+                discarded += 1
+        if discarded:
+            logger.info("Discarded %s pending task(s) on shutdown", discarded)
+
+        # Wake every worker blocked on the queue with a sentinel (no polling in the
+        # worker loop). Workers released from the slot wait exit without taking one,
+        # so stop offering sentinels once no thread is left to take them.
+        sentinels = len(self._threads)
+        while sentinels and time.monotonic() < deadline and any(t.is_alive() for t in self._threads):
+            try:
+                self._queue.put(_STOP, timeout=min(0.05, max(0.0, deadline - time.monotonic())))
+                sentinels -= 1
+            except queue.Full:
+                pass
+
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                logger.warning("%s did not stop within %ss", thread.name, timeout)
+
         self._running = False
         logger.info("Conversion worker stopped")
-        
-    def submit(self, task: Callable, callback: Callable[[Any], None] = None):
+
+    def submit(self, task: Callable, callback: Callable[[Any], None] = None, timeout: Optional[float] = None):
         """
         Submit a task to the worker queue.
-        
+
+        Blocks while the queue is full.
+
         Args:
             task: Callable that performs the conversion (must be COM-safe)
             callback: Optional callback to invoke with the result (runs on worker thread)
+            timeout: Maximum time to wait for a free queue slot (None = wait forever)
+
+        Raises:
+            RuntimeError: If the worker has been stopped
+            queue.Full: If no slot became free within `timeout`
         """
-        self._queue.put((task, callback))
-        logger.debug(f"Task submitted to worker queue (queue size: {self._queue.qsize()})")
-        
-    def _worker_loop(self):
+        if self._stop_event.is_set():
+            raise RuntimeError("Cannot submit tasks to a stopped worker")
+        self._queue.put((task, callback, time.monotonic()), timeout=timeout)
+        logger.debug("Task submitted to worker queue (queue size: %s)", self._queue.qsize())
+
+    def wait_until_idle(self):
+        """Block until every submitted task has been processed."""
+        self._queue.join()
+
+    def get_stats(self) -> List[WorkerStats]:
+        """
+        Get a snapshot of per-worker statistics.
+
+        Returns:
+            List of WorkerStats copies, one per worker thread
+        """
+        return [replace(stats) for stats in self._stats]
+
+    def _worker_loop(self, stats: WorkerStats):
         """Main worker loop (runs in separate thread)."""
-        logger.debug("Worker loop started")
-        
-        while not self._stop_event.is_set():
-            try:
-                # Wait for task with timeout to allow checking stop event
-                task, callback = self._queue.get(timeout=0.5)
-                
+        logger.debug("%s loop started", stats.name)
+        _com_initialize()
+
+        try:
+            while True:
+                # Take a slot before dequeuing: tasks stay queued (and count in
+                # queue_size and queue_wait) until a worker may run them
+                if not self._acquire_slot():
+                    break
+                item = self._queue.get()
+                if item is _STOP:
+                    self._queue.task_done()
+                    self._release_slot()
+                    break
                 try:
-                    logger.debug("Executing task")
-                    result = task()
-                    
-                    if callback:
-                        callback(result)
-                        
-                except Exception as e:
-                    logger.error(f"Task execution failed: {e}", exc_info=True)
-                    if callback:
-                        callback(e)
+                    self._execute(item, stats)
                 finally:
-                    self._queue.task_done()
-                    
-            except queue.Empty:
-                continue
-                
-        logger.debug("Worker loop exited")
+                    self._release_slot()
+        finally:
+            _com_uninitialize()
+
+        logger.debug("%s loop exited", stats.name)
+
+    def _execute(self, item, stats: WorkerStats):
+        """Run one dequeued task and its callback."""
+        task, callback, submitted_at = item
+        started_at = time.monotonic()
+        stats.queue_wait += started_at - submitted_at
+        with self._active_lock:
+            self._active += 1
+
+        try:
+            logger.debug("Executing task")
+            result = task()
+            stats.jobs_done += 1
+
+            if callback:
+                callback(result)
+
+        except Exception as e:
+            stats.jobs_failed += 1
+            logger.error("Task execution failed: %s", e, exc_info=True)
+            if callback:
+                callback(e)
+        finally:
+            stats.busy_time += time.monotonic() - started_at
+            with self._active_lock:
+                self._active -= 1
+            self._queue.task_done()
+
+    def _acquire_slot(self) -> bool:
+        """Wait until this thread may execute under the active limit (False when stopping)."""
+        with self._gate:
+            while self._slots >= self._active_limit:
+                if self._stop_event.is_set():
+                    return False
+                self._gate.wait()
+            self._slots += 1
+            return True
+
+    def _release_slot(self):
+        with self._gate:
+            self._slots -= 1
+            self._gate.notify()
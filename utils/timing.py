@@ -0,0 +1,65 @@
+"""
+Lightweight stage timing for conversions.
+"""
+import time
+from typing import Dict
+from utils.logging import stage_var
+
+_clock = time.perf_counter
+
+
+class StageTimer:
+    """
+    Accumulates monotonic wall-clock time per named stage.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("open"):
+            doc = app.Documents.Open(path)
+        result = timer.attach(ConversionResult.success_result(path))
+
+    A stage that runs more than once (e.g. per worksheet) accumulates.
+    Stages must not be nested.
+    While a stage runs it is also the `stage` of log records (see
+    utils.logging.log_context).
+    The cost is two perf_counter() calls, a context variable set/reset
+    and a dict update per stage, about a microsecond, against COM calls
+    that take milliseconds.
+    """
+    __slots__ = ("stages", "_name", "_start", "_token")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._name = None
+        self._start = 0.0
+        self._token = None
+
+    def stage(self, name: str) -> "StageTimer":
+        """Time the following `with` block under `name`."""
+        self._name = name
+        return self
+
+    def __enter__(self):
+        self._token = stage_var.set(self._name)
+        self._start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = _clock() - self._start
+        stage_var.reset(self._token)
+        self.stages[self._name] = self.stages.get(self._name, 0.0) + elapsed
+        return False
+
+    def add(self, name: str, seconds: float):
+        """Record time measured elsewhere."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def attach(self, result):
+        """
+        Link the stage breakdown to a ConversionResult and return it.
+
+        The dict is shared, so stages timed after this call (cleanup in a
+        `finally` block) still show up in the result.
+        """
+        result.stage_timings = self.stages
+        return result